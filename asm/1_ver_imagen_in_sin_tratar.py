@@ -1,25 +1,29 @@
-import numpy as np
 import matplotlib.pyplot as plt
+import sys
+
+import imagen_raw
 
 def main():
     # Definimos las dimensiones que tendrá la imagen que vamos a leer.
-    # En este caso, asumimos una imagen de 400 píxeles de alto por 400 de ancho.
-    alto, ancho = 400, 400
-
-    # Abrimos el archivo "imagen_in.img" en modo binario para leer todos sus bytes.
-    with open("imagen_in.img", "rb") as f:
-        data = f.read()
-
-    # Convertimos los bytes del archivo en un arreglo de NumPy de tipo uint8 (valores de 0 a 255).
-    # 'count=alto*ancho' limita la lectura de datos a la cantidad necesaria para rellenar la imagen de 400x400.
-    arr = np.frombuffer(data, dtype=np.uint8, count=alto * ancho)
+    # Por defecto asumimos una imagen de 400 píxeles de alto por 400 de ancho;
+    # con otra línea "size" en config.txt se pasan como argumentos: <ancho> <alto>
+    ancho, alto = 400, 400
+    if len(sys.argv) >= 3:
+        ancho, alto = int(sys.argv[1]), int(sys.argv[2])
 
-    # Ajustamos el arreglo unidimensional para que tenga forma de matriz de 400 filas y 400 columnas.
-    arr = arr.reshape((alto, ancho))
+    # Mapeamos "imagen_in.img" en memoria (imagen_raw) en lugar de leer todos sus bytes:
+    # frame() es una vista uint8 (valores de 0 a 255) de 'alto' filas y 'ancho' columnas
+    # (400x400 por defecto), y solo se lee del disco lo que se dibuja.
+    with imagen_raw.RawImage("imagen_in.img", ancho, alto) as raw:
+        try:
+            arr = raw.frame()
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
 
     # Mostramos el contenido de la imagen en escala de grises usando matplotlib.
     plt.imshow(arr, cmap='gray')
-    plt.title("Visualizando imagen_in.img (400x400)")
+    plt.title(f"Visualizando imagen_in.img ({ancho}x{alto})")
     plt.show()
 
 if __name__ == "__main__":
@@ -1,64 +1,68 @@
-import numpy as np
 import matplotlib.pyplot as plt
 import sys
 
-def ver_cuadrante(image_path, quadrant):
+import imagen_raw
+
+def ver_cuadrante(image_path, quadrant, ancho=400, alto=400, grid=4):
     """
-    Esta función lee un archivo binario que asume tiene dimensiones de 400 x 400 píxeles,
-    lo organiza como una matriz de esa forma y luego muestra un área específica de 100 x 100.
-    El área que se muestra depende del cuadrante (de 1 a 16) que se indique.
+    Esta función lee un archivo binario que asume tiene dimensiones de 400 x 400 píxeles
+    (o ancho x alto), lo organiza como una matriz de esa forma y luego muestra un área
+    específica de 100 x 100 (ancho/grid x alto/grid).
+    El área que se muestra depende del cuadrante (de 1 a 16, o 1..grid*grid) que se indique.
     """
+    total = ancho * alto
 
-    # Abrimos el archivo binario y leemos todo su contenido en la variable 'data'.
-    with open(image_path, "rb") as f:
-        data = f.read()
+    # Mapeamos el archivo binario en memoria (imagen_raw): no se lee entero, solo
+    # las filas del cuadrante que se muestra.
+    raw = imagen_raw.RawImage(image_path, ancho, alto)
 
-    # Verificamos si el tamaño del archivo coincide con 400*400 bytes.
+    # Verificamos si el tamaño del archivo coincide con ancho*alto bytes (400*400).
     # Si es menor, nos faltan datos; si es mayor, ignoramos lo que sobra.
-    if len(data) < 400 * 400:
-        print(f"Advertencia: el archivo {image_path} tiene menos de {400*400} bytes.")
-    elif len(data) > 400 * 400:
-        print(f"Advertencia: el archivo {image_path} tiene más de {400*400} bytes. (Se ignora lo que excede)")
-
-    # Convertimos los bytes leídos en un arreglo de NumPy, tomando solo 400*400 bytes.
-    arr_in = np.frombuffer(data, dtype=np.uint8, count=400*400)
-
-    # Le damos la forma de 400 filas y 400 columnas, como si fuera una imagen de 400x400 píxeles.
-    arr_in = arr_in.reshape((400, 400))
+    if raw.size < total:
+        print(f"Advertencia: el archivo {image_path} tiene menos de {total} bytes.")
+        return
+    elif raw.size > total:
+        print(f"Advertencia: el archivo {image_path} tiene más de {total} bytes. (Se ignora lo que excede)")
 
     # Determinamos a qué fila y columna corresponde el cuadrante que se quiere mostrar.
     # Existen 4 filas de cuadrantes (0 a 3) y 4 columnas (0 a 3), así que hay 16 cuadrantes en total.
     # Para obtener la fila, dividimos (quadrant-1) entre 4,
     # para la columna, calculamos el módulo (quadrant-1) con 4.
-    row = (quadrant - 1) // 4
-    col = (quadrant - 1) % 4
+    # (Con otra cuadrícula es lo mismo cambiando 4 por grid.)
+    row = (quadrant - 1) // grid
+    col = (quadrant - 1) % grid
 
-    # Cada cuadrante mide 100x100 dentro de la imagen de 400x400.
+    # Cada cuadrante mide 100x100 dentro de la imagen de 400x400 (ancho/grid x alto/grid).
     # Entonces calculamos el inicio en filas y columnas con base en el cuadrante.
-    r_start = row * 100
-    c_start = col * 100
+    tile_w = ancho // grid
+    tile_h = alto // grid
+    r_start = row * tile_h
+    c_start = col * tile_w
 
     # Extraemos la sección de la imagen que corresponde a ese cuadrante.
-    sub_block = arr_in[r_start:r_start + 100, c_start:c_start + 100]
+    # Es una vista del archivo mapeado (sin copiar); raw.quadrant(quadrant, grid) hace lo mismo.
+    sub_block = raw.frame()[r_start:r_start + tile_h, c_start:c_start + tile_w]
 
-    # Mostramos la sección (100x100) del cuadrante solicitado en escala de grises.
+    # Mostramos la sección del cuadrante solicitado en escala de grises.
     plt.imshow(sub_block, cmap='gray')
-    plt.title(f"Quadrant={quadrant}: sub-bloque 100x100")
+    plt.title(f"Quadrant={quadrant}: sub-bloque {tile_w}x{tile_h}")
     plt.show()
 
 def main():
     # Verificamos que se hayan pasado suficientes argumentos al script:
     # 1) Nombre del archivo de imagen.
     # 2) El número de cuadrante que se desea visualizar.
+    # 3) Opcional: ancho, alto y grid (los de la línea "size" de config.txt).
     if len(sys.argv) < 3:
-        print("Uso: python3 ver_cuadrante_sub.py <imagen_in.img> <quadrant>")
+        print("Uso: python3 ver_cuadrante_sub.py <imagen_in.img> <quadrant> [ancho alto [grid]]")
         sys.exit(1)
 
     image_path = sys.argv[1]
     quadrant = int(sys.argv[2])
+    dims = [int(x) for x in sys.argv[3:6]]
 
     # Llamamos a la función para visualizar el cuadrante solicitado.
-    ver_cuadrante(image_path, quadrant)
+    ver_cuadrante(image_path, quadrant, *dims)
 
 if __name__ == "__main__":
     main()
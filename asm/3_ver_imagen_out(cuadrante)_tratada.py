@@ -1,45 +1,49 @@
-import numpy as np
 import matplotlib.pyplot as plt
+import sys
+
+import imagen_raw
 
 def main():
     # En esta sección definimos las dimensiones de la imagen que esperamos ver.
     # Por ejemplo, si nuestro asm produce una imagen de 200 píxeles de alto
-    # por 200 píxeles de ancho
+    # por 200 píxeles de ancho. Con otras dimensiones (línea "size" de config.txt)
+    # se pasan como argumentos: [archivo] [ancho alto]
     alto = 200
     ancho = 200
-
-    # Abrimos el archivo "imagen_out.img" en modo binario.
+    archivo = "imagen_out.img"
+    args = sys.argv[1:]
+    if len(args) in (1, 3):
+        archivo = args.pop(0)
+    if len(args) == 2:
+        ancho, alto = int(args[0]), int(args[1])
+
+    # Mapeamos el archivo (imagen_out.img por defecto) en memoria con imagen_raw.
     # Este archivo debería contener los datos en crudo (bytes) de la imagen.
-    with open("imagen_out.img", "rb") as f:
-        data = f.read()
+    raw = imagen_raw.RawImage(archivo, ancho, alto)
 
     # Calculamos la cantidad de bytes que deberíamos tener (alto * ancho)
     # y verificamos si el archivo tiene exactamente esa cantidad, menos o más.
-    num_bytes = len(data)
+    num_bytes = raw.size
     esperado = alto * ancho
     if num_bytes < esperado:
         print(f"Advertencia: se esperaban {esperado} bytes, pero solo hay {num_bytes}.")
     elif num_bytes > esperado:
         print(f"Advertencia: se esperaban {esperado} bytes, pero hay {num_bytes} (sobran algunos datos).")
 
-    # Convertimos los bytes en un arreglo NumPy de 8 bits sin signo.
-    # Al usar 'count=esperado', solo tomamos la cantidad de datos que nos interesa.
-    arr = np.frombuffer(data, dtype=np.uint8, count=esperado)
-
-    # Si hay bytes de más, con 'count=esperado' simplemente ignoramos el resto.
-    # Si no quieres ignorarlos, quita ese parámetro.
-
-    # Intentamos redimensionar el arreglo para que tenga la forma (alto, ancho).
-    # Si no coincide la cantidad de datos, se lanzará un ValueError.
+    # Tomamos la primera imagen del archivo como arreglo NumPy de 8 bits sin signo,
+    # con forma (alto, ancho). Es una vista del archivo mapeado: no se copia nada.
+    # Si hay bytes de más, simplemente ignoramos el resto (con imagen_out_lote.img,
+    # raw.frames dice cuántos bloques hay y raw.frame(i) muestra el i-ésimo).
+    # Si faltan datos, frame() lanza ValueError.
     try:
-        arr = arr.reshape((alto, ancho))
+        arr = raw.frame()
     except ValueError:
         print("No se pudo ajustar el arreglo a las dimensiones especificadas. ")
         return
 
     # Finalmente, mostramos la imagen en escala de grises con matplotlib.
     plt.imshow(arr, cmap='gray')
-    plt.title("Visualizando imagen_out.img")
+    plt.title(f"Visualizando {archivo} ({ancho}x{alto})")
     plt.show()
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# ---------------------------
+# BANDAS (interpolación 2x por franjas de filas, para imágenes enormes)
+# ---------------------------
+"""
+Interpola una imagen cruda completa (como "full") sin tenerla entera en
+memoria: lee 'band_rows' filas por vez, las interpola y escribe la salida
+antes de leer la franja siguiente. Es lo mismo que el modo por bandas de
+./procesamiento (ENTRADA SALIDA stream ANCHO ALTO [FILAS]).
+
+La fila 2r+1 de la salida usa la fila r+1 de la entrada: la última fila de
+cada franja queda como halo y se interpola con la franja siguiente, así que
+el resultado es idéntico byte a byte a process_full (sin costuras).
+
+Memoria: (band_rows+1)*ancho bytes de entrada y 4*(band_rows+1)*ancho de
+salida (más los temporales del motor), sin importar el alto.
+"""
+
+import sys
+import numpy as np
+
+import motor_numpy
+
+# Filas de entrada por franja (igual que STREAM_BAND_ROWS de procesamiento.asm)
+BAND_ROWS = 256
+
+
+def _read_rows(src, view):
+    """
+    Llena 'view' desde 'src' (un pipe o un archivo entregan pedazos).
+    Lanza EOFError si la entrada termina antes.
+    """
+    got = 0
+    while got < len(view):
+        n = src.readinto(view[got:])
+        if not n:
+            raise EOFError(f"La entrada terminó: faltan {len(view) - got} bytes")
+        got += n
+
+
+def upscale_stream(src, dst, width, height, band_rows=BAND_ROWS, engine=motor_numpy):
+    """
+    Lee height filas de width bytes de 'src' (archivo binario abierto) y escribe
+    en 'dst' la imagen interpolada (2*height filas de 2*width bytes).
+    - engine: motor_numpy, motor_so o un motor_worker.KernelWorker (interpolate_2x;
+      el worker manda las bandas de más de motor_worker.MAX_DIM columnas en pedazos).
+    Devuelve (checksum_entrada, checksum_salida, firma_entrada, firma_salida),
+    los mismos que process_full(..., wsum=True): cada franja se firma desde la
+    posición de su primera fila emitida (checksum_wsum con start).
+    """
+    if width <= 0 or height <= 0 or band_rows <= 0:
+        raise ValueError(f"Medidas inválidas: {width}x{height}, {band_rows} filas por franja")
+
+    band = np.empty((band_rows + 1, width), dtype=np.uint8)          # halo + franja
+    out = np.empty((2 * (band_rows + 1), 2 * width), dtype=np.uint8)
+    csum_in = csum_out = 0
+    firma_in = firma_out = 0
+    emitted = 0             # Filas de entrada ya emitidas (posición de la firma)
+    rows = 0                # Filas en 'band' (incluido el halo)
+    left = height           # Filas por leer
+
+    while True:
+        n = min(band_rows + 1 - rows, left)
+        _read_rows(src, memoryview(band[rows:rows + n]).cast("B"))
+        rows += n
+        left -= n
+
+        engine.interpolate_2x(band[:rows], out[:2 * rows])
+        emit = rows if left == 0 else rows - 1      # El halo se emite con la franja siguiente
+        dst.write(memoryview(out[:2 * emit]).cast("B"))
+        csum_in += motor_numpy.checksum(band[:emit])
+        csum_out += motor_numpy.checksum(out[:2 * emit])
+        firma_in += motor_numpy.checksum_wsum(band[:emit], emitted * width)
+        firma_out += motor_numpy.checksum_wsum(out[:2 * emit], 4 * emitted * width)
+        emitted += emit
+
+        if left == 0:
+            return (csum_in, csum_out,
+                    firma_in & motor_numpy.WSUM_MASK, firma_out & motor_numpy.WSUM_MASK)
+        band[0] = band[rows - 1]
+        rows = 1
+
+
+def upscale_file(src_path, dst_path, width, height, band_rows=BAND_ROWS, engine=motor_numpy):
+    """
+    upscale_stream entre dos rutas ("-" = stdin / stdout).
+    """
+    src = sys.stdin.buffer if src_path == "-" else open(src_path, "rb", buffering=0)
+    dst = sys.stdout.buffer if dst_path == "-" else open(dst_path, "wb")
+    try:
+        return upscale_stream(src, dst, width, height, band_rows, engine)
+    finally:
+        if src is not sys.stdin.buffer:
+            src.close()
+        if dst is not sys.stdout.buffer:
+            dst.close()
+        else:
+            dst.flush()
+
+
+def main():
+    """
+    Uso: python3 bandas.py <entrada | -> <salida | -> ANCHO ALTO [FILAS] [numpy | so]
+    Imprime los mismos mensajes que ./procesamiento ... stream (a stderr si la salida es "-").
+    """
+    usage = "Uso: python3 bandas.py <entrada | -> <salida | -> ANCHO ALTO [FILAS] [numpy | so]"
+    args = sys.argv[1:]
+    engine = motor_numpy
+    if args and args[-1] in ("numpy", "so"):
+        if args.pop() == "so":
+            import motor_so
+            engine = motor_so
+    try:
+        if len(args) not in (4, 5):
+            raise ValueError
+        width, height = int(args[2]), int(args[3])
+        band_rows = int(args[4]) if len(args) == 5 else BAND_ROWS
+        csum_in, csum_out, firma_in, firma_out = upscale_file(args[0], args[1], width, height, band_rows, engine)
+    except ValueError:
+        print(usage, file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(11)
+    except EOFError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(12)
+
+    out = sys.stderr if args[1] == "-" else sys.stdout
+    print(f"Bytes leidos (hex): 0x{width * height:016X}", file=out)
+    print(f"Checksum imagen original (hex): 0x{csum_in:016X}", file=out)
+    print(f"Checksum imagen interpolada (hex): 0x{csum_out:016X}", file=out)
+    print(f"Firma imagen original (hex): 0x{firma_in:016X}", file=out)
+    print(f"Firma imagen interpolada (hex): 0x{firma_out:016X}", file=out)
+
+
+if __name__ == "__main__":
+    main()
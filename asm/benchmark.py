@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+# ---------------------------
+# BENCHMARK (tiempos por etapa, sin interfaz gráfica)
+# ---------------------------
+"""
+Mide por separado cada etapa del flujo de la interfaz, sin abrir ventanas:
+
+- convertir: conversion.to_gray (pillow y, si está instalado, imagemagick)
+  sobre las imágenes del repositorio (imagen_original.jpg, NYC30570_.jpg) y
+  una sintética, a cada medida.
+- kernel: un cuadrante y la imagen completa con cada motor disponible
+  (numpy, so, asm = ./procesamiento --server, asm_exec = un ./procesamiento
+  por pedido con pipes) y cada medida. Con --factors 2,3,4 se agrega el
+  cuadrante a cada escala distinta de 2 ("cuadrante 3x", ...).
+- io: escribir y leer el .img crudo (tofile / np.fromfile / imagen_raw).
+- mostrar: los fundidos de la interfaz (imshow + set_alpha + blit) con el
+  backend Agg de matplotlib.
+
+Por cada caso reporta mediana, p90, p99, mínimo, Mpx/s (píxeles de salida
+por segundo) y el pico de memoria (RSS) del proceso hasta ese momento.
+
+Uso:
+    python3 benchmark.py [--stages convertir,kernel,io,mostrar] [--sizes 400,800,1600]
+                         [--backends numpy,so,asm,asm_exec] [--factors 2,3,4] [--repeat 20]
+                         [--save base.json] [--compare base.json [--tolerance 0.2]]
+Con --compare termina con código 3 si algún caso es más lento (mediana) que
+la línea base más la tolerancia.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import resource
+import tempfile
+import subprocess
+
+import numpy as np
+
+import conversion
+import motor_numpy
+import imagen_raw
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Imágenes del repositorio (además de una sintética)
+BUNDLED = ("imagen_original.jpg", "NYC30570_.jpg")
+
+STAGES = ("convertir", "kernel", "io", "mostrar")
+BACKENDS = ("numpy", "so", "asm", "asm_exec")
+
+REGRESSION_EXIT = 3
+
+
+def peak_rss_mb():
+    """
+    Pico de memoria residente del proceso (y de los hijos ya terminados), en MB.
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return max(own, children) / 1024.0     # ru_maxrss viene en KB en Linux
+
+
+def measure(fn, repeat, pixels, warmup=1):
+    """
+    Corre fn() 'warmup' + 'repeat' veces y resume los tiempos (ms).
+    'pixels' son los píxeles que produce una llamada (para Mpx/s).
+    """
+    for _ in range(warmup):
+        fn()
+    times = np.empty(repeat)
+    for i in range(repeat):
+        t0 = time.perf_counter_ns()
+        fn()
+        times[i] = (time.perf_counter_ns() - t0) / 1e6
+    p50 = float(np.percentile(times, 50))
+    return {
+        "n": repeat,
+        "p50_ms": p50,
+        "p90_ms": float(np.percentile(times, 90)),
+        "p99_ms": float(np.percentile(times, 99)),
+        "min_ms": float(times.min()),
+        "mpx_s": pixels / (p50 * 1e3) if p50 > 0 else 0.0,
+        "rss_pico_mb": peak_rss_mb(),
+    }
+
+
+def synthetic_frame(width, height, seed=0):
+    """
+    Imagen gris de prueba: degradado + ruido (ni constante ni puro ruido).
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width]
+    base = (x * 255 // max(1, width - 1) + y * 255 // max(1, height - 1)) // 2
+    noise = rng.integers(-24, 25, (height, width))
+    return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+
+def source_images(sizes, tmpdir):
+    """
+    (nombre, ruta) de las imágenes a convertir: las del repositorio y una
+    sintética (PNG) del tamaño de la medida más grande.
+    """
+    from PIL import Image
+    images = [(name, os.path.join(HERE, name)) for name in BUNDLED
+              if os.path.exists(os.path.join(HERE, name))]
+    size = max(sizes)
+    path = os.path.join(tmpdir, f"sintetica_{size}.png")
+    Image.fromarray(synthetic_frame(size, size)).save(path)
+    images.append((f"sintetica_{size}.png", path))
+    return images
+
+
+def available_backends(names):
+    """
+    Motores pedidos que se pueden usar aquí: {nombre: motor}.
+    """
+    engines = {}
+    for name in names:
+        if name == "numpy":
+            engines[name] = motor_numpy
+        elif name == "so":
+            import motor_so
+            if motor_so.available():
+                engines[name] = motor_so
+        elif name == "asm":
+            import motor_worker
+            if motor_worker.available():
+                engines[name] = motor_worker.KernelWorker().start()
+        elif name == "asm_exec":
+            import motor_worker
+            if motor_worker.available():
+                engines[name] = ExecEngine(motor_worker.EXEC_PATH)
+    return engines
+
+
+class ExecEngine:
+    """
+    Un ./procesamiento por pedido, imagen y resultado por pipes (kernel_backend
+    "asm_exec" de la interfaz): incluye el costo de fork/exec.
+    """
+    def __init__(self, path, threads=None):
+        self.path = path
+        self.threads = threads
+
+    def set_threads(self, threads):
+        self.threads = threads
+
+    def _run(self, frame, spec, shape, grid=motor_numpy.GRID, factor=motor_numpy.FACTOR):
+        import motor_worker
+        height, width = frame.shape
+        cmd = [self.path, "-", "-", spec, str(width), str(height), str(grid), str(factor)]
+        result = subprocess.run(cmd, input=memoryview(np.ascontiguousarray(frame)).cast("B"),
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+                                env=motor_worker.threads_env(self.threads))
+        return np.frombuffer(result.stdout, dtype=np.uint8).reshape(shape)
+
+    def process_quadrant(self, frame, quadrant, grid=motor_numpy.GRID, factor=motor_numpy.FACTOR):
+        tile_h, tile_w = motor_numpy.tile_shape(frame.shape, grid)
+        return self._run(frame, str(quadrant), (factor * tile_h, factor * tile_w), grid, factor)
+
+    def process_full(self, frame):
+        return self._run(frame, "full", (2 * frame.shape[0], 2 * frame.shape[1]))
+
+    def close(self):
+        pass
+
+
+def bench_convertir(results, sizes, repeat, tmpdir):
+    backends = ["pillow"] + (["imagemagick"] if shutil.which("convert") else [])
+    for name, path in source_images(sizes, tmpdir):
+        for backend in backends:
+            for size in sizes:
+                results.append(dict(
+                    etapa="convertir", caso=f"{name} {backend}", medida=size,
+                    **measure(lambda: conversion.to_gray(path, size, size, backend),
+                              repeat, size * size)))
+
+
+def bench_kernel(results, sizes, repeat, backend_names, factors=(2,), threads=()):
+    engines = available_backends(backend_names)
+    try:
+        for size in sizes:
+            frame = synthetic_frame(size, size)
+            tile_h, tile_w = motor_numpy.tile_shape(frame.shape)
+            for name, engine in list(engines.items()):
+                try:
+                    engine.process_quadrant(frame, 6)
+                except Exception as e:     # p. ej. un ./procesamiento sin --server o sin argv
+                    print(f"kernel: se omite el motor {name} ({type(e).__name__}: {e})")
+                    del engines[name]
+                    if hasattr(engine, "close"):
+                        engine.close()
+                    continue
+                quadrant = dict(etapa="kernel", caso=f"{name} cuadrante", medida=size,
+                                **measure(lambda: engine.process_quadrant(frame, 6),
+                                          repeat, 4 * tile_h * tile_w))
+                full = dict(etapa="kernel", caso=f"{name} full", medida=size,
+                            **measure(lambda: engine.process_full(frame),
+                                      repeat, 4 * size * size))
+                results.extend((quadrant, full))
+                for factor in factors:
+                    if factor == 2:
+                        continue
+                    results.append(dict(
+                        etapa="kernel", caso=f"{name} cuadrante {factor}x", medida=size,
+                        **measure(lambda: engine.process_quadrant(frame, 6, factor=factor),
+                                  repeat, factor * factor * tile_h * tile_w)))
+                # Imagen completa con N hilos (motores con process_frame)
+                if hasattr(engine, "set_threads"):
+                    for count in threads:
+                        engine.set_threads(count)
+                        results.append(dict(
+                            etapa="kernel", caso=f"{name} full {count} hilos", medida=size,
+                            **measure(lambda: engine.process_full(frame), repeat, 4 * size * size)))
+                    engine.set_threads(0)
+    finally:
+        for engine in engines.values():
+            if hasattr(engine, "close"):
+                engine.close()
+
+
+def bench_io(results, sizes, repeat, tmpdir):
+    path = os.path.join(tmpdir, "imagen_in.img")
+    for size in sizes:
+        frame = synthetic_frame(size, size)
+        pixels = size * size
+        results.append(dict(etapa="io", caso="escribir tofile", medida=size,
+                            **measure(lambda: frame.tofile(path), repeat, pixels)))
+        results.append(dict(etapa="io", caso="leer fromfile", medida=size,
+                            **measure(lambda: np.fromfile(path, dtype=np.uint8), repeat, pixels)))
+        # La vista mapeada no lee nada hasta tocarla: se suma para leer todas las páginas
+        results.append(dict(etapa="io", caso="leer imagen_raw", medida=size,
+                            **measure(lambda: int(imagen_raw.RawImage(path, size, size).frame().sum()),
+                                      repeat, pixels)))
+
+
+def bench_mostrar(results, sizes, repeat):
+    """
+    Los fundidos de la interfaz: 6 pasos de set_alpha + draw_artist + blit
+    sobre tres paneles (convertida, cuadrante, final), con el backend Agg.
+    """
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+    except ImportError:
+        print("mostrar: matplotlib no está instalado, se omite")
+        return
+
+    steps = 6
+    for size in sizes:
+        frame = synthetic_frame(size, size)
+        quad = motor_numpy.extract_quadrant(frame, 6)
+        final = motor_numpy.interpolate_2x(quad)
+        fig = Figure(figsize=(9, 3), dpi=100)
+        canvas = FigureCanvasAgg(fig)
+        axes = fig.subplots(1, 3)
+        images = [ax.imshow(arr, cmap="gray", vmin=0, vmax=255, animated=True)
+                  for ax, arr in zip(axes, (frame, quad, final))]
+        canvas.draw()
+        background = canvas.copy_from_bbox(fig.bbox)
+
+        def fade():
+            for step in range(1, steps + 1):
+                canvas.restore_region(background)
+                for ax, im in zip(axes, images):
+                    im.set_alpha(step / steps)
+                    ax.draw_artist(im)
+                canvas.blit(fig.bbox)
+
+        results.append(dict(etapa="mostrar", caso=f"fundido {steps} pasos", medida=size,
+                            **measure(fade, repeat, steps * frame.size)))
+        results.append(dict(etapa="mostrar", caso="dibujo completo", medida=size,
+                            **measure(canvas.draw, repeat, frame.size)))
+
+
+def case_key(row):
+    return f"{row['etapa']}|{row['caso']}|{row['medida']}"
+
+
+def compare(results, baseline, tolerance):
+    """
+    Casos cuya mediana pasó la de la línea base por más de 'tolerance' (fracción).
+    Devuelve [(clave, base_ms, ahora_ms), ...].
+    """
+    base = {case_key(row): row for row in baseline["resultados"]}
+    slower = []
+    for row in results:
+        old = base.get(case_key(row))
+        if old and row["p50_ms"] > old["p50_ms"] * (1.0 + tolerance):
+            slower.append((case_key(row), old["p50_ms"], row["p50_ms"]))
+    return slower
+
+
+def print_table(results):
+    print(f"{'etapa':<10} {'caso':<34} {'medida':>6} {'p50 ms':>9} {'p90 ms':>9} "
+          f"{'p99 ms':>9} {'min ms':>9} {'Mpx/s':>9} {'RSS MB':>8}")
+    for row in results:
+        print(f"{row['etapa']:<10} {row['caso']:<34} {row['medida']:>6} {row['p50_ms']:9.3f} "
+              f"{row['p90_ms']:9.3f} {row['p99_ms']:9.3f} {row['min_ms']:9.3f} "
+              f"{row['mpx_s']:9.1f} {row['rss_pico_mb']:8.1f}")
+
+
+def parse_list(text, allowed=None, kind=str):
+    items = [kind(item) for item in text.split(",") if item]
+    if allowed is not None:
+        unknown = [item for item in items if item not in allowed]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"no válido: {', '.join(map(str, unknown))}")
+    return items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="benchmark.py", description="Tiempos por etapa (conversión, kernel, io, mostrar).")
+    parser.add_argument("--stages", type=lambda t: parse_list(t, STAGES), default=list(STAGES))
+    parser.add_argument("--sizes", type=lambda t: parse_list(t, kind=int), default=[400, 800, 1600])
+    parser.add_argument("--backends", type=lambda t: parse_list(t, BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--factors", type=lambda t: parse_list(t, range(2, motor_numpy.MAX_FACTOR + 1), int),
+                        default=[2],
+                        help=f"escalas del kernel, 2..{motor_numpy.MAX_FACTOR} (por defecto 2)")
+    parser.add_argument("--threads", type=lambda t: parse_list(t, kind=int), default=[],
+                        help='hilos para "full" en los motores del kernel, p. ej. 1,2,4 (0 = uno por CPU)')
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--save", help="guarda los resultados como línea base (JSON)")
+    parser.add_argument("--compare", help="línea base (JSON) contra la cual comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="fracción de tolerancia en la mediana (0.2 = 20%%)")
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    for size in args.sizes:
+        try:
+            motor_numpy.tile_shape((size, size))
+        except ValueError as e:
+            parser.error(str(e))
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as tmpdir:
+        if "convertir" in args.stages:
+            bench_convertir(results, args.sizes, args.repeat, tmpdir)
+        if "kernel" in args.stages:
+            bench_kernel(results, args.sizes, args.repeat, args.backends, args.factors, args.threads)
+        if "io" in args.stages:
+            bench_io(results, args.sizes, args.repeat, tmpdir)
+        if "mostrar" in args.stages:
+            bench_mostrar(results, args.sizes, args.repeat)
+
+    print_table(results)
+
+    if args.save:
+        report = {
+            "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "maquina": {"python": platform.python_version(), "numpy": np.__version__,
+                        "cpu": platform.processor() or platform.machine(),
+                        "nucleos": os.cpu_count()},
+            "repeticiones": args.repeat,
+            "resultados": results,
+        }
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Línea base guardada en {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        slower = compare(results, baseline, args.tolerance)
+        for key, old, new in slower:
+            print(f"REGRESIÓN {key}: {old:.3f} ms => {new:.3f} ms (+{(new / old - 1) * 100:.0f}%)")
+        if slower:
+            sys.exit(REGRESSION_EXIT)
+        print(f"Sin regresiones contra {args.compare} (tolerancia {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# ---------------------------
+# CACHÉ (frames convertidos e imágenes interpoladas, por contenido)
+# ---------------------------
+"""
+Guarda los arreglos ya calculados para no repetir la conversión ni el kernel
+cuando se vuelve a procesar la misma imagen y el mismo cuadrante.
+
+La clave es un hash (SHA-256) del contenido del archivo de origen más los
+parámetros que cambian el resultado (medida, cuadrante, motor de conversión,
+versión del kernel). Cambiar el archivo cambia la clave, aunque se llame igual.
+
+Dos niveles:
+- Memoria: LRU con un máximo de entradas (OrderedDict).
+- Disco (opcional): un .npy por clave en 'disk_dir', con un tope de bytes;
+  al pasarlo se borran los archivos usados hace más tiempo.
+"""
+
+import os
+import hashlib
+import tempfile
+from collections import OrderedDict
+import numpy as np
+
+# Tamaño de lectura para calcular el hash del archivo de origen
+_CHUNK = 1 << 20
+
+# Hash ya calculado por (ruta, tamaño, mtime): evita releer el archivo en cada clic
+_digests = {}
+
+
+def file_digest(path):
+    """
+    SHA-256 (hex) del contenido de 'path'. Se recalcula solo si cambian el
+    tamaño o la fecha de modificación del archivo.
+    """
+    st = os.stat(path)
+    stamp = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _digests.get(stamp)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_CHUNK), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _digests[stamp] = digest
+    return digest
+
+
+def make_key(digest, kind, **params):
+    """
+    Clave de caché: hash del origen + tipo de dato ("conv", "out", ...) + parámetros.
+    Los parámetros se ordenan por nombre, así el orden de los argumentos no importa.
+    """
+    text = digest + "|" + kind + "".join(f"|{name}={params[name]}" for name in sorted(params))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class FrameCache:
+    """
+    Caché LRU de arreglos uint8 con nivel opcional en disco.
+    - max_entries: entradas en memoria (0 desactiva el nivel de memoria).
+    - disk_dir: carpeta del nivel en disco (None lo desactiva).
+    - disk_max_bytes: tope de la carpeta; al pasarlo se borra lo menos usado.
+    Los arreglos devueltos son de solo lectura: se comparten entre llamadas.
+    """
+    def __init__(self, max_entries=64, disk_dir=None, disk_max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._mem = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key + ".npy")
+
+    def get(self, key):
+        """
+        Devuelve el arreglo guardado con 'key' o None. Un acierto en disco
+        también lo sube a memoria.
+        """
+        arr = self._mem.get(key)
+        if arr is not None:
+            self._mem.move_to_end(key)
+            self.hits += 1
+            return arr
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                arr = np.load(path, allow_pickle=False)
+                os.utime(path)          # Marca de uso para la expulsión LRU en disco
+            except (OSError, ValueError):
+                arr = None
+            if arr is not None:
+                self.disk_hits += 1
+                self._remember(key, arr)
+                return arr
+
+        self.misses += 1
+        return None
+
+    def put(self, key, arr):
+        """
+        Guarda una copia de solo lectura de 'arr' y la devuelve.
+        """
+        arr = np.array(arr, dtype=np.uint8, order="C")
+        self._remember(key, arr)
+        if self.disk_dir is not None:
+            self._store(key, arr)
+        return arr
+
+    def _remember(self, key, arr):
+        arr.flags.writeable = False
+        if self.max_entries <= 0:
+            return
+        self._mem[key] = arr
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _store(self, key, arr):
+        """
+        Escribe el .npy (archivo temporal + rename, para no dejar archivos a
+        medias) y aplica el tope de bytes de la carpeta.
+        """
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, arr, allow_pickle=False)
+            os.replace(tmp, self._disk_path(key))
+        except OSError:
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """
+        Borra los .npy usados hace más tiempo hasta quedar bajo disk_max_bytes.
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.disk_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".npy"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Vacía la memoria y, si existe, la carpeta del nivel en disco.
+        """
+        self._mem.clear()
+        if self.disk_dir is not None:
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".npy"):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+
+    def stats(self):
+        """
+        Contadores de aciertos (memoria / disco) y fallos.
+        """
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "entries": len(self._mem)}
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# ---------------------------
+# CONVERSIÓN (imagen cualquiera => gris 8 bits ANCHOxALTO, en memoria)
+# ---------------------------
+"""
+Reemplaza al 'convert' de ImageMagick del flujo original:
+
+    convert imagen -colorspace Gray -depth 8 -resize 400x400! -type Grayscale gray:imagen_in.img
+
+Con Pillow se decodifica, se pasa a luma de 8 bits y se redimensiona sin
+lanzar procesos. El resultado es un arreglo uint8 (alto, ancho) C-contiguo
+que se entrega directamente al kernel (motor_numpy / motor_so); solo hace
+falta escribir imagen_in.img (save_raw) para ./procesamiento.
+
+'convert' queda como motor opcional ("imagemagick") para comparar; la salida
+va por stdout (gray:-) en lugar de a imagen_in.img. Los dos motores no dan
+bytes idénticos (distinta fórmula de luma y distinto filtro de resize).
+"""
+
+import sys
+import subprocess
+import numpy as np
+from PIL import Image
+
+# Motores de conversión disponibles
+BACKENDS = ("pillow", "imagemagick")
+
+# Medida por defecto del flujo original
+IMG_SIZE = 400
+
+
+def convert_pillow(path, width=IMG_SIZE, height=IMG_SIZE):
+    """
+    Decodifica 'path', lo pasa a gris (luma 8 bits, modo "L") y lo redimensiona
+    a width x height sin mantener la proporción (igual que el '!' de -resize).
+    Lanza OSError si Pillow no puede abrir la imagen.
+    """
+    with Image.open(path) as im:
+        gray = im.convert("L")
+        if gray.size != (width, height):
+            gray = gray.resize((width, height), Image.LANCZOS)
+        return np.ascontiguousarray(np.asarray(gray, dtype=np.uint8))
+
+
+def convert_imagemagick(path, width=IMG_SIZE, height=IMG_SIZE):
+    """
+    Misma conversión con 'convert' (ImageMagick), leyendo los bytes crudos por stdout.
+    Lanza FileNotFoundError si no está instalado y CalledProcessError si falla.
+    """
+    cmd = [
+        "convert",
+        path,
+        "-colorspace", "Gray",
+        "-depth", "8",
+        "-resize", f"{width}x{height}!",
+        "-type", "Grayscale",
+        "gray:-"
+    ]
+    result = subprocess.run(cmd, check=True, capture_output=True)
+    data = np.frombuffer(result.stdout, dtype=np.uint8)
+    if data.size != width * height:
+        raise ValueError(f"convert devolvió {data.size} bytes, se esperaban {width * height}")
+    return data.reshape((height, width)).copy()
+
+
+def to_gray(path, width=IMG_SIZE, height=IMG_SIZE, backend="pillow"):
+    """
+    Convierte la imagen con el motor pedido ("pillow" o "imagemagick").
+    Devuelve un arreglo uint8 (height, width) C-contiguo.
+    """
+    if backend == "pillow":
+        return convert_pillow(path, width, height)
+    if backend == "imagemagick":
+        return convert_imagemagick(path, width, height)
+    raise ValueError(f"Motor de conversión desconocido: {backend} (usar {', '.join(BACKENDS)})")
+
+
+def save_raw(arr, path="imagen_in.img"):
+    """
+    Escribe el arreglo como archivo crudo (lo que lee ./procesamiento).
+    """
+    np.ascontiguousarray(arr, dtype=np.uint8).tofile(path)
+
+
+def main():
+    """
+    Uso: python3 conversion.py <imagen> [ancho alto] [pillow | imagemagick]
+    Genera imagen_in.img, como el 'convert' del flujo original.
+    """
+    usage = "Uso: python3 conversion.py <imagen> [ancho alto] [pillow | imagemagick]"
+    args = sys.argv[1:]
+    backend = "pillow"
+    if args and args[-1] in BACKENDS:
+        backend = args.pop()
+    if len(args) not in (1, 3):
+        print(usage)
+        sys.exit(1)
+    width, height = (int(args[1]), int(args[2])) if len(args) == 3 else (IMG_SIZE, IMG_SIZE)
+
+    arr = to_gray(args[0], width, height, backend)
+    save_raw(arr)
+    print(f"Se genero imagen_in.img ({width}x{height}, {backend})")
+
+
+if __name__ == "__main__":
+    main()
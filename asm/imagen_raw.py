@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# ---------------------------
+# IMAGEN RAW (archivos crudos de 8 bits mapeados en memoria)
+# ---------------------------
+"""
+Acceso a archivos crudos (imagen_in.img, imagen_out*.img, lotes de frames
+seguidos, escaneos grandes) con np.memmap en lugar de f.read():
+
+- El archivo se abre una sola vez; frame() y quadrant() devuelven vistas
+  (sin copiar) de la imagen completa o de un cuadrante.
+- Solo se leen del disco las páginas que se tocan, así que sirve para
+  archivos de varios GB que no entran en memoria.
+- Un archivo con varias imágenes de ANCHOxALTO seguidas (imagen_out_lote.img,
+  frames apilados) se ve como 'frames' imágenes; los bytes que sobran al
+  final se informan en 'extra'.
+
+Las vistas siguen siendo válidas después de close(): el mapeo se libera
+cuando ya nadie las usa.
+"""
+
+import os
+import numpy as np
+
+import motor_numpy
+
+
+class RawImage:
+    """
+    Archivo crudo uint8 visto como 'frames' imágenes de height x width.
+    - mode: "r" (solo lectura, por defecto) o "r+" (las vistas escriben en el archivo).
+    - offset: bytes a saltar al inicio (encabezados).
+    """
+    def __init__(self, path, width, height, mode="r", offset=0):
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Dimensiones inválidas: {width}x{height}")
+        self.path = path
+        self.width = width
+        self.height = height
+        self.frame_bytes = width * height
+
+        self.size = max(0, os.path.getsize(path) - offset)   # OSError si no existe
+        self.frames = self.size // self.frame_bytes
+        self.extra = self.size - self.frames * self.frame_bytes
+        self._data = None
+        if self.frames:
+            self._data = np.memmap(path, dtype=np.uint8, mode=mode, offset=offset,
+                                   shape=(self.frames, height, width))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.frames
+
+    def close(self):
+        """
+        Suelta el mapeo; las vistas ya entregadas lo mantienen vivo mientras existan.
+        """
+        self._data = None
+
+    def frame(self, index=0):
+        """
+        Vista (height, width) del frame 'index', sin copiar.
+        Lanza ValueError si el archivo no tiene ese frame completo.
+        """
+        if self._data is None and self.frames:
+            raise ValueError(f"{self.path} ya está cerrado")
+        if not 0 <= index < self.frames:
+            raise ValueError(f"{self.path} tiene {self.size} bytes: no alcanza para el "
+                             f"frame {index + 1} de {self.width}x{self.height}")
+        return self._data[index]
+
+    def quadrant(self, quadrant, grid=motor_numpy.GRID, index=0):
+        """
+        Vista del cuadrante (1..grid*grid) del frame 'index', sin copiar
+        (no es contigua: conserva el stride de la imagen completa).
+        """
+        tile = motor_numpy.tile_shape((self.height, self.width), grid)
+        r0, c0 = motor_numpy.quadrant_origin(quadrant, tile, grid)
+        return self.frame(index)[r0:r0 + tile[0], c0:c0 + tile[1]]
+
+    def iter_frames(self):
+        """
+        Recorre los frames en orden (vistas), para procesar archivos grandes por partes.
+        """
+        for index in range(self.frames):
+            yield self.frame(index)
+
+
+def read_frame(path, width, height, index=0):
+    """
+    Vista del frame 'index' de 'path' o None si el archivo no existe o no
+    tiene esa imagen completa.
+    """
+    try:
+        return RawImage(path, width, height).frame(index)
+    except (OSError, ValueError):
+        return None
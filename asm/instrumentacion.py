@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# ---------------------------
+# INSTRUMENTACIÓN (tiempos por etapa de cada pedido)
+# ---------------------------
+"""
+Mide cuánto tarda cada etapa de un pedido de la interfaz y lo deja en un
+registro que se puede mostrar en pantalla o exportar:
+
+- Spans: duración (ms) de las etapas de un pedido: leer, convertir, kernel
+  (hilo de trabajo), cargar y animar (hilo de Tk). Con span(etapa) como
+  bloque 'with' o add(etapa, segundos).
+- Tiempos del kernel: con PROCESAMIENTO_TIEMPOS=1 en el entorno,
+  ./procesamiento imprime "Tiempo <etapa> (ns, hex): 0x..." para leer,
+  copiar, interpolar, checksum y escribir; parse_kernel_times los lee.
+- JsonlLog: agrega un registro JSON por línea (un pedido por línea) a un
+  archivo, para seguir la latencia en producción con cualquier herramienta.
+
+No depende de Tk: ver_interfaz.py muestra summary() en su panel.
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Etapas del lado de Python, en el orden del pedido
+STAGES = ("leer", "convertir", "kernel", "cargar", "animar")
+
+# Etapas que mide ./procesamiento (mismo orden que time_acc en procesamiento.asm)
+KERNEL_STAGES = ("leer", "copiar", "interpolar", "checksum", "escribir")
+
+# Variable de entorno que activa los tiempos del kernel
+TIMING_ENV = "PROCESAMIENTO_TIEMPOS"
+
+# Líneas de tiempos de procesamiento.asm (print_timings)
+_KERNEL_LINE = re.compile(r"Tiempo (\w+) \(ns, hex\): 0x([0-9A-Fa-f]{16})")
+
+
+def timing_env(env=None):
+    """
+    Copia del entorno (os.environ por defecto) con PROCESAMIENTO_TIEMPOS=1,
+    para pasar a subprocess.
+    """
+    env = dict(os.environ if env is None else env)
+    env[TIMING_ENV] = "1"
+    return env
+
+
+def parse_kernel_times(text):
+    """
+    {etapa: ms} a partir de la salida de ./procesamiento (bytes o str).
+    Devuelve {} si no trae el bloque de tiempos.
+    """
+    if isinstance(text, bytes):
+        text = text.decode(errors="replace")
+    return {stage: int(ns, 16) / 1e6 for stage, ns in _KERNEL_LINE.findall(text)}
+
+
+class Spans:
+    """
+    Tiempos (ms) de las etapas de un pedido, más datos que lo describen
+    (cuadrante, motores, aciertos de caché...) en 'meta'.
+    Cada etapa la escribe un solo hilo, así que no lleva lock.
+    """
+    def __init__(self, **meta):
+        self.meta = meta
+        self.stages = {}        # etapa -> ms (se suma si se repite)
+        self.kernel = {}        # etapa del kernel -> ms (parse_kernel_times)
+        self.started = time.time()
+
+    def add(self, stage, seconds):
+        """
+        Suma 'seconds' a la etapa 'stage'.
+        """
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds * 1000.0
+
+    @contextmanager
+    def span(self, stage):
+        """
+        with spans.span("convertir"): ... mide el bloque (también si lanza una excepción).
+        """
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - t0)
+
+    def total_ms(self):
+        return sum(self.stages.values())
+
+    def record(self):
+        """
+        Diccionario listo para json.dumps (una línea de JsonlLog).
+        """
+        return {
+            "inicio": round(self.started, 3),
+            **self.meta,
+            "etapas_ms": {stage: round(ms, 3) for stage, ms in self.stages.items()},
+            "kernel_ms": {stage: round(ms, 3) for stage, ms in self.kernel.items()},
+            "total_ms": round(self.total_ms(), 3),
+        }
+
+    def summary(self):
+        """
+        Texto para el panel: una línea con las etapas y, si las hay, otra con
+        las del kernel.
+        """
+        lines = [" | ".join(f"{stage} {ms:.1f} ms" for stage, ms in self.stages.items())
+                 + f" | total {self.total_ms():.1f} ms"]
+        if self.kernel:
+            lines.append("kernel: " + " | ".join(f"{stage} {ms:.2f} ms"
+                                                 for stage, ms in self.kernel.items()))
+        return "\n".join(lines)
+
+
+class JsonlLog:
+    """
+    Agrega registros (dict) a 'path', uno por línea. Con path=None no hace nada.
+    Se puede usar desde varios hilos.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        if not self.path:
+            return
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
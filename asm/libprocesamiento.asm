@@ -0,0 +1,18 @@
+; **************************************************************************************************************************************************
+; (x86_64, NASM)
+; Biblioteca compartida (libprocesamiento.so) con el kernel de procesamiento.
+; No tiene _start, no lee config.txt ni escribe imagen_out.img: exporta las
+; funciones de interpolacion.inc para llamarlas desde Python con ctypes,
+; pasando buffers propios (por ejemplo arreglos de NumPy).
+;
+; Compilar:
+;   nasm -f elf64 libprocesamiento.asm -o libprocesamiento.o
+;   ld -shared libprocesamiento.o -o libprocesamiento.so
+; **************************************************************************************************************************************************
+
+[bits 64]               ; Usaremos instrucciones e interfaces de 64 bits
+default rel             ; Direccionamiento relativo a RIP (necesario en un .so)
+
+%include "interpolacion.inc"
+
+section .note.GNU-stack noalloc noexec nowrite progbits     ; Pila no ejecutable
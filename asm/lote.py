@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# ---------------------------
+# LOTE (muchas imágenes en paralelo, un proceso por núcleo)
+# ---------------------------
+"""
+Procesa una carpeta (o un glob) de imágenes sin config.txt, imagen_in.img ni
+imagen_out.img: cada proceso del pool convierte en memoria (conversion.py),
+interpola con el motor elegido y escribe en su propia ruta de salida, así que
+varias ejecuciones pueden compartir carpeta.
+
+Uso:
+    python3 lote.py <carpeta | "glob"> <cuadrante | all | 1,5,16 | full>
+                    [-o salida] [-j procesos] [--motor numpy|so|asm]
+                    [--size ANCHO ALTO [GRID]] [--factor N] [--conversion pillow|imagemagick]
+                    [--packed]
+
+Salida (misma estructura de carpetas que la entrada):
+    salida/<ruta>/<nombre>_XX.img      un archivo por cuadrante
+    salida/<ruta>/<nombre>_lote.img    con --packed (los bloques seguidos, en orden)
+    salida/<ruta>/<nombre>_full.img    con "full"
+    salida/checksums.csv               imagen, cuadrante, checksum y firma de entrada y de salida
+                                       (firma = motor_numpy.checksum_wsum; con --motor asm
+                                       la salida se verifica al recibirla)
+Al final imprime imágenes/s y el tiempo de cada etapa (convertir, kernel, escribir).
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import conversion
+import motor_numpy
+
+# Extensiones que se toman al recibir una carpeta (las mismas del diálogo de la interfaz)
+EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tif", ".tiff")
+
+STAGES = ("convertir", "kernel", "escribir")
+
+# Estado de cada proceso del pool (lo fija _init_worker)
+_engine = None
+_options = None
+
+
+def find_images(source):
+    """
+    Lista ordenada de (ruta, ruta_relativa) para una carpeta (recursiva) o un glob.
+    La ruta relativa define dónde queda la salida.
+    """
+    if os.path.isdir(source):
+        found = []
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.lower().endswith(EXTENSIONS):
+                    path = os.path.join(root, name)
+                    found.append((path, os.path.relpath(path, source)))
+        return sorted(found)
+
+    paths = sorted(p for p in glob.glob(source, recursive=True) if os.path.isfile(p))
+    if not paths:
+        return []
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    return [(p, os.path.relpath(os.path.abspath(p), base)) for p in paths]
+
+
+def load_engine(name, threads=None):
+    """
+    Motor de interpolación del proceso: "numpy", "so" (libprocesamiento.so) o
+    "asm" (un ./procesamiento --server propio de cada proceso).
+    - threads: hilos del kernel para "full" ("so" y "asm"; None = los del kernel,
+      uno por CPU).
+    """
+    if name == "numpy":
+        return motor_numpy
+    if name == "so":
+        import motor_so
+        motor_so.load()
+        if threads is not None:
+            motor_so.set_threads(threads)
+        return motor_so
+    if name == "asm":
+        import atexit
+        import motor_worker
+        worker = motor_worker.KernelWorker(threads=threads).start()
+        atexit.register(worker.close)
+        return worker
+    raise ValueError(f"Motor desconocido: {name}")
+
+
+def _init_worker(options):
+    """
+    Se ejecuta una vez en cada proceso del pool: carga el motor (buffers propios).
+    """
+    global _engine, _options
+    _options = options
+    _engine = load_engine(options["motor"], options["threads"])
+
+
+def process_image(item):
+    """
+    Convierte, interpola y escribe una imagen. Corre en un proceso del pool.
+    Devuelve (ruta_relativa, {etapa: segundos},
+              [(cuadrante, csum_in, csum_out, firma_in, firma_out), ...], error).
+    """
+    path, rel = item
+    opts = _options
+    times = dict.fromkeys(STAGES, 0.0)
+    try:
+        t0 = time.perf_counter()
+        frame = conversion.to_gray(path, opts["width"], opts["height"], opts["conversion"])
+        t1 = time.perf_counter()
+        times["convertir"] = t1 - t0
+
+        spec = opts["spec"]
+        if spec == "full":
+            final, *values = _engine.process_full(frame, factor=opts["factor"], wsum=True)
+            blocks = [final]
+            csums = [(0, *values)]
+        else:
+            quadrants = motor_numpy.parse_quadrant_spec(spec, opts["grid"])
+            blocks, values = _engine.process_batch(frame, quadrants, grid=opts["grid"],
+                                                   factor=opts["factor"], wsum=True)
+            csums = [(q, *v) for q, v in zip(quadrants, values)]
+        t2 = time.perf_counter()
+        times["kernel"] = t2 - t1
+
+        stem = os.path.splitext(os.path.join(opts["output"], rel))[0]
+        os.makedirs(os.path.dirname(stem) or ".", exist_ok=True)
+        if spec == "full":
+            blocks[0].tofile(stem + "_full.img")
+        elif opts["packed"]:
+            np.ascontiguousarray(blocks).tofile(stem + "_lote.img")
+        else:
+            for (quadrant, *_), block in zip(csums, blocks):
+                block.tofile(f"{stem}_{quadrant:02d}.img")
+        times["escribir"] = time.perf_counter() - t2
+        return rel, times, csums, None
+    except Exception as e:
+        return rel, times, [], f"{type(e).__name__}: {e}"
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="lote.py",
+        description="Interpola (2x o --factor N) una carpeta o glob de imágenes usando todos los núcleos.")
+    parser.add_argument("source", help="carpeta (se recorre entera) o glob entre comillas")
+    parser.add_argument("spec", help='cuadrante, "all", lista "1,5,16" o "full"')
+    parser.add_argument("-o", "--output", default="salida_lote", help="carpeta de salida")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--motor", choices=("numpy", "so", "asm"), default="numpy")
+    parser.add_argument("--size", nargs="+", type=int, metavar="N",
+                        help="ANCHO ALTO [GRID] (por defecto 400 400 4)")
+    parser.add_argument("--factor", type=int, default=motor_numpy.FACTOR,
+                        help=f"escala de la salida, 2..{motor_numpy.MAX_FACTOR} (por defecto 2)")
+    parser.add_argument("--threads", type=int, default=1,
+                        help='hilos del kernel por proceso para "full" con --motor so/asm '
+                             '(por defecto 1: ya hay un proceso por núcleo; 0 = uno por CPU)')
+    parser.add_argument("--conversion", choices=conversion.BACKENDS, default="pillow")
+    parser.add_argument("--packed", action="store_true",
+                        help="un solo archivo por imagen con todos los cuadrantes")
+    args = parser.parse_args(argv)
+
+    width, height, grid = motor_numpy.IMG_SIZE, motor_numpy.IMG_SIZE, motor_numpy.GRID
+    if args.size:
+        if len(args.size) not in (2, 3):
+            parser.error("--size espera ANCHO ALTO [GRID]")
+        width, height = args.size[:2]
+        if len(args.size) == 3:
+            grid = args.size[2]
+    try:
+        motor_numpy.tile_shape((height, width), grid)
+        motor_numpy.phase_weights(args.factor)
+        if args.spec != "full":
+            motor_numpy.parse_quadrant_spec(args.spec, grid)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.threads < 0:
+        parser.error("--threads espera 0 (uno por CPU) o más")
+
+    # El motor se revisa acá: si falla en los procesos del pool, el lote muere
+    # con BrokenProcessPool y ya creó la carpeta de salida y checksums.csv
+    if args.motor == "so":
+        import motor_so
+        if not motor_so.available():
+            parser.error(f"--motor so: no se puede cargar {motor_so.LIB_PATH}")
+    elif args.motor == "asm":
+        import motor_worker
+        if not motor_worker.available():        # Compila ./procesamiento si hace falta
+            parser.error(f"--motor asm: {motor_worker.EXEC_PATH} no está disponible "
+                         f"(no se pudo compilar o no responde a --server)")
+
+    return args, {
+        "spec": args.spec, "output": args.output, "motor": args.motor,
+        "width": width, "height": height, "grid": grid, "factor": args.factor,
+        "threads": args.threads,
+        "conversion": args.conversion, "packed": args.packed,
+    }
+
+
+def main(argv=None):
+    args, options = parse_args(sys.argv[1:] if argv is None else argv)
+    items = find_images(args.source)
+    if not items:
+        print(f"No se encontraron imágenes en {args.source}")
+        sys.exit(1)
+
+    os.makedirs(args.output, exist_ok=True)
+    jobs = max(1, min(args.jobs, len(items)))
+    totals = dict.fromkeys(STAGES, 0.0)
+    done = failed = 0
+    chunksize = max(1, min(32, len(items) // (jobs * 4)))
+
+    start = time.perf_counter()
+    with open(os.path.join(args.output, "checksums.csv"), "w") as manifest, \
+            ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                initargs=(options,)) as pool:
+        manifest.write("imagen,cuadrante,checksum_entrada,checksum_salida,firma_entrada,firma_salida\n")
+        for rel, times, csums, error in pool.map(process_image, items, chunksize=chunksize):
+            if error:
+                failed += 1
+                print(f"Error en {rel}: {error}", file=sys.stderr)
+                continue
+            done += 1
+            for stage in STAGES:
+                totals[stage] += times[stage]
+            for quadrant, *values in csums:
+                manifest.write(f"{rel},{quadrant}," + ",".join(f"0x{v:016X}" for v in values) + "\n")
+            if done % 1000 == 0:
+                print(f"{done}/{len(items)} imágenes...")
+    elapsed = time.perf_counter() - start
+
+    print(f"Imágenes: {done} procesadas, {failed} con error, {jobs} procesos, motor {args.motor}")
+    print(f"Tiempo total: {elapsed:.2f} s  =>  {done / elapsed:.1f} imágenes/s")
+    for stage in STAGES:
+        per_image = totals[stage] / done * 1000.0 if done else 0.0
+        print(f"  {stage:<10} {per_image:8.2f} ms/imagen  ({totals[stage]:.2f} s sumando procesos)")
+    print(f"Salida en {args.output}/ (checksums en checksums.csv)")
+    if failed:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# ---------------------------
+# MOTOR NUMPY (referencia en Python del kernel de procesamiento.asm)
+# ---------------------------
+"""
+Implementa en NumPy exactamente la misma aritmética entera que el bucle
+interp_inner_col de procesamiento.asm, sin lanzar procesos ni tocar disco:
+
+    (row*2,   col*2)   => A
+    (row*2+1, col*2)   => (3A + B) >> 2
+    (row*2,   col*2+1) => (3A + C) >> 2
+    (row*2+1, col*2+1) => (A + B + C + D) >> 2
+
+con el mismo "clamp" en la última fila/columna (99): si no existe r+1 o c+1
+se repite la fila/columna actual. El resultado es idéntico byte a byte al
+imagen_out.img del ensamblador y los checksums son los mismos.
+
+Las dimensiones no son fijas: una imagen (alto, ancho) con grid x grid
+cuadrantes tiene sub-bloques de (alto // grid, ancho // grid), igual que la
+línea "size ANCHO ALTO GRID" de config.txt. 400x400 y 4x4 son los valores
+por defecto.
+
+El factor de escala también es configurable (2..MAX_FACTOR, línea
+"factor N" de config.txt): con N != 2 cada píxel da un bloque N x N con la
+bilineal entera de interpolate_nx. Con N = 2 se usa interpolate_2x tal cual.
+
+Al lado de cada checksum (suma de bytes) puede ir la firma (checksum_wsum):
+suma de (i + 1) * byte_i módulo 2^64, que sí cambia si se reordenan bytes.
+"""
+
+import sys
+import numpy as np
+
+# Dimensiones por defecto del flujo original (imagen 400x400, grilla 4x4, bloques 100x100)
+IMG_SIZE = 400
+GRID = 4
+TILE = IMG_SIZE // GRID
+
+# Versión de la aritmética del kernel (la misma en procesamiento.asm, libprocesamiento
+# y este módulo). Forma parte de las claves de cache.py: subirla si cambia el resultado.
+KERNEL_VERSION = 1
+
+# Factores de escala soportados (igual que KERNEL_MAX_FACTOR de interpolacion.inc)
+FACTOR = 2
+MAX_FACTOR = 8
+
+# Pesos por fase de cada factor (phase_weights), se calculan una sola vez
+_PHASE_WEIGHTS = {}
+
+# Firma (checksum_wsum): tramos de WSUM_BLOCK bytes (como wsum_add en interpolacion.inc)
+WSUM_BLOCK = 65536
+WSUM_MASK = (1 << 64) - 1
+_WSUM_WEIGHTS = np.arange(1, WSUM_BLOCK + 1, dtype=np.uint64)
+
+
+def tile_shape(shape, grid=GRID):
+    """
+    Forma (alto, ancho) del sub-bloque de una imagen 'shape' dividida en
+    grid x grid cuadrantes (lo que sobra de la división queda fuera, como en
+    setup_geometry del ensamblador).
+    """
+    height, width = shape[:2]
+    if grid < 1 or height < grid or width < grid:
+        raise ValueError(f"No se puede dividir una imagen {width}x{height} en {grid}x{grid} cuadrantes")
+    return height // grid, width // grid
+
+
+def quadrant_origin(quadrant, tile=TILE, grid=GRID):
+    """
+    Convierte el cuadrante (1..grid*grid) en la esquina superior izquierda (y, x) en píxeles,
+    igual que el 'dec eax / div edi' del ensamblador.
+    - tile: lado del sub-bloque, o (alto, ancho) si no es cuadrado.
+    """
+    if quadrant < 1 or quadrant > grid * grid:
+        raise ValueError(f"Cuadrante fuera de 1..{grid * grid}: {quadrant}")
+    tile_h, tile_w = tile if isinstance(tile, tuple) else (tile, tile)
+    row, col = divmod(quadrant - 1, grid)
+    return row * tile_h, col * tile_w
+
+
+def extract_quadrant(frame, quadrant, tile=None, grid=GRID):
+    """
+    Devuelve una vista (sin copiar) del sub-bloque del cuadrante pedido.
+    Sin 'tile' se calcula a partir de la forma del frame (tile_shape).
+    """
+    if tile is None:
+        tile = tile_shape(frame.shape, grid)
+    tile_h, tile_w = tile if isinstance(tile, tuple) else (tile, tile)
+    y, x = quadrant_origin(quadrant, (tile_h, tile_w), grid)
+    return frame[y:y + tile_h, x:x + tile_w]
+
+
+def interpolate_2x(sub, out=None):
+    """
+    Interpolación 2x del sub-bloque (uint8, forma (h, w)) => (2h, 2w).
+    - out: arreglo uint8 (2h, 2w) opcional para reutilizar memoria entre llamadas.
+    """
+    h, w = sub.shape
+    if out is None:
+        out = np.empty((2 * h, 2 * w), dtype=np.uint8)
+
+    # Trabajamos en 16 bits: 3*255 + 255 = 1020 no cabe en un byte
+    a = sub.astype(np.uint16)
+
+    # B = fila siguiente, C = columna siguiente (con clamp en el borde)
+    b = np.empty_like(a)
+    b[:-1] = a[1:]
+    b[-1] = a[-1]
+
+    c = np.empty_like(a)
+    c[:, :-1] = a[:, 1:]
+    c[:, -1] = a[:, -1]
+
+    # A + C de cada fila sirve dos veces: B + D es la misma suma en la fila siguiente
+    s = a + c
+    s_next = np.empty_like(s)
+    s_next[:-1] = s[1:]
+    s_next[-1] = s[-1]
+
+    a3 = a * 3
+
+    out[0::2, 0::2] = sub
+    out[1::2, 0::2] = (a3 + b) >> 2
+    out[0::2, 1::2] = (a3 + c) >> 2
+    out[1::2, 1::2] = (s + s_next) >> 2
+    return out
+
+
+def phase_weights(factor):
+    """
+    Pesos enteros (wA, wB, wC, wD) de las factor x factor fases, forma
+    (factor, factor, 4): el píxel de la fase (i, j) es
+    (wA*A + wB*B + wC*C + wD*D) // (N*N), con N = factor.
+    - N >= 3, bilineal por fases:
+        wA = (N-i)(N-j), wB = i(N-j), wC = (N-i)j, wD = ij   (suman N*N)
+      Son productos de los pesos de cada eje (N-i, i) x (N-j, j): interpolate_nx
+      e interpnx_tile los aplican en dos pasadas separadas.
+    - N = 2, la aritmética original de interpolate_2x (no es la bilineal con
+      N = 2, ni separable): (4,0,0,0), (3,0,1,0) / (3,1,0,0), (1,1,1,1), o sea
+      A, (3A+C)>>2 / (3A+B)>>2, (A+B+C+D)>>2. Son los pesos que usa de verdad
+      la escala 2x.
+    """
+    if not 2 <= factor <= MAX_FACTOR:
+        raise ValueError(f"Factor fuera de 2..{MAX_FACTOR}: {factor}")
+    weights = _PHASE_WEIGHTS.get(factor)
+    if weights is None and factor == 2:
+        weights = np.array([[(4, 0, 0, 0), (3, 0, 1, 0)],
+                            [(3, 1, 0, 0), (1, 1, 1, 1)]], dtype=np.uint32)
+        weights.flags.writeable = False
+        _PHASE_WEIGHTS[factor] = weights
+    if weights is None:
+        i = np.arange(factor, dtype=np.uint32).reshape(-1, 1)
+        j = np.arange(factor, dtype=np.uint32).reshape(1, -1)
+        n = np.uint32(factor)
+        weights = np.stack(np.broadcast_arrays((n - i) * (n - j), i * (n - j),
+                                               (n - i) * j, i * j), axis=-1)
+        weights.flags.writeable = False
+        _PHASE_WEIGHTS[factor] = weights
+    return weights
+
+
+def interpolate_nx(sub, factor=FACTOR, out=None):
+    """
+    Interpolación por un factor entero (uint8, forma (h, w)) => (factor*h, factor*w).
+    El píxel (r*N+i, c*N+j) es (wA*A + wB*B + wC*C + wD*D) // (N*N) con los
+    pesos de phase_weights y el mismo clamp que interpolate_2x, calculado en
+    dos pasadas como interpnx_tile: cada fila se expande en horizontal una
+    sola vez, H[r, c*N+j] = (N-j)*A + j*C, y la fila de salida r*N+i es
+    ((N-i)*H[r] + i*H[r+1]) // (N*N).
+    Con factor 2 es interpolate_2x (pesos 3:1, la aritmética original, que
+    no es esta bilineal: ver phase_weights). El selector 2x/3x/4x cambia
+    entonces de esquema, no solo de escala.
+    - out: arreglo uint8 (factor*h, factor*w) opcional.
+    """
+    if factor == 2:
+        return interpolate_2x(sub, out)
+    phase_weights(factor)  # Valida el factor
+    h, w = sub.shape
+    if out is None:
+        out = np.empty((factor * h, factor * w), dtype=np.uint8)
+
+    # 32 bits: 255 * 8 * 8 = 16320 no cabe en un byte
+    a = sub.astype(np.uint32)
+    c = np.empty_like(a)
+    c[:, :-1] = a[:, 1:]
+    c[:, -1] = a[:, -1]
+
+    # Pasada horizontal: una fila H por fila de sub
+    hrow = np.empty((h, factor * w), dtype=np.uint32)
+    for j in range(factor):
+        hrow[:, j::factor] = (factor - j) * a + j * c
+    hnext = np.empty_like(hrow)
+    hnext[:-1] = hrow[1:]
+    hnext[-1] = hrow[-1]
+
+    # Pasada vertical
+    area = factor * factor
+    for i in range(factor):
+        out[i::factor] = ((factor - i) * hrow + i * hnext) // area
+    return out
+
+
+def checksum(arr):
+    """
+    Suma de todos los bytes en 64 bits (mismo valor que csum_sub_* / csum_interp_*).
+    """
+    return int(arr.sum(dtype=np.uint64))
+
+
+def checksum_wsum(arr, start=0):
+    """
+    Firma de los bytes de arr en orden de filas: suma de (start + i + 1) * byte_i
+    módulo 2^64 (mismo valor que checksum_wsum / csums[2..3] del kernel).
+    - start: posición del primer byte, para firmar una imagen por pedazos:
+      checksum_wsum(a) + checksum_wsum(b, len(a)) == checksum_wsum(a + b) (mod 2^64)
+    """
+    data = np.ascontiguousarray(arr).reshape(-1).view(np.uint8)
+    total = 0
+    for i in range(0, data.size, WSUM_BLOCK):
+        block = data[i:i + WSUM_BLOCK]
+        local = int(np.dot(block, _WSUM_WEIGHTS[:block.size]))
+        total += local + (start + i) * int(block.sum(dtype=np.uint64))
+    return total & WSUM_MASK
+
+
+def process_quadrant(frame, quadrant, out=None, grid=GRID, factor=FACTOR):
+    """
+    Hace lo mismo que ./procesamiento para un cuadrante, pero en memoria:
+    - frame: arreglo uint8 (alto, ancho), (400, 400) en el flujo original
+    - grid: la imagen se divide en grid x grid cuadrantes
+    - factor: escala de la salida (factor*tile_h, factor*tile_w)
+    Devuelve (sub_bloque, imagen_interpolada, checksum_sub, checksum_interp).
+    """
+    sub = extract_quadrant(frame, quadrant, grid=grid)
+    final = interpolate_nx(sub, factor, out)
+    return sub, final, checksum(sub), checksum(final)
+
+
+def process_full(frame, out=None, factor=FACTOR, wsum=False):
+    """
+    Modo imagen completa ("full"): interpola el frame entero de una vez, así en
+    los bordes internos de los cuadrantes se usan los vecinos reales y solo hay
+    clamp en el borde de la imagen (sin costuras al unir 16 bloques).
+    - frame: arreglo uint8 (alto, ancho) => (2*alto, 2*ancho); (400, 400) => (800, 800)
+      (factor*alto, factor*ancho con otro factor)
+    Devuelve (imagen_interpolada, checksum_frame, checksum_interp); con wsum=True
+    agrega (firma_frame, firma_interp).
+    """
+    final = interpolate_nx(frame, factor, out)
+    if wsum:
+        return final, checksum(frame), checksum(final), checksum_wsum(frame), checksum_wsum(final)
+    return final, checksum(frame), checksum(final)
+
+
+def parse_quadrant_spec(spec, grid=GRID):
+    """
+    Interpreta la segunda línea de config.txt en modo lote (igual que
+    parse_quadrant_list del ensamblador):
+    - "all"      => [1, 2, ..., grid*grid]
+    - "1,5,16"   => [1, 5, 16]
+    - "7"        => [7]
+    Lanza ValueError si la lista está mal escrita o un cuadrante se sale de 1..grid*grid.
+    """
+    spec = spec.strip()
+    if spec == "all":
+        return list(range(1, grid * grid + 1))
+    quadrants = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item.isdigit():
+            raise ValueError(f"Lista de cuadrantes mal escrita: {spec!r}")
+        quadrant_origin(int(item), grid=grid)
+        quadrants.append(int(item))
+    if len(quadrants) > grid * grid:
+        raise ValueError(f"Como mucho {grid * grid} cuadrantes por lote")
+    return quadrants
+
+
+def process_batch(frame, quadrants, out=None, engine=None, grid=GRID, factor=FACTOR,
+                  wsum=False):
+    """
+    Modo lote en memoria: una sola imagen, varios cuadrantes.
+    - out: arreglo uint8 (n, factor*tile_h, factor*tile_w) opcional (el "packed" del
+      ensamblador; (n, 200, 200) con las dimensiones por defecto)
+    - engine: módulo con process_quadrant (motor_numpy por defecto; sirve motor_so)
+    - wsum: agrega a cada par las firmas (firma_sub, firma_interp)
+    Devuelve (bloques, [(checksum_sub, checksum_interp), ...]) en el orden de quadrants.
+    """
+    engine = engine or sys.modules[__name__]
+    if out is None:
+        tile_h, tile_w = tile_shape(frame.shape, grid)
+        out = np.empty((len(quadrants), factor * tile_h, factor * tile_w), dtype=np.uint8)
+    csums = []
+    for i, quadrant in enumerate(quadrants):
+        sub, final, csum_sub, csum_interp = engine.process_quadrant(frame, quadrant, out=out[i],
+                                                                    grid=grid, factor=factor)
+        if wsum:
+            csums.append((csum_sub, csum_interp, checksum_wsum(sub), checksum_wsum(final)))
+        else:
+            csums.append((csum_sub, csum_interp))
+    return out, csums
+
+
+def main():
+    """
+    Uso: python3 motor_numpy.py <imagen_in.img> <cuadrante | all | 1,5,16 | full>
+                                [packed] [size ANCHO ALTO [GRID]] [factor N]
+    Genera imagen_out.img (o imagen_out_XX.img / imagen_out_lote.img en modo
+    lote, imagen_out_full.img con "full") e imprime los mismos mensajes que el ensamblador,
+    para poder comparar ambas salidas. Las opciones son las mismas líneas
+    opcionales de config.txt.
+    """
+    usage = ("Uso: python3 motor_numpy.py <imagen_in.img> <cuadrante | all | 1,5,16 | full> "
+             "[packed] [size ANCHO ALTO [GRID]] [factor N]")
+    if len(sys.argv) < 3:
+        print(usage)
+        sys.exit(1)
+
+    width, height, grid, packed, factor = IMG_SIZE, IMG_SIZE, GRID, False, FACTOR
+    opts = sys.argv[3:]
+    try:
+        while opts:
+            opt = opts.pop(0)
+            if opt == "packed":
+                packed = True
+            elif opt == "size":
+                width, height = int(opts.pop(0)), int(opts.pop(0))
+                if opts and opts[0].isdigit():
+                    grid = int(opts.pop(0))
+            elif opt == "factor":
+                factor = int(opts.pop(0))
+            else:
+                raise ValueError(opt)
+        tile_shape((height, width), grid)
+        phase_weights(factor)
+    except (IndexError, ValueError):
+        print(usage)
+        sys.exit(1)
+
+    data = np.fromfile(sys.argv[1], dtype=np.uint8, count=width * height)
+    if data.size != width * height:
+        print(f"Error: se esperaban {width * height} bytes, hay {data.size}.")
+        sys.exit(12)
+    frame = data.reshape((height, width))
+
+    if sys.argv[2] == "full":
+        final, csum_frame, csum_interp = process_full(frame, factor=factor)
+        final.tofile("imagen_out_full.img")
+        print(f"Bytes leidos (hex): 0x{data.size:016X}")
+        print(f"Checksum imagen original (hex): 0x{csum_frame:016X}")
+        print(f"Checksum imagen interpolada (hex): 0x{csum_interp:016X}")
+        print("Procesamiento finalizado. Se genero imagen_out_full.img")
+        return
+
+    if sys.argv[2] == "all" or "," in sys.argv[2]:
+        main_batch(frame, data.size, sys.argv[2], packed, grid, factor)
+        return
+
+    try:
+        _, final, csum_sub, csum_interp = process_quadrant(frame, int(sys.argv[2]), grid=grid, factor=factor)
+    except ValueError:
+        print("Error: config.txt malescrito o cuadrante invalido.")
+        sys.exit(1)
+    final.tofile("imagen_out.img")
+
+    print(f"Bytes leidos (hex): 0x{data.size:016X}")
+    print(f"Checksum sub-bloque (hex): 0x{csum_sub:016X}")
+    print(f"Checksum imagen interpolada (hex): 0x{csum_interp:016X}")
+    print("Procesamiento finalizado. Se genero imagen_out.img")
+
+
+
+def main_batch(frame, nbytes, spec, packed, grid=GRID, factor=FACTOR):
+    """
+    Modo lote de main(): mismos archivos y mensajes que batch_run del ensamblador.
+    """
+    try:
+        quadrants = parse_quadrant_spec(spec, grid)
+    except ValueError:
+        print("Error: config.txt malescrito o cuadrante invalido.")
+        sys.exit(1)
+
+    blocks, csums = process_batch(frame, quadrants, grid=grid, factor=factor)
+    if packed:
+        blocks.tofile("imagen_out_lote.img")
+    else:
+        for quadrant, block in zip(quadrants, blocks):
+            block.tofile(f"imagen_out_{quadrant:02d}.img")
+
+    print(f"Bytes leidos (hex): 0x{nbytes:016X}")
+    for quadrant, (csum_sub, csum_interp) in zip(quadrants, csums):
+        print(f"Cuadrante: {quadrant:02d}")
+        print(f"Checksum sub-bloque (hex): 0x{csum_sub:016X}")
+        print(f"Checksum imagen interpolada (hex): 0x{csum_interp:016X}")
+    print("Procesamiento por lotes finalizado.")
+
+
+if __name__ == "__main__":
+    main()
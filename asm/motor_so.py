@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# ---------------------------
+# MOTOR SO (kernel ensamblador como biblioteca compartida, vía ctypes)
+# ---------------------------
+"""
+Carga libprocesamiento.so (compilado desde libprocesamiento.asm) y llama al
+kernel ensamblador directamente sobre arreglos de NumPy:
+- sin fork/exec de ./procesamiento
+- sin config.txt, imagen_in.img ni imagen_out.img
+
+Compilar la biblioteca (en la carpeta asm/):
+    nasm -f elf64 libprocesamiento.asm -o libprocesamiento.o
+    ld -shared libprocesamiento.o -o libprocesamiento.so
+
+La interfaz es la misma que motor_numpy (process_quadrant, process_batch,
+process_full, interpolate_2x, interpolate_nx, checksum), así que se pueden
+intercambiar. process_full usa process_frame: la imagen se interpola en bandas
+de filas en paralelo (hilos del kernel, ver set_threads).
+Con wsum=True, process_full y process_batch devuelven también las firmas
+(checksum_wsum), que el kernel suma en la misma pasada que la interpolación
+(process_frame_wsum / process_quadrant_wsum); sin wsum no se calculan.
+"""
+
+import os
+import ctypes
+import threading
+import numpy as np
+
+LIB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "libprocesamiento.so")
+
+# Cuadrícula por defecto (imagen 400x400 en 4x4 cuadrantes de 100x100); las
+# funciones con 'grid' fijan la geometría del kernel según la forma del frame
+# (kernel_set_geometry)
+GRID = 4
+
+# Factor de escala por defecto; las funciones con 'factor' lo fijan en el
+# kernel (kernel_set_factor) antes de interpolar
+FACTOR = 2
+
+_lib = None
+
+# El factor (kernel_set_factor) y la geometría (kernel_set_geometry) son
+# estado global del kernel: se fijan en una llamada de ctypes y se usan en
+# otra, y ctypes suelta el GIL entre las dos. Con dos hilos y valores
+# distintos uno interpolaría con el factor o los cuadrantes del otro y leería
+# o escribiría fuera de sus arreglos. Cada "fijar + llamar" va entero bajo
+# este lock.
+_kernel_lock = threading.RLock()
+
+
+def load(path=LIB_PATH):
+    """
+    Carga la biblioteca (una sola vez) y declara las firmas de las funciones.
+    Lanza OSError si libprocesamiento.so no existe o no se puede cargar.
+    """
+    global _lib
+    if _lib is not None:
+        return _lib
+
+    lib = ctypes.CDLL(path)
+    u8p = ctypes.c_void_p
+    u64 = ctypes.c_uint64
+
+    lib.checksum_bytes.argtypes = [u8p, u64]
+    lib.checksum_bytes.restype = u64
+
+    lib.extract_quadrant.argtypes = [u8p, u64, ctypes.c_uint32, u8p]
+    lib.extract_quadrant.restype = ctypes.c_int64
+
+    lib.interp2x_tile.argtypes = [u8p, u64, u64, u64, u8p, u64]
+    lib.interp2x_tile.restype = ctypes.c_int64
+
+    lib.interp2x.argtypes = [u8p, u64, ctypes.c_uint32, u8p]
+    lib.interp2x.restype = ctypes.c_int64
+
+    lib.process_quadrant.argtypes = [u8p, u64, ctypes.c_uint32, u8p, u8p, ctypes.POINTER(u64)]
+    lib.process_quadrant.restype = ctypes.c_int64
+
+    lib.kernel_set_mode.argtypes = [ctypes.c_int32]
+    lib.kernel_set_mode.restype = ctypes.c_int32
+    lib.kernel_get_mode.argtypes = []
+    lib.kernel_get_mode.restype = ctypes.c_int32
+
+    lib.kernel_set_geometry.argtypes = [ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32]
+    lib.kernel_set_geometry.restype = ctypes.c_int64
+
+    lib.kernel_set_factor.argtypes = [ctypes.c_uint32]
+    lib.kernel_set_factor.restype = ctypes.c_int64
+
+    lib.interpnx_tile.argtypes = [u8p, u64, u64, u64, u8p, u64]
+    lib.interpnx_tile.restype = ctypes.c_int64
+
+    lib.kernel_set_threads.argtypes = [ctypes.c_uint32]
+    lib.kernel_set_threads.restype = ctypes.c_int64
+
+    lib.process_frame.argtypes = [u8p, u64, u64, u8p, ctypes.POINTER(u64)]
+    lib.process_frame.restype = ctypes.c_int64
+
+    lib.checksum_wsum.argtypes = [u8p, u64]
+    lib.checksum_wsum.restype = u64
+
+    lib.process_quadrant_wsum.argtypes = [u8p, u64, ctypes.c_uint32, u8p, u8p, ctypes.POINTER(u64)]
+    lib.process_quadrant_wsum.restype = ctypes.c_int64
+
+    lib.process_frame_wsum.argtypes = [u8p, u64, u64, u8p, ctypes.POINTER(u64)]
+    lib.process_frame_wsum.restype = ctypes.c_int64
+
+    # CPUID y kernel_mul_lut una vez acá, antes de que la usen varios hilos
+    # (checksum e interpolate_2x no toman _kernel_lock)
+    lib.kernel_get_mode()
+    _lib = lib
+    return lib
+
+
+def available():
+    """
+    True si libprocesamiento.so se puede cargar.
+    """
+    try:
+        load()
+        return True
+    except OSError:
+        return False
+
+
+def set_simd(enabled):
+    """
+    Activa (True) o desactiva (False) la ruta SSE2 del kernel. Sin SSE2 en el
+    procesador queda siempre la escalar. Devuelve True si quedó activa la SSE2.
+    """
+    return load().kernel_set_mode(1 if enabled else 0) == 1
+
+
+def simd_enabled():
+    """
+    True si el kernel está usando la ruta SSE2 (elegida por CPUID al cargar).
+    """
+    return load().kernel_get_mode() == 1
+
+
+def set_threads(threads=0):
+    """
+    Hilos que usa process_full (0 = uno por CPU disponible, el valor por
+    defecto). Devuelve cuántos se usarán.
+    """
+    return int(load().kernel_set_threads(threads))
+
+
+def _rows(arr):
+    """
+    El kernel recorre filas de bytes contiguos separadas por un stride.
+    Devuelve (arreglo, stride) garantizando uint8 y columnas contiguas.
+    """
+    if arr.dtype != np.uint8 or arr.ndim != 2 or arr.strides[1] != 1:
+        arr = np.ascontiguousarray(arr, dtype=np.uint8)
+    return arr, arr.strides[0]
+
+
+def _frame(frame, grid=GRID):
+    """
+    Imagen completa para los cuadrantes: fija la geometría del kernel según su
+    forma y 'grid'. Devuelve (arreglo, stride, (tile_h, tile_w)). Hay que
+    llamarla con _kernel_lock tomado, hasta terminar la llamada que la usa.
+    """
+    frame, stride = _rows(frame)
+    height, width = frame.shape
+    if load().kernel_set_geometry(width, height, grid) != 0:
+        raise ValueError(f"No se puede dividir una imagen {width}x{height} en {grid}x{grid} cuadrantes")
+    return frame, stride, (height // grid, width // grid)
+
+
+def _factor(factor):
+    """
+    Fija el factor de escala del kernel (kernel_set_factor). Hay que llamarla
+    con _kernel_lock tomado, hasta terminar la llamada que lo usa.
+    """
+    if load().kernel_set_factor(factor) != 0:
+        raise ValueError(f"Factor de escala inválido: {factor}")
+
+
+def _out(out, shape):
+    """
+    Valida (o crea) el buffer de salida: uint8, C-contiguo y con la forma pedida.
+    """
+    if out is None:
+        return np.empty(shape, dtype=np.uint8)
+    if out.shape != shape or out.dtype != np.uint8 or not out.flags.c_contiguous:
+        raise ValueError(f"El buffer de salida debe ser uint8 {shape} contiguo")
+    return out
+
+
+def checksum(arr):
+    """
+    Suma de bytes en 64 bits, calculada por checksum_bytes.
+    """
+    arr = np.ascontiguousarray(arr, dtype=np.uint8)
+    return int(load().checksum_bytes(arr.ctypes.data, arr.size))
+
+
+def checksum_wsum(arr):
+    """
+    Firma (suma de (i + 1) * byte_i módulo 2^64), calculada por checksum_wsum.
+    """
+    arr = np.ascontiguousarray(arr, dtype=np.uint8)
+    return int(load().checksum_wsum(arr.ctypes.data, arr.size))
+
+
+def interpolate_2x(sub, out=None):
+    """
+    Interpolación 2x de un bloque cualquiera (h, w) => (2h, 2w) con interp2x_tile.
+    """
+    sub, stride = _rows(sub)
+    h, w = sub.shape
+    out = _out(out, (2 * h, 2 * w))
+    load().interp2x_tile(sub.ctypes.data, stride, w, h, out.ctypes.data, 2 * w)
+    return out
+
+
+def interpolate_nx(sub, factor=FACTOR, out=None):
+    """
+    Interpolación por un factor entero (h, w) => (factor*h, factor*w) con
+    interpnx_tile (con factor 2 es interp2x_tile).
+    """
+    sub, stride = _rows(sub)
+    h, w = sub.shape
+    out = _out(out, (factor * h, factor * w))
+    with _kernel_lock:
+        _factor(factor)
+        load().interpnx_tile(sub.ctypes.data, stride, w, h, out.ctypes.data, factor * w)
+    return out
+
+
+def interpolate_quadrant(frame, quadrant, out=None, grid=GRID):
+    """
+    Interpola 2x el cuadrante (1..grid*grid) leyendo directamente de la imagen completa.
+    """
+    with _kernel_lock:
+        frame, stride, (tile_h, tile_w) = _frame(frame, grid)
+        out = _out(out, (2 * tile_h, 2 * tile_w))
+        if load().interp2x(frame.ctypes.data, stride, quadrant, out.ctypes.data) != 0:
+            raise ValueError(f"Cuadrante fuera de 1..{grid * grid}: {quadrant}")
+    return out
+
+
+def process_quadrant(frame, quadrant, out=None, sub=None, grid=GRID, factor=FACTOR):
+    """
+    Equivalente en memoria de ./procesamiento (misma interfaz que motor_numpy):
+    Devuelve (sub_bloque, imagen_interpolada, checksum_sub, checksum_interp).
+    """
+    with _kernel_lock:
+        _factor(factor)
+        frame, stride, (tile_h, tile_w) = _frame(frame, grid)
+        sub = _out(sub, (tile_h, tile_w))
+        out = _out(out, (factor * tile_h, factor * tile_w))
+        csums = (ctypes.c_uint64 * 2)()
+        ret = load().process_quadrant(frame.ctypes.data, stride, quadrant,
+                                      sub.ctypes.data, out.ctypes.data, csums)
+    if ret != 0:
+        raise ValueError(f"Cuadrante fuera de 1..{grid * grid}: {quadrant}")
+    return sub, out, int(csums[0]), int(csums[1])
+
+
+def process_batch(frame, quadrants, out=None, grid=GRID, factor=FACTOR, wsum=False):
+    """
+    Modo lote (misma interfaz que motor_numpy.process_batch): el kernel
+    ensamblador procesa cada cuadrante sobre la misma imagen en memoria.
+    Devuelve (bloques (n, factor*tile_h, factor*tile_w), [(checksum_sub, checksum_interp), ...]);
+    con wsum=True cada tupla lleva además (firma_sub, firma_interp), de process_quadrant_wsum.
+    """
+    kernel = load().process_quadrant_wsum if wsum else load().process_quadrant
+    values = (ctypes.c_uint64 * 4)()
+    count = 4 if wsum else 2
+    csums = []
+    with _kernel_lock:
+        _factor(factor)
+        frame, stride, (tile_h, tile_w) = _frame(frame, grid)
+        out = _out(out, (len(quadrants), factor * tile_h, factor * tile_w))
+        sub = np.empty((tile_h, tile_w), dtype=np.uint8)
+        for i, quadrant in enumerate(quadrants):
+            ret = kernel(frame.ctypes.data, stride, quadrant, sub.ctypes.data, out[i].ctypes.data, values)
+            if ret != 0:
+                raise ValueError(f"Cuadrante fuera de 1..{grid * grid}: {quadrant}")
+            csums.append(tuple(int(v) for v in values[:count]))
+    return out, csums
+
+
+def process_full(frame, out=None, factor=FACTOR, wsum=False):
+    """
+    Modo imagen completa (misma interfaz que motor_numpy.process_full):
+    process_frame sobre el frame entero, sin costuras entre cuadrantes, con
+    las bandas repartidas entre los hilos de set_threads.
+    Devuelve (imagen_interpolada, checksum_frame, checksum_interp); con wsum=True
+    agrega (firma_frame, firma_interp), de process_frame_wsum en la misma pasada.
+    """
+    frame = np.ascontiguousarray(frame, dtype=np.uint8)
+    height, width = frame.shape
+    final = _out(out, (factor * height, factor * width))
+    csums = (ctypes.c_uint64 * (4 if wsum else 2))()
+    lib = load()
+    run = lib.process_frame_wsum if wsum else lib.process_frame
+    with _kernel_lock:
+        _factor(factor)
+        run(frame.ctypes.data, width, height, final.ctypes.data, csums)
+    return (final,) + tuple(int(v) for v in csums)
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# ---------------------------
+# MOTOR WORKER (./procesamiento --server residente, pedidos por pipe)
+# ---------------------------
+"""
+Mantiene vivo "./procesamiento --server" y le pasa los pedidos por stdin en
+lugar de lanzar un proceso por imagen (sin fork/exec, sin config.txt ni
+imagen_in.img / imagen_out.img).
+
+Protocolo (little-endian, ver server_run en procesamiento.asm):
+    pedido:    "KJOB" | ancho u32 | alto u32 | grid u8 | factor u8 | cuadrante u16 | imagen
+               (cuadrante 0 = imagen completa, factor 0 = 2)
+    respuesta: "KRES" | estado u32 | ancho u32 | alto u32 |
+               checksum entrada u64 | checksum salida u64 | imagen interpolada
+    con magia "KJBF" la respuesta lleva además firma entrada u64 | firma salida u64
+    (motor_numpy.checksum_wsum) antes de la imagen.
+
+La interfaz es la misma que motor_numpy / motor_so (process_quadrant,
+process_batch, process_full, interpolate_2x, interpolate_nx), así que se pueden
+intercambiar.
+Con wsum=True (process_full, process_batch) se pide "KJBF": la imagen que
+llega por el pipe se suma y se firma pedazo a pedazo mientras se lee, y si no
+coincide con lo que calculó el servidor se lanza WorkerError.
+WorkerPool reparte un lote entre varios workers.
+La imagen completa la interpola el servidor en bandas en paralelo
+(process_frame); 'threads' fija cuántos hilos usa cada worker (variable
+PROCESAMIENTO_HILOS; None = uno por CPU, lo que decida el kernel).
+
+./procesamiento no se versiona: build() lo compila (nasm + ld) si falta o si
+sus fuentes son más nuevas, y available() comprueba que de verdad atienda
+--server antes de usarlo.
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+import motor_numpy
+
+EXEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "procesamiento")
+
+# Fuentes de ./procesamiento (en la misma carpeta que el ejecutable)
+SOURCES = ("procesamiento.asm", "interpolacion.inc")
+
+GRID = motor_numpy.GRID
+FACTOR = motor_numpy.FACTOR
+
+# Límites de setup_geometry en procesamiento.asm (fuera de ellos el servidor sale con 16)
+MAX_GRID = 9
+MAX_DIM = 16384
+
+_JOB = struct.Struct("<4sIIBBH")      # JOB_HEADER_SIZE = 16
+_RESP = struct.Struct("<4sIIIQQ")     # RESP_HEADER_SIZE = 32
+_FIRMAS = struct.Struct("<QQ")        # "KJBF": RESP_WSUM_SIZE = 32 + 16
+
+# Hilos de process_frame en ./procesamiento (0 = uno por CPU disponible)
+THREADS_ENV = "PROCESAMIENTO_HILOS"
+
+# Códigos de salida de ./procesamiento (para los mensajes de error)
+EXIT_CODES = {
+    1: "argumentos inválidos",
+    12: "imagen incompleta",
+    14: "error al escribir la respuesta",
+    15: "sin memoria",
+    16: "pedido mal formado",
+}
+
+
+class WorkerError(RuntimeError):
+    """
+    El proceso del worker terminó o respondió algo inesperado.
+    """
+
+
+def threads_env(threads, env=None):
+    """
+    Copia del entorno (os.environ por defecto) con PROCESAMIENTO_HILOS=threads,
+    para pasar a subprocess. Con threads=None devuelve None (el entorno heredado).
+    """
+    if threads is None:
+        return None
+    env = dict(os.environ if env is None else env)
+    env[THREADS_ENV] = str(int(threads))
+    return env
+
+
+def build(path=EXEC_PATH):
+    """
+    Compila el ejecutable desde procesamiento.asm (nasm -f elf64 + ld) si no
+    existe o si alguna de sus fuentes es más nueva. Devuelve True si quedó al
+    día; False si hacía falta compilar y no se pudo (sin nasm / ld, o con error).
+    """
+    path = os.path.abspath(path)
+    folder = os.path.dirname(path)
+    sources = [os.path.join(folder, name) for name in SOURCES]
+    if not os.path.exists(sources[0]):
+        return os.access(path, os.X_OK)          # Sin fuentes: queda el que haya
+    try:
+        built = os.path.getmtime(path)
+        if all(os.path.getmtime(src) <= built for src in sources if os.path.exists(src)):
+            return True
+    except OSError:
+        pass
+    nasm, ld = shutil.which("nasm"), shutil.which("ld")
+    if not (nasm and ld):
+        return False
+    obj = path + ".o"
+    try:
+        subprocess.run([nasm, "-f", "elf64", sources[0], "-o", obj], cwd=folder,
+                       check=True, capture_output=True)
+        subprocess.run([ld, obj, "-o", path], check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    finally:
+        if os.path.exists(obj):
+            os.remove(obj)
+    return True
+
+
+# Resultado de available() por (ruta, fecha de modificación)
+_probed = {}
+
+
+def available(path=EXEC_PATH):
+    """
+    True si ./procesamiento existe (lo compila build() si hace falta) y atiende
+    --server: se le manda un pedido de 1x1 y tiene que responder "KRES" y salir
+    con 0 al cerrar stdin. Un binario viejo, sin modo servidor, no pasa (se
+    lanza en una carpeta temporal, así no lee el config.txt de la carpeta).
+    El resultado se recuerda mientras el ejecutable no cambie.
+    """
+    path = os.path.abspath(path)
+    build(path)
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        return False
+    if key not in _probed:
+        try:
+            with tempfile.TemporaryDirectory() as folder:
+                result = subprocess.run([path, "--server"], input=_JOB.pack(b"KJOB", 1, 1, 1, 0, 0) + b"\0",
+                                        capture_output=True, cwd=folder, timeout=5)
+            _probed[key] = (result.returncode == 0 and len(result.stdout) == _RESP.size + 4
+                            and result.stdout[:4] == b"KRES")
+        except (OSError, subprocess.TimeoutExpired):
+            _probed[key] = False
+    return _probed[key]
+
+
+class KernelWorker:
+    """
+    Un ./procesamiento --server residente. Se lanza en el primer pedido (o con
+    start()) y se reutiliza; si muere se relanza en el pedido siguiente.
+    Es seguro usarlo desde varios hilos (un pedido a la vez por worker).
+    - threads: hilos del servidor para la imagen completa (None = uno por CPU).
+    """
+    def __init__(self, path=EXEC_PATH, threads=None):
+        self.path = path
+        self.threads = threads
+        self.proc = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """
+        Lanza el proceso si no está corriendo. Lanza OSError si no existe.
+        """
+        if self.proc is None or self.proc.poll() is not None:
+            self.proc = subprocess.Popen([self.path, "--server"], stdin=subprocess.PIPE,
+                                         stdout=subprocess.PIPE, bufsize=0,
+                                         env=threads_env(self.threads))
+        return self
+
+    def set_threads(self, threads):
+        """
+        Cambia los hilos del servidor: se cierra y se relanza en el pedido siguiente.
+        """
+        with self.lock:
+            self.threads = threads
+            self.close()
+
+    def close(self):
+        """
+        Cierra stdin (el servidor sale con 0 al ver EOF) y espera al proceso.
+        Devuelve el código de salida, o None si no estaba corriendo.
+        """
+        proc, self.proc = self.proc, None
+        if proc is None:
+            return None
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            return proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            return proc.wait()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read_into(self, view, verify=False):
+        """
+        Llena 'view' desde stdout del proceso (el pipe entrega pedazos).
+        Con verify=True devuelve (suma, firma) de lo leído, calculadas sobre cada
+        pedazo apenas llega (todavía en caché), sin otra pasada por la imagen.
+        """
+        stdout = self.proc.stdout
+        got = total = firma = 0
+        while got < len(view):
+            n = stdout.readinto(view[got:])
+            if not n:
+                raise EOFError
+            if verify:
+                piece = np.frombuffer(view[got:got + n], dtype=np.uint8)
+                total += motor_numpy.checksum(piece)
+                firma += motor_numpy.checksum_wsum(piece, got)
+            got += n
+        return total & motor_numpy.WSUM_MASK, firma & motor_numpy.WSUM_MASK
+
+    def request(self, frame, quadrant, grid=GRID, out=None, factor=FACTOR, wsum=False):
+        """
+        Envía un pedido y devuelve (imagen_interpolada, checksum_entrada, checksum_salida).
+        - quadrant 0: imagen completa (viaja con grid 1: la cuadrícula no se usa y
+          así vale cualquier imagen de 1x1 en adelante); 1..grid*grid: ese cuadrante.
+        - out: buffer uint8 opcional con la forma de la respuesta (se llena sin copias extra).
+        - factor: escala de la respuesta (2..motor_numpy.MAX_FACTOR).
+        - wsum: pide también las firmas (se agregan firma_entrada, firma_salida) y
+          verifica la salida recibida contra su checksum y su firma (WorkerError si no).
+        Todo pedido se valida antes de enviarlo (ValueError): el servidor aplica
+        setup_geometry también a la imagen completa y un pedido que no pasa
+        termina el proceso (código 16).
+        """
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        height, width = frame.shape
+        motor_numpy.phase_weights(factor)                   # ValueError si el factor no vale
+        if quadrant == 0:
+            grid = 1
+        if not 1 <= grid <= MAX_GRID:
+            raise ValueError(f"Grid fuera de 1..{MAX_GRID}: {grid}")
+        if width > MAX_DIM or height > MAX_DIM:
+            raise ValueError(f"Imagen {width}x{height} mayor que {MAX_DIM}x{MAX_DIM}")
+        tile_h, tile_w = motor_numpy.tile_shape(frame.shape, grid)   # ValueError si queda vacío
+        if quadrant == 0:
+            shape = (factor * height, factor * width)
+        else:
+            motor_numpy.quadrant_origin(quadrant, (tile_h, tile_w), grid)   # ValueError si no existe
+            shape = (factor * tile_h, factor * tile_w)
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8 or not out.flags.c_contiguous:
+            raise ValueError(f"El buffer de salida debe ser uint8 {shape} contiguo")
+
+        with self.lock:
+            self.start()
+            try:
+                # Factor 2 viaja como 0: el mismo encabezado que antes de existir el factor
+                self.proc.stdin.write(_JOB.pack(b"KJBF" if wsum else b"KJOB", width, height, grid,
+                                                0 if factor == 2 else factor, quadrant))
+                self.proc.stdin.write(memoryview(frame).cast("B"))
+                head = bytearray(_RESP.size + (_FIRMAS.size if wsum else 0))
+                self._read_into(memoryview(head))
+                magic, status, out_w, out_h, csum_in, csum_out = _RESP.unpack_from(head)
+                if magic != b"KRES" or status != 0 or (out_h, out_w) != shape:
+                    raise EOFError
+                got = self._read_into(memoryview(out).cast("B"), verify=wsum)
+            except (OSError, EOFError):
+                code = self.close()
+                reason = EXIT_CODES.get(code, f"código {code}")
+                raise WorkerError(f"{self.path} --server terminó ({reason})") from None
+        if not wsum:
+            return out, csum_in, csum_out
+        firma_in, firma_out = _FIRMAS.unpack_from(head, _RESP.size)
+        if got != (csum_out, firma_out):
+            raise WorkerError(f"{self.path} --server: la imagen recibida no coincide con "
+                              f"su checksum/firma (0x{csum_out:016X}/0x{firma_out:016X})")
+        return out, csum_in, csum_out, firma_in, firma_out
+
+    def process_quadrant(self, frame, quadrant, out=None, grid=GRID, factor=FACTOR):
+        """
+        Devuelve (sub_bloque, imagen_interpolada, checksum_sub, checksum_interp).
+        """
+        final, csum_sub, csum_interp = self.request(frame, quadrant, grid, out, factor)
+        sub = motor_numpy.extract_quadrant(frame, quadrant, grid=grid)
+        return sub, final, csum_sub, csum_interp
+
+    def process_full(self, frame, out=None, factor=FACTOR, wsum=False):
+        """
+        Imagen completa: devuelve (imagen_interpolada, checksum_frame, checksum_interp);
+        con wsum=True agrega (firma_frame, firma_interp), ya verificadas.
+        """
+        return self.request(frame, 0, out=out, factor=factor, wsum=wsum)
+
+    def interpolate_2x(self, sub, out=None):
+        """
+        Interpolación 2x de un bloque cualquiera (h, w) => (2h, 2w).
+        """
+        return self.interpolate_nx(sub, 2, out)
+
+    def interpolate_nx(self, sub, factor=FACTOR, out=None):
+        """
+        Interpolación por un factor entero (h, w) => (factor*h, factor*w), de
+        cualquier tamaño (bandas de bandas.py incluidas). Un bloque con un lado
+        mayor que MAX_DIM (el límite del servidor) se manda en pedazos de a lo
+        sumo MAX_DIM - 1 filas/columnas más una de halo (la primera del pedazo
+        siguiente): el borde de cada pedazo usa sus vecinos reales y el
+        resultado es el mismo que de una vez.
+        """
+        sub = np.asarray(sub)
+        height, width = sub.shape
+        if height <= MAX_DIM and width <= MAX_DIM:
+            return self.request(sub, 0, out=out, factor=factor)[0]
+
+        shape = (factor * height, factor * width)
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8:
+            raise ValueError(f"El buffer de salida debe ser uint8 {shape}")
+        step = MAX_DIM - 1
+        for r0 in range(0, height, step):
+            r1 = min(r0 + step, height)
+            for c0 in range(0, width, step):
+                c1 = min(c0 + step, width)
+                piece = self.request(sub[r0:min(r1 + 1, height), c0:min(c1 + 1, width)], 0,
+                                     factor=factor)[0]
+                out[factor * r0:factor * r1, factor * c0:factor * c1] = \
+                    piece[:factor * (r1 - r0), :factor * (c1 - c0)]
+        return out
+
+    def process_batch(self, frame, quadrants, out=None, grid=GRID, factor=FACTOR, wsum=False):
+        """
+        Modo lote: devuelve (bloques (n, factor*tile_h, factor*tile_w), [(checksum_sub, checksum_interp), ...]);
+        con wsum=True cada tupla lleva además (firma_sub, firma_interp).
+        """
+        tile_h, tile_w = motor_numpy.tile_shape(frame.shape, grid)
+        if out is None:
+            out = np.empty((len(quadrants), factor * tile_h, factor * tile_w), dtype=np.uint8)
+        csums = []
+        for i, quadrant in enumerate(quadrants):
+            csums.append(self.request(frame, quadrant, grid, out[i], factor, wsum)[1:])
+        return out, csums
+
+
+class WorkerPool:
+    """
+    Varios KernelWorker residentes; process_batch reparte los cuadrantes entre ellos.
+    """
+    def __init__(self, size=None, path=EXEC_PATH, threads=None):
+        size = size or os.cpu_count() or 1
+        self.workers = [KernelWorker(path, threads) for _ in range(size)]
+        self.executor = ThreadPoolExecutor(max_workers=size)
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+        return self
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        for worker in self.workers:
+            worker.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def process_batch(self, frame, quadrants, out=None, grid=GRID, factor=FACTOR, wsum=False):
+        """
+        Igual que KernelWorker.process_batch, con un cuadrante por worker a la vez.
+        """
+        tile_h, tile_w = motor_numpy.tile_shape(frame.shape, grid)
+        if out is None:
+            out = np.empty((len(quadrants), factor * tile_h, factor * tile_w), dtype=np.uint8)
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        n = len(self.workers)
+        futures = [
+            self.executor.submit(self.workers[i % n].request, frame, quadrant, grid, out[i], factor, wsum)
+            for i, quadrant in enumerate(quadrants)
+        ]
+        csums = [future.result()[1:] for future in futures]
+        return out, csums
@@ -3,6 +3,30 @@
 ; Lee la ruta de la imagen + cuadrante desde config.txt, procesa una imagen
 ; de 400x400, extrae un sub-bloque 100x100, interpola a 200x200 y genera
 ; imagen_out.img.
+; Modo lote: si la segunda línea es "all" o una lista ("1,5,16") procesa
+; todos esos cuadrantes con una sola lectura de la imagen.
+; Modo imagen completa: si la segunda línea es "full" interpola los 400x400
+; de una vez (800x800, sin costuras entre cuadrantes).
+; Dimensiones: 400x400 y cuadrícula 4x4 son los valores por defecto; una línea
+; "size ANCHO ALTO [GRID]" en config.txt los cambia y los buffers se reservan
+; con mmap al arrancar (sub-bloque = ANCHO/GRID x ALTO/GRID).
+; Modo servidor: "./procesamiento --server" no usa config.txt; queda residente
+; atendiendo pedidos (encabezado + imagen) por stdin y respondiendo por stdout.
+; Factor de escala: 2 por defecto; una línea "factor N" en config.txt (o el
+; argumento FACTOR) interpola por N = 2..8 con la bilineal entera de
+; interpnx_tile (salida N*tile x N*tile). Con 2 se usa la ruta 2x original.
+; Modo argumentos: "./procesamiento ENTRADA SALIDA CUADRANTE [ANCHO ALTO [GRID [FACTOR]]]"
+; tampoco usa config.txt; "-" como ENTRADA / SALIDA es stdin / stdout.
+; Modo por bandas: "./procesamiento ENTRADA SALIDA stream ANCHO ALTO [FILAS]"
+; interpola la imagen completa leyendo y escribiendo de a FILAS filas, para
+; imágenes que no entran en memoria.
+; Tiempos: con la variable de entorno PROCESAMIENTO_TIEMPOS=1 el modo de un
+; cuadrante de config.txt y el modo argumentos imprimen además cuánto tardó
+; cada etapa (leer, copiar, interpolar, checksum, escribir), en ns.
+; Hilos: la imagen completa ("full" en cualquier modo) se interpola en bandas
+; de filas en paralelo (process_frame), un hilo por CPU disponible; la
+; variable de entorno PROCESAMIENTO_HILOS=N o una línea "threads N" en
+; config.txt fijan cuántos (0 = automático).
 ; v.final xD
 ; **************************************************************************************************************************************************
 
@@ -46,6 +70,100 @@ section .data
     msg_error_config db "Error: config.txt malescrito o cuadrante invalido.", 10, 0  ;Mensaje de error si el config.txt está mal formateado o el cuadrante es inválido
     
     msg_error_config_end:                      ; Etiqueta para calcular tamaño de msg_error_config
+
+    ; Modo lote (segunda línea de config.txt = "all" o lista "1,5,16")
+    fname_out_batch db "imagen_out_00.img", 0  ;  Un archivo por cuadrante: los dígitos "00" (offsets 11 y 12) se reemplazan por el cuadrante
+
+    fname_out_packed db "imagen_out_lote.img", 0 ;  Archivo único (tercera línea "packed"): N bloques de 200x200 seguidos, en el orden de la lista
+
+    msg_batch_quad db "Cuadrante: 00", 10, 0   ;  Encabezado de los checksums de cada cuadrante (dígitos en offsets 11 y 12)
+
+    msg_batch_quad_end:
+
+    msg_batch_done db "Procesamiento por lotes finalizado.", 10, 0
+
+    msg_batch_done_end:
+
+    ; Modo imagen completa (segunda línea de config.txt = "full")
+    fname_out_full db "imagen_out_full.img", 0 ;  Salida 800x800 de la imagen completa
+
+    msg_checksum_frame db "Checksum imagen original (hex): 0x", 0
+
+    msg_checksum_frame_end:
+
+    msg_firma_frame db "Firma imagen original (hex): 0x", 0     ;  Firma (posición * byte, ver checksum_wsum) de la imagen
+
+    msg_firma_frame_end:
+
+    msg_firma_interp db "Firma imagen interpolada (hex): 0x", 0
+
+    msg_firma_interp_end:
+
+    msg_full_done db "Procesamiento finalizado. Se genero imagen_out_full.img", 10, 0
+
+    msg_full_done_end:
+
+    ; Modo argumentos (./procesamiento ENTRADA SALIDA CUADRANTE [ANCHO ALTO [GRID [FACTOR]]])
+    msg_usage db "Uso: procesamiento ENTRADA|- SALIDA|- CUADRANTE|all|1,5,16|full [ANCHO ALTO [GRID [FACTOR]]]", 10
+              db "     procesamiento ENTRADA|- SALIDA|- stream ANCHO ALTO [FILAS]", 10, 0
+
+    msg_usage_end:
+
+    msg_fd          dq 1               ;  Descriptor de los mensajes (checksums); 2 (stderr) si la imagen sale por stdout
+
+    ; Modo por bandas (stream): filas de entrada por banda
+    STREAM_BAND_ROWS equ 256           ;  Por defecto: 256 filas (memoria = 5*(FILAS+1)*ANCHO bytes)
+    STREAM_MAX_ROWS  equ 65536         ;  Máximo de FILAS
+
+    ; Dimensiones (por defecto las originales; config.txt: "size ANCHO ALTO [GRID]")
+    img_w           dq 400             ;  Ancho de la imagen de entrada
+    img_h           dq 400             ;  Alto de la imagen de entrada
+    grid_n          dq 4               ;  La imagen se divide en grid_n x grid_n cuadrantes
+    factor_n        dq 2               ;  Factor de escala (config.txt: "factor N"); 2 = ruta 2x original
+
+    MAX_GRID        equ 9              ;  Hasta 81 cuadrantes (dos dígitos en imagen_out_XX.img)
+    MAX_DIM         equ 16384          ;  Lado máximo de la imagen de entrada
+
+    POSIX_FADV_SEQUENTIAL equ 2        ;  Aviso de lectura secuencial (sys_fadvise64)
+
+    ; Tiempos por etapa (variable de entorno PROCESAMIENTO_TIEMPOS=1)
+    env_timing db "PROCESAMIENTO_TIEMPOS=1", 0  ;  Se compara con cada cadena de envp (incluido el 0 final)
+
+    ; Hilos de process_frame (variable de entorno PROCESAMIENTO_HILOS=N)
+    env_threads db "PROCESAMIENTO_HILOS="       ;  Prefijo; sigue N (0 = uno por CPU)
+    env_threads_end:
+
+    msg_time_read db "Tiempo leer (ns, hex): 0x", 0
+
+    msg_time_read_end:
+
+    msg_time_copy db "Tiempo copiar (ns, hex): 0x", 0
+
+    msg_time_copy_end:
+
+    msg_time_interp db "Tiempo interpolar (ns, hex): 0x", 0
+
+    msg_time_interp_end:
+
+    msg_time_csum db "Tiempo checksum (ns, hex): 0x", 0
+
+    msg_time_csum_end:
+
+    msg_time_write db "Tiempo escribir (ns, hex): 0x", 0
+
+    msg_time_write_end:
+
+    CLOCK_MONOTONIC  equ 1             ;  Reloj de clock_gettime (no salta si cambia la hora del sistema)
+    TIME_READ        equ 0             ;  Índices en time_acc
+    TIME_COPY        equ 1
+    TIME_INTERP      equ 2
+    TIME_CSUM        equ 3
+    TIME_WRITE       equ 4
+
+    ; Modo servidor (./procesamiento --server): tamaños de los encabezados
+    JOB_HEADER_SIZE  equ 16            ;  Pedido:    "KJOB"/"KJBF", ancho (u32), alto (u32), grid (u8), factor (u8; 0 = 2), cuadrante (u16; 0 = imagen completa)
+    RESP_HEADER_SIZE equ 32            ;  Respuesta: "KRES", estado (u32), ancho (u32), alto (u32), checksum entrada (u64), checksum salida (u64)
+    RESP_WSUM_SIZE   equ 48            ;  Respuesta a "KJBF": lo mismo + firma entrada (u64), firma salida (u64)
     
     
     
@@ -58,15 +176,37 @@ section .data
 
 section .bss            
 
-    buffer          resb 400*400       ;  Buffer de 160000 bytes (400x400) para almacenar la imagen completa
+    buffer          resq 1             ;  Puntero (mmap) a la imagen completa: img_w*img_h bytes (160000 con 400x400)
+
+    quad_buffer     resq 1             ;  Puntero (mmap) al sub-bloque según el cuadrante: tile_w*tile_h bytes (100x100)
+
+    interp_buffer   resq 1             ;  Puntero (mmap) a la imagen interpolada: out_w*out_h bytes (200x200)
+
+    tile_w          resq 1             ;  Ancho del sub-bloque (img_w / grid_n)
+
+    tile_h          resq 1             ;  Alto del sub-bloque (img_h / grid_n)
+
+    tile_last_c     resq 1             ;  Última columna del sub-bloque (tile_w - 1), para el clamp
+
+    tile_last_r     resq 1             ;  Última fila del sub-bloque (tile_h - 1), para el clamp
+
+    out_w           resq 1             ;  Ancho de la imagen interpolada (factor_n*tile_w)
 
-    quad_buffer     resb 100*100       ;  Buffer de 10000 bytes (100x100) para el sub-bloque según el cuadrante
+    out_h           resq 1             ;  Alto de la imagen interpolada (factor_n*tile_h)
 
-    interp_buffer   resb 200*200       ;  Buffer de 40000 bytes (200x200) para la imagen resultante de la interpolación
+    img_bytes       resq 1             ;  img_w*img_h
+
+    tile_bytes      resq 1             ;  tile_w*tile_h
+
+    out_bytes       resq 1             ;  out_w*out_h
+
+    full_bytes      resq 1             ;  (factor_n*img_w)*(factor_n*img_h), modo imagen completa
+
+    quad_max        resd 1             ;  Último cuadrante válido (grid_n*grid_n)
 
     read_count      resq 1             ;  Variable (8 bytes) para almacenar la cantidad de bytes leídos de la imagen original
 
-    quadrant        resd 1             ;  Variable (4 bytes) que contendrá el cuadrante (1..16) leído de config.txt
+    quadrant        resd 1             ;  Variable (4 bytes) que contendrá el cuadrante (1..quad_max) leído de config.txt
 
     row_var         resd 1             ;  Variable (4 bytes) auxiliar para iterar sobre filas en la interpolación
 
@@ -77,12 +217,63 @@ section .bss
     path_buffer     resb 240           ;  Buffer de 240 bytes para guardar la ruta de la imagen leída de config.txt
 
     quad_input      resb 4             ;  Buffer de 4 bytes para almacenar la cadena que representa el cuadrante (ej, "12")
+
+    quad_list       resb MAX_GRID*MAX_GRID ;  Modo lote: cuadrantes a procesar (1..quad_max), en el orden de config.txt
+
+    quad_count      resd 1             ;  Modo lote: cantidad de cuadrantes en quad_list
+
+    batch_mode      resb 1             ;  1 si config.txt pidió varios cuadrantes ("all" o lista)
+
+    packed_mode     resb 1             ;  1 si la salida del lote va empaquetada en imagen_out_lote.img
+
+    batch_csums     resq 4             ;  Checksums (sub-bloque, interpolada) de process_quadrant; + las dos firmas en las versiones *_wsum
+
+    full_mode       resb 1             ;  1 si config.txt pidió la imagen completa ("full")
+
+    full_buffer     resq 1             ;  Puntero (mmap) a la imagen completa interpolada: full_bytes (800x800)
+
+    job_header      resb JOB_HEADER_SIZE   ;  Modo servidor: encabezado del pedido en curso
+
+    resp_header     resb RESP_WSUM_SIZE    ;  Modo servidor: encabezado de la respuesta
+
+    resp_size       resq 1             ;  Modo servidor: bytes del encabezado (RESP_HEADER_SIZE o, con "KJBF", RESP_WSUM_SIZE)
+
+    cap_img         resq 1             ;  Modo servidor: bytes reservados hoy en buffer (se agranda si llega una imagen mayor)
+
+    cap_tile        resq 1             ;  Modo servidor: bytes reservados en quad_buffer
+
+    cap_out         resq 1             ;  Modo servidor: bytes reservados en interp_buffer
+
+    cap_full        resq 1             ;  Modo servidor: bytes reservados en full_buffer
+
+    band_rows       resq 1             ;  Modo por bandas: filas nuevas por banda (FILAS)
+
+    stream_wsum     resq 12            ;  Modo por bandas: acumuladores de firma (2 x WSUM_SIZE) de la entrada y de la salida
+
+    timing_on       resb 1             ;  1 si el entorno trae PROCESAMIENTO_TIEMPOS=1
+
+    time_acc        resq 5             ;  ns acumulados por etapa (leer, copiar, interpolar, checksum, escribir)
+
+    time_last       resq 1             ;  Última marca de tiempo (ns)
+
+    time_spec       resq 2             ;  timespec de clock_gettime (segundos, nanosegundos)
     
 
 
 
 
 
+; *******************************************************************KERNEL COMPARTIDO********************************************************
+; Funciones del kernel (escalar y SSE2) compartidas con libprocesamiento.so.
+; Se usan para la ruta vectorial; los bucles originales de abajo quedan como
+; ruta escalar de respaldo.
+; **********************************************************************************************************************************************
+
+%include "interpolacion.inc"
+
+
+
+
 ; *******************************************************************SECCIÓN .TEXT*************************************************************
 ; Código ejecutable principal
 ; *********************************************************************************************************************************************
@@ -94,17 +285,51 @@ section .text
 ; PUNTO DE COMIEZO (_start)
 ; -----------------------------------------------------------------------------
 ;   Flujo principal:
-;     1) Leer config.txt => path_buffer, quadrant
-;     2) Abrir/leer la imagen en buffer (400x400)
+;     0) Detectar SSE2 con CPUID (ruta vectorial o escalar)
+;     1) Leer config.txt => path_buffer, quadrant, dimensiones
+;        y reservar los buffers con mmap
+;     2) Abrir/leer la imagen en buffer (img_w x img_h, 400x400 por defecto)
 ;     3) Extraer sub-bloque 100x100
 ;     4) Interpolar => 200x200
 ;     5) Guardar en imagen_out.img
 ;     6) Calcular/Imprimir checksums y mensaje final
 ;     7) exit(0)
+;     8) Modo lote (varios cuadrantes): ver batch_run
+;     9) Modo imagen completa (800x800): ver full_run
+;    10) Modo servidor (argv[1] = "--server"): ver server_run
+;    11) Modo argumentos (ENTRADA SALIDA CUADRANTE ...): ver args_run
+;    12) Modo por bandas (ENTRADA SALIDA stream ANCHO ALTO [FILAS]): ver stream_run
+;    Con PROCESAMIENTO_TIEMPOS=1 en el entorno, (2)..(6) y el modo argumentos
+;    acumulan el tiempo de cada etapa (time_lap) y lo imprimen al final.
 ; -----------------------------------------------------------------------------
 
 _start:
     sub rsp, 8               ; Ajuste de la pila para alineación (reservamos 8 bytes)
+
+    call kernel_detect       ; (0) CPUID: kernel_simd = 1 si hay SSE2, 0 si no
+
+    mov rax, [rsp + 8]       ; envp empieza después de argv y su NULL final
+    lea rdi, [rsp + rax*8 + 24]
+    call detect_timing       ; timing_on = 1 si PROCESAMIENTO_TIEMPOS=1
+
+    mov rax, [rsp + 8]
+    lea rdi, [rsp + rax*8 + 24]
+    call detect_threads      ; PROCESAMIENTO_HILOS=N => kernel_set_threads(N)
+
+    cmp qword [rsp + 8], 2   ; argc (8 bytes más arriba por el ajuste de la pila)
+    jb .config_mode
+    mov rsi, [rsp + 24]      ; argv[1]
+    mov rax, '--server'      ; Los 8 caracteres de "--server" en un qword
+    cmp [rsi], rax
+    jne .check_args
+    cmp byte [rsi + 8], 0    ; ... y que termine ahí
+    je server_run            ; (10) Modo servidor: no hay config.txt
+
+.check_args:
+    cmp qword [rsp + 8], 4   ; ENTRADA SALIDA CUADRANTE [ANCHO ALTO [GRID [FACTOR]]]
+    jae args_run             ; (11) Modo argumentos: no hay config.txt
+
+.config_mode:
     
     
     
@@ -117,6 +342,10 @@ _start:
 
     call read_config_from_file ; Llamada a la función que leerá config.txt con la ruta en path_buffer y el cuadrante en [quadrant]
 
+    call alloc_buffers       ; Reserva buffer, quad_buffer, interp_buffer (y full_buffer) según las dimensiones
+
+    call time_start          ; Desde aquí se miden las etapas (si timing_on)
+
 
 
 
@@ -124,9 +353,13 @@ _start:
 ; **************************************************************************************************************************************************
 ; (2) Apertura y lectura de la imagen
 ; **************************************************************************************************************************************************
-; Abre un archivo (ruta en path_buffer), lee 160,000 bytes en "buffer" y 
+; Abre un archivo (ruta en path_buffer), lee img_w*img_h bytes (160,000 por
+; defecto) en "buffer" y 
 ; finalmente cierra el archivo. El número de bytes leídos se almacena en 
 ; "read_count".
+; Un solo sys_read puede devolver menos bytes (pipes, sistemas de archivos en
+; red): read_full repite la lectura hasta completar la imagen, y si el archivo
+; es más corto sale con código 12 en lugar de interpolar basura.
 ; -----------------------------------------------------------------------------
 
 
@@ -140,19 +373,36 @@ _start:
     js error_open_in         ; Si es negativo, hubo error al abrir -> saltar a "error_open_in"
     mov rbx, rax             ; Almacena el descriptor de archivo en rbx
 
-    mov rax, 0               ; Indica que usaremos la syscall sys_read (leer archivo)
-    mov rdi, rbx             ; Descriptor de archivo (segundo argumento) es un número que el s.o usa para identificar el archivo abierto
-    mov rsi, buffer          ; Dirección donde se almacenará lo leído 
-    mov rdx, 400*400         ; Número de bytes a leer (160,000 = 400*400)
-    syscall                  ; Llama al sistema para leer
-    cmp rax, 0               ; Verifica si la lectura fue exitosa (rax < 0 => error)
-    js error_read_in         ; Si hubo error, saltar a "error_read_in"
-    mov [read_count], rax    ; Guarda la cantidad de bytes realmente leídos en read_count
+    mov rdi, rbx             ; Aviso al kernel: lectura secuencial (readahead más agresivo)
+    call advise_sequential
+
+    mov edi, ebx             ; Descriptor de archivo es un número que el s.o usa para identificar el archivo abierto
+    mov rsi, [buffer]        ; Dirección donde se almacenará lo leído 
+    mov rdx, [img_bytes]     ; Número de bytes a leer (img_w*img_h; 160,000 = 400*400 por defecto)
+    call read_full           ; Repite sys_read hasta tener los img_bytes (o EOF / error)
+    cmp rax, [img_bytes]     ; Verifica que se haya leído la imagen completa
+    jne error_read_in        ; Error (rax < 0) o archivo corto => saltar a "error_read_in"
+    mov [read_count], rax    ; Guarda la cantidad de bytes leídos en read_count
 
     mov rax, 3               ; Indica syscall sys_close (cerrar archivo)
     mov rdi, rbx             ; Descriptor de archivo a cerrar
     syscall                  ; Cierra el archivo abierto
 
+    mov edi, TIME_READ       ; Fin de la etapa "leer"
+    call time_lap
+
+    cmp byte [batch_mode], 0 ; config.txt pidió varios cuadrantes?
+    jne batch_run            ; Sí => modo lote (misma imagen en memoria, un cuadrante tras otro)
+
+    cmp byte [full_mode], 0  ; config.txt pidió la imagen completa?
+    jne full_run             ; Sí => img_w x img_h => doble de ancho y alto en una pasada
+
+    cmp qword [factor_n], 2  ; config.txt pidió otro factor de escala?
+    jne factor_path          ; Sí => interpnx_tile (factor_path)
+
+    cmp byte [kernel_simd], 0 ; Se detectó SSE2 al arrancar?
+    jg simd_path             ; Sí => ruta vectorial (simd_path); No => bucles escalares de abajo
+
     
     
     
@@ -214,19 +464,22 @@ _start:
 
 ; 5. Limpiar r8 para usarlo como contador: se hace xor r8, r8 para dejar r8=0, de modo que se utilice en el bucle copy_rows, donde r8 representará la fila dentro del sub-bloque (0..99).
 
+; 6. Con otras dimensiones (línea "size" de config.txt) es lo mismo cambiando 4 por grid_n, 100 por tile_w / tile_h
+; y 400 por img_w: por eso abajo se leen de memoria en lugar de ser constantes.
+
 
 ; -----------------------------------------------------------------------------
 
     mov eax, [quadrant]      ; Carga el valor de 'quadrant' (1..16) en eax
     dec eax                  ; Ajusta de 1..16 a 0..15 para indexar cómodamente
     xor edx, edx             ; Limpia edx antes de dividir (requisito en 64-bit div)
-    mov edi, 4               ; Vamos a dividir por 4 (la cuadrícula tiene 4 columnas)
+    mov edi, [grid_n]        ; Vamos a dividir por grid_n (4 por defecto: la cuadrícula tiene 4 columnas)
     div edi                  ; eax / 4 => eax = fila (0..3), edx = columna (0..3)
     mov r14, rax             ; r14 guarda la fila donde se ubica el bloque
     mov r15, rdx             ; r15 guarda la columna donde se ubica el bloque
 
-    mov r12, 100             ; r12 = 100 => el ancho de cada bloque, en píxeles
-    mov r13, 100             ; r13 = 100 => la altura de cada bloque, en píxeles
+    mov r12, [tile_w]        ; r12 = tile_w (100) => el ancho de cada bloque, en píxeles
+    mov r13, [tile_h]        ; r13 = tile_h (100) => la altura de cada bloque, en píxeles
 
     imul r15, r12            ; r15 = columna * 100 => coordenada X en píxeles
     imul r14, r13            ; r14 = fila * 100    => coordenada Y en píxeles
@@ -265,7 +518,7 @@ copy_rows:
 
     mov r9, r8               ; r9 toma la fila local actual (0..99).
     add r9, r14              ; Suma la base vertical (r14) para obtener la fila "real" en la imagen completa.
-    imul r9, 400             ; Multiplica por 400 para calcular el desplazamiento en la memoria de la imagen (anchura de 400).
+    imul r9, [img_w]         ; Multiplica por img_w (400) para calcular el desplazamiento en la memoria de la imagen.
     add r9, r15              ; Suma el desplazamiento horizontal (r15) para completar la posición de inicio de la fila.
 
     mov r10, r8              ; r10 también toma la fila local (0..99), pero se usará para indexar dentro del sub-bloque.
@@ -300,12 +553,12 @@ copy_cols:
 
     mov rcx, r9              ; rcx = índice base de la fila en la imagen original
     add rcx, r11             ; le sumamos la columna actual
-    mov rsi, buffer          ; rsi apunta al inicio del buffer original
+    mov rsi, [buffer]        ; rsi apunta al inicio del buffer original
     add rsi, rcx             ; rsi ahora apunta al píxel específico en la imagen original
 
     mov rdx, r10             ; rdx = índice base de la fila en el sub-bloque (quad_buffer)
     add rdx, r11             ; le sumamos la columna actual
-    mov rdi, quad_buffer     ; rdi apunta al inicio del sub-bloque
+    mov rdi, [quad_buffer]   ; rdi apunta al inicio del sub-bloque
     add rdi, rdx             ; rdi apunta al píxel específico dentro del sub-bloque
 
     mov al, [rsi]            ; Leemos el píxel desde la imagen original
@@ -347,6 +600,9 @@ done_copy:
     xor eax, eax            ; Pone eax a 0 (equivalente a mov eax, 0)
     mov [row_var], eax      ; Guarda ese 0 en row_var, dejándolo listo para la siguiente etapa
 
+    mov edi, TIME_COPY      ; Fin de la etapa "copiar"
+    call time_lap
+
 
 
 
@@ -481,7 +737,7 @@ done_copy:
 
 interp_outer_row:
     mov eax, [row_var]      ; Cargamos el valor actual de row_var (0..99)
-    cmp eax, 100            ; Verificamos si ya estamos en la fila 100
+    cmp eax, [tile_h]       ; Verificamos si ya estamos en la fila 100 (tile_h)
     jge done_interp         ; Si row >= 100, terminamos la interpolación
 
     mov r8d, eax            ; Copiamos la fila actual en r8 (registro de 32 bits)
@@ -501,6 +757,7 @@ interp_outer_row:
 ;   - Cada píxel se expande en 4 píxeles: (row*2, col*2), (row*2+1, col*2),
 ;     (row*2, col*2+1) y (row*2+1, col*2+1).
 ;   - Calcula valores promedio (A,B,C,D) cuando sea posible usar la fila/col siguiente.
+;   - El 3*A de los promedios se lee de kernel_mul_lut (fila 3) en vez de multiplicar.
  
 ; - Lee la columna actual de col_var (0..99).
 ; - Si col >= 100, terminamos esta fila (saltamos a end_interp_row).
@@ -511,11 +768,11 @@ interp_outer_row:
 
 interp_inner_col:
     mov edx, [col_var]      ; Cargamos en edx el valor actual de col (0..99)
-    cmp edx, 100            ; Verificamos si col ya llegó a 100
+    cmp edx, [tile_w]       ; Verificamos si col ya llegó a 100 (tile_w)
     jge end_interp_row      ; Si col >= 100, terminamos la interpolación de esta fila
 
     mov r10d, [row_var]     ; Cargamos la fila actual en r10d
-    cmp r10d, 99            ; Revisamos si existe una siguiente fila (row < 99)
+    cmp r10d, [tile_last_r] ; Revisamos si existe una siguiente fila (row < 99, tile_h-1)
     jl .ok_rplus            ; Si row < 99, hay una fila siguiente
     jmp .no_rplus           ; Si row >= 99, no hay fila siguiente (estamos en la última)
 
@@ -540,7 +797,7 @@ interp_inner_col:
 .no_rplus:
 
     mov r11d, [col_var]      ; Cargamos en r11 la columna actual desde col_var
-    cmp r11d, 99             ; Verificamos si col+1 es posible (col < 99)
+    cmp r11d, [tile_last_c]  ; Verificamos si col+1 es posible (col < 99, tile_w-1)
     jl .ok_cplus             ; Si col < 99, saltamos a .ok_cplus
     jmp .no_cplus            ; Si no, vamos a .no_cplus (estamos en la última columna)
 
@@ -586,31 +843,31 @@ interp_inner_col:
     
     mov eax, [row_var]       ; EAX = fila actual (0..99)
     mov edx, [col_var]       ; EDX = columna actual (en .no_cplus creo que debe ser 99)
-    mov rsi, quad_buffer     ; RSI apunta al inicio del sub-bloque (100x100)
+    mov rsi, [quad_buffer]   ; RSI apunta al inicio del sub-bloque (100x100)
 
     mov ecx, eax             ; Copiamos la fila (row) a ECX
-    imul ecx, 100            ; Multiplicamos por 100 para ubicar la fila en quad_buffer
+    imul ecx, [tile_w]       ; Multiplicamos por 100 (tile_w) para ubicar la fila en quad_buffer
     add ecx, edx             ; Sumamos la columna para apuntar al píxel exacto
     add rsi, rcx             ; RSI => posición del píxel A
     movzx r14, byte [rsi]    ; Cargamos el píxel A en r14 (extendido a 64 bits)
 
-    mov rsi, quad_buffer     ; Volvemos a apuntar al inicio de quad_buffer
+    mov rsi, [quad_buffer]   ; Volvemos a apuntar al inicio de quad_buffer
     mov ecx, r10d            ; r10d contiene row+1 (la fila siguiente)
-    imul ecx, 100            ; Calculamos la posición base de esa fila
+    imul ecx, [tile_w]       ; Calculamos la posición base de esa fila
     add ecx, edx             ; Sumamos la misma columna (col)
     add rsi, rcx             ; RSI => posición del píxel B
     movzx r15, byte [rsi]    ; Cargamos el píxel B en r15
 
-    mov rsi, quad_buffer     ; Otra vez, inicio del sub-bloque
+    mov rsi, [quad_buffer]   ; Otra vez, inicio del sub-bloque
     mov ecx, eax             ; ECX = fila actual (row)
-    imul ecx, 100
+    imul ecx, [tile_w]
     add ecx, r11d            ; r11d representa col+1, pero podría no haberse incrementado
     add rsi, rcx             ; RSI => píxel C (misma fila, siguiente columna)
     movzx rdi, byte [rsi]    ; Cargamos el píxel C en rdi
 
-    mov rsi, quad_buffer     ; De nuevo al inicio
+    mov rsi, [quad_buffer]   ; De nuevo al inicio
     mov ecx, r10d            ; ECX = row+1
-    imul ecx, 100
+    imul ecx, [tile_w]
     add ecx, r11d            ; Sumamos la columna 'col+1' (o la misma, si no se incrementó)
     add rsi, rcx             ; RSI => píxel D (fila siguiente, columna siguiente)
     movzx rsi, byte [rsi]    ; Cargamos el píxel D en rsi
@@ -632,9 +889,9 @@ interp_inner_col:
 	; =============================================================================
 
     mov rcx, r8             ; r8 contiene (row*2)
-    imul rcx, 200           ; Multiplicamos por 200 (ancho de la imagen resultante)
+    imul rcx, [out_w]       ; Multiplicamos por 200 (out_w, ancho de la imagen resultante)
     add rcx, r9             ; r9 contiene (col*2); sumamos para calcular la posición final
-    mov rdx, interp_buffer  ; rdx apunta al inicio del buffer de la imagen escalada
+    mov rdx, [interp_buffer] ; rdx apunta al inicio del buffer de la imagen escalada
     add rdx, rcx            ; rdx ahora señala a (row*2, col*2)
     mov [rdx], r14b         ; Guardamos A (r14b = 8 bits de r14) en esa posición
     
@@ -651,12 +908,11 @@ interp_inner_col:
 
     mov rcx, r8             ; r8 contiene (row*2)
     add rcx, 1              ; row*2 + 1 (la fila inmediatamente debajo en la imagen final)
-    imul rcx, 200           ; Multiplicamos la fila por 200 (ancho de la imagen final)
+    imul rcx, [out_w]       ; Multiplicamos la fila por 200 (out_w, ancho de la imagen final)
     add rcx, r9             ; Sumamos col*2 para la posición horizontal
-    mov rdx, interp_buffer  ; rdx apunta al inicio de la imagen escalada
+    mov rdx, [interp_buffer] ; rdx apunta al inicio de la imagen escalada
     add rdx, rcx            ; rdx ahora es la dirección exacta del píxel (row*2+1, col*2)
-    mov rax, r14            ; Carga el valor de A (64 bits) en rax
-    imul rax, 3             ; Multiplica A por 3 (3*A)
+    movzx eax, word [kernel_mul_lut + 3*KERNEL_LUT_ROW + r14*2] ; 3*A de la tabla (sin multiplicar)
     add rax, r15            ; Suma B (3*A + B)
     shr rax, 2              ; Desplaza a la derecha 2 bits => divide entre 4
     mov [rdx], al           ; Guarda el resultado (promedio) en un byte
@@ -671,15 +927,14 @@ interp_inner_col:
 	; =============================================================================
 
     mov rcx, r8             ; rcx = row*2 (almacenado en r8)
-    imul rcx, 200           ; Multiplica la fila por 200 (ancho de la imagen final)
+    imul rcx, [out_w]       ; Multiplica la fila por 200 (out_w, ancho de la imagen final)
     mov rdx, r9             ; rdx = col*2 (almacenado en r9)
     add rdx, 1              ; col*2 + 1 => siguiente columna horizontal
     add rcx, rdx            ; Sumamos fila y columna para obtener el índice
-    mov rdx, interp_buffer  ; rdx => inicio del buffer de la imagen interpolada
+    mov rdx, [interp_buffer] ; rdx => inicio del buffer de la imagen interpolada
     add rdx, rcx            ; rdx => posición (row*2, col*2+1)
 
-    mov rax, r14            ; Cargamos A (64 bits) en rax
-    imul rax, 3             ; Multiplica A por 3 => 3*A
+    movzx eax, word [kernel_mul_lut + 3*KERNEL_LUT_ROW + r14*2] ; 3*A de la tabla (kernel_detect la llenó)
     add rax, rdi            ; Suma C => (3*A + C)
     shr rax, 2              ; Divide entre 4
     mov [rdx], al           ; Guarda el promedio en 1 byte
@@ -695,11 +950,11 @@ interp_inner_col:
 
     mov rcx, r8                 ; rcx = row*2 (almacenado en r8)
     add rcx, 1                  ; row*2 + 1 => la siguiente fila en la imagen resultante
-    imul rcx, 200               ; Multiplicamos (row*2+1) por 200 (ancho de la imagen escalada)
+    imul rcx, [out_w]           ; Multiplicamos (row*2+1) por 200 (out_w, ancho de la imagen escalada)
     mov rdx, r9                 ; rdx = col*2 (almacenado en r9)
     add rdx, 1                  ; col*2 + 1 => la siguiente columna en la imagen resultante
     add rcx, rdx                ; Sumamos fila y columna para obtener el índice completo
-    mov rdx, interp_buffer      ; rdx => inicio del buffer de la imagen
+    mov rdx, [interp_buffer]    ; rdx => inicio del buffer de la imagen
     add rdx, rcx                ; rdx => posición en (row*2+1, col*2+1)
 
     mov rax, r14                ; Cargamos A en rax
@@ -738,6 +993,72 @@ end_interp_row:
     mov [row_var], eax       ; Guarda el valor actualizado en memoria
     jmp interp_outer_row     ; Vuelve al bucle externo para procesar la siguiente fila
 
+
+
+
+; =============================================================================
+; simd_path
+; -----------------------------------------------------------------------------
+; Ruta vectorial (solo si CPUID reportó SSE2). Hace lo mismo que los pasos (3)
+; y (4) de arriba, con las funciones de interpolacion.inc:
+;   - extract_quadrant copia el sub-bloque 100x100 a quad_buffer
+;   - interp2x_tile (versión SSE2) interpola 16 columnas por iteración
+; El resultado en interp_buffer es idéntico byte a byte al de la ruta escalar.
+; Luego sigue en done_interp como siempre.
+; =============================================================================
+
+simd_path:
+    mov rdi, [buffer]        ; Imagen completa (400x400)
+    mov rsi, [img_w]         ; Stride de la imagen
+    mov edx, [quadrant]      ; Cuadrante (1..quad_max), ya validado por read_config_from_file
+    mov rcx, [quad_buffer]   ; Destino del sub-bloque
+    call extract_quadrant    ; Usa la geometría de kernel_set_geometry (setup_geometry)
+
+    mov edi, TIME_COPY       ; Fin de la etapa "copiar"
+    call time_lap
+
+    mov rdi, [quad_buffer]   ; src = sub-bloque (100x100)
+    mov rsi, [tile_w]        ; stride del sub-bloque
+    mov rdx, [tile_w]        ; w
+    mov rcx, [tile_h]        ; h
+    mov r8, [interp_buffer]  ; dst = imagen interpolada (200x200)
+    mov r9, [out_w]          ; stride de la salida
+    call interp2x_tile_sse2
+
+    jmp done_interp          ; Guardar imagen_out.img como en la ruta escalar
+
+
+
+
+; =============================================================================
+; factor_path
+; -----------------------------------------------------------------------------
+; Ruta de los factores distintos de 2 (línea "factor N" de config.txt): igual
+; que simd_path, pero interpnx_tile escribe bloques de N x N píxeles por cada
+; píxel del sub-bloque (out_w x out_h = N*tile_w x N*tile_h). Los checksums y
+; la escritura de done_interp ya usan out_w, out_h y out_bytes.
+; =============================================================================
+
+factor_path:
+    mov rdi, [buffer]        ; Imagen completa
+    mov rsi, [img_w]         ; Stride de la imagen
+    mov edx, [quadrant]      ; Cuadrante (1..quad_max)
+    mov rcx, [quad_buffer]   ; Destino del sub-bloque
+    call extract_quadrant
+
+    mov edi, TIME_COPY       ; Fin de la etapa "copiar"
+    call time_lap
+
+    mov rdi, [quad_buffer]   ; src = sub-bloque
+    mov rsi, [tile_w]        ; stride del sub-bloque
+    mov rdx, [tile_w]        ; w
+    mov rcx, [tile_h]        ; h
+    mov r8, [interp_buffer]  ; dst = imagen interpolada (out_w x out_h)
+    mov r9, [out_w]          ; stride de la salida
+    call interpnx_tile       ; Factor de kernel_set_factor (setup_geometry)
+
+    jmp done_interp
+
     
     
     
@@ -753,10 +1074,14 @@ end_interp_row:
 ; -----------------------------------------------------------------------------
 ; Se llega aquí cuando la interpolación ha finalizado. Ahora se crea un archivo 
 ; "imagen_out.img", se escriben en él los 40,000 bytes del buffer interpolado 
-; (200×200), y finalmente se cierra el archivo.
+; (200×200) con write_full (repite sys_write si escribe menos), y finalmente
+; se cierra el archivo.
 ; =============================================================================
 
 done_interp:
+    mov edi, TIME_INTERP    ; Fin de la etapa "interpolar" (escalar o SSE2)
+    call time_lap
+
     mov rax, 2              ; Número de syscall para abrir archivos (sys_open)
     mov rdi, fname_out      ; Nombre del archivo de salida ("imagen_out.img")
     mov rsi, 577            ; Flags => O_WRONLY|O_CREAT|O_TRUNC (577 decimal)
@@ -768,19 +1093,21 @@ done_interp:
     
     mov rbx, rax            ; Guardamos el descriptor de archivo en rbx
 
-    mov rax, 1              ; Número de syscall para escribir (sys_write)
-    mov rdi, rbx            ; Descriptor de archivo
-    mov rsi, interp_buffer  ; Dirección del buffer de la imagen resultante
-    mov rdx, 200*200        ; 40,000 bytes que vamos a escribir
-    syscall                 ; Llamamos al sistema para escribir
+    mov edi, ebx            ; Descriptor de archivo
+    mov rsi, [interp_buffer] ; Dirección del buffer de la imagen resultante
+    mov rdx, [out_bytes]    ; out_w*out_h bytes (40,000 por defecto) que vamos a escribir
+    call write_full         ; Repite sys_write hasta escribirlos todos
     
-    cmp rax, 0              ; Chequeamos la cantidad escrita
-    js error_write_out      ; Si es negativo, error de escritura
+    cmp rax, [out_bytes]    ; Chequeamos la cantidad escrita
+    jne error_write_out     ; Error o escritura incompleta
 
     mov rax, 3              ; Número de syscall para cerrar archivos (sys_close)
     mov rdi, rbx            ; Descriptor de archivo que cerramos
     syscall                 ; Cerrar el archivo
 
+    mov edi, TIME_WRITE     ; Fin de la etapa "escribir"
+    call time_lap
+
 
     
     
@@ -798,6 +1125,11 @@ done_interp:
 ; 	Primero recorre quad_buffer (100×100) sumando todos sus píxeles y guarda la suma en r12.
 ;	Luego recorre interp_buffer (200×200) y guarda la suma en r13.
 ; Finalmente, imprime esos valores
+; Con SSE2 se usa checksum_bytes_sse2 (psadbw, 16 bytes por iteración) en lugar de
+; los bucles byte a byte; las sumas son las mismas.
+
+    cmp byte [kernel_simd], 0 ; Ruta vectorial?
+    jg simd_checksums
 
     xor rax, rax            ; Pone rax en 0, para usarlo como sumador
     xor r8, r8              ; Pone r8 en 0, para usarlo como contador de filas
@@ -815,11 +1147,11 @@ done_interp:
 ; =============================================================================
 
 csum_sub_rows:
-    cmp r8, 100            ; Compara r8 (fila actual) con 100
+    cmp r8, [tile_h]       ; Compara r8 (fila actual) con 100 (tile_h)
     jge csum_sub_done      ; Si r8 >= 100, ya procesamos todas las filas, saltamos
 
     mov r9, r8             ; r9 = número de fila
-    imul r9, 100           ; r9 *= 100 para obtener el índice base en quad_buffer
+    imul r9, [tile_w]      ; r9 *= 100 (tile_w) para obtener el índice base en quad_buffer
     xor r11, r11           ; Inicializa r11 en 0 (contador de columnas)
 
     
@@ -836,12 +1168,12 @@ csum_sub_rows:
 ; =============================================================================
 
 csum_sub_cols:
-    cmp r11, 100            ; Verifica si llegamos a 100 columnas
+    cmp r11, [tile_w]       ; Verifica si llegamos a 100 columnas (tile_w)
     jge end_sub_row         ; Si r11 >= 100, terminamos esta fila
 
     mov rcx, r9             ; rcx = índice base de la fila
     add rcx, r11            ; Sumamos la columna actual
-    mov rsi, quad_buffer    ; rsi apunta al inicio del sub-bloque
+    mov rsi, [quad_buffer]  ; rsi apunta al inicio del sub-bloque
     add rsi, rcx            ; rsi apunta al píxel actual dentro de quad_buffer
 
     xor rbx, rbx            ; Limpia rbx antes de usar su parte baja
@@ -901,11 +1233,11 @@ csum_sub_done:
 ; =============================================================================
 
 csum_interp_rows:
-    cmp r8, 200        ; Ya llegamos a la fila 200?
+    cmp r8, [out_h]    ; Ya llegamos a la fila 200 (out_h)?
     jge csum_interp_done  ; Si r8 >= 200, ya terminamos de recorrer todas las filas
 
     mov r9, r8         ; r9 = número de fila
-    imul r9, 200       ; r9 *= 200 para obtener el índice base de esa fila
+    imul r9, [out_w]   ; r9 *= 200 (out_w) para obtener el índice base de esa fila
     xor r11, r11       ; Inicializamos el contador de columnas (r11) en 0
 
 
@@ -923,12 +1255,12 @@ csum_interp_rows:
 ; =============================================================================
 
 csum_interp_cols:
-    cmp r11, 200            ; Ya terminamos las 200 columnas?
+    cmp r11, [out_w]        ; Ya terminamos las 200 columnas (out_w)?
     jge end_interp_sum_row2 ; Si r11 >= 200, terminamos la fila
 
     mov rcx, r9             ; rcx = índice base de la fila
     add rcx, r11            ; sumamos el número de columna actual
-    mov rsi, interp_buffer  ; rsi apunta al inicio del buffer interpolado
+    mov rsi, [interp_buffer] ; rsi apunta al inicio del buffer interpolado
     add rsi, rcx            ; rsi ahora apunta al píxel específico (fila, columna)
 
     xor rbx, rbx            ; limpiamos rbx
@@ -968,6 +1300,27 @@ end_interp_sum_row2:
 
 csum_interp_done:
     mov r13, rax      ; Guarda la suma acumulada de píxeles de la imagen interpolada en r13
+    jmp print_results
+
+
+
+; =============================================================================
+; simd_checksums
+; -----------------------------------------------------------------------------
+; Checksums con psadbw: r12 = suma del sub-bloque, r13 = suma de la imagen
+; interpolada (mismos valores que csum_sub_* / csum_interp_*).
+; =============================================================================
+
+simd_checksums:
+    mov rdi, [quad_buffer]
+    mov rsi, [tile_bytes]
+    call checksum_bytes_sse2
+    mov r12, rax      ; Checksum sub-bloque
+
+    mov rdi, [interp_buffer]
+    mov rsi, [out_bytes]
+    call checksum_bytes_sse2
+    mov r13, rax      ; Checksum imagen interpolada
 
 
 
@@ -977,6 +1330,10 @@ csum_interp_done:
 
     ; Imprimir resultados
 
+print_results:
+    mov edi, TIME_CSUM              ; Fin de la etapa "checksum" (escalar o SSE2)
+    call time_lap
+
 ; (a) Bytes leídos
     mov rax, 1                      ; syscall write
     mov rdi, 1                      ; descriptor de archivo 1 (stdout)
@@ -1025,6 +1382,8 @@ csum_interp_done:
     mov rdx, 1
     syscall                         ; imprime un salto de línea
 
+    call print_timings              ; (d) Tiempos por etapa (solo si timing_on)
+
     ; Mensaje final
     mov rax, 1
     mov rdi, 1
@@ -1041,11 +1400,1030 @@ csum_interp_done:
 
 
 
+; **************************************************************************************************************************************************
+; (8) Modo lote: varios cuadrantes con una sola lectura de la imagen
+; **************************************************************************************************************************************************
+; Se llega aquí desde (2) si la segunda línea de config.txt fue "all" o una
+; lista ("1,5,16"). La imagen ya está en buffer; para cada cuadrante de
+; quad_list se llama a process_quadrant (extracción + interpolación +
+; checksums, ruta SSE2 o escalar según kernel_simd) y:
+;   - sin "packed": se escribe imagen_out_XX.img (XX = cuadrante, 01..quad_max)
+;   - con "packed": se añaden los out_w*out_h bytes a imagen_out_lote.img, así
+;     "all" deja (por defecto) un archivo de 16x200x200 con los bloques en orden 1..16
+; Por cada cuadrante se imprime "Cuadrante: XX" y sus dos checksums.
+;
+; - r12: cuadrante actual
+; - r14: descriptor de imagen_out_lote.img (-1 si un archivo por cuadrante)
+; - r15: índice en quad_list
+; =============================================================================
+
+batch_run:
+    mov rax, 1                      ; (a) Bytes leídos, una sola vez para todo el lote
+    mov rdi, 1
+    mov rsi, msg_bytes_read
+    mov rdx, msg_bytes_read_end - msg_bytes_read
+    syscall
+
+    mov rdi, [read_count]
+    call print_hex
+
+    mov rax, 1
+    mov rdi, 1
+    mov rsi, new_line
+    mov rdx, 1
+    syscall
+
+    mov r14, -1                     ; Por defecto: un archivo por cuadrante
+    cmp byte [packed_mode], 0
+    je .batch_start
+
+    mov rax, 2                      ; sys_open imagen_out_lote.img
+    mov rdi, fname_out_packed
+    mov rsi, 577                    ; O_WRONLY|O_CREAT|O_TRUNC
+    mov rdx, 420                    ; 0644
+    syscall
+    cmp rax, 0
+    js error_open_out
+    mov r14, rax                    ; Descriptor del archivo empaquetado
+
+.batch_start:
+    xor r15d, r15d                  ; Primer cuadrante de la lista
+
+.batch_loop:
+    cmp r15d, [quad_count]          ; Ya se procesaron todos?
+    jae .batch_end
+
+    movzx r12d, byte [quad_list + r15] ; r12 = cuadrante (1..quad_max)
+
+    mov rdi, [buffer]               ; process_quadrant(buffer, img_w, q, quad_buffer, interp_buffer, batch_csums)
+    mov rsi, [img_w]
+    mov edx, r12d
+    mov rcx, [quad_buffer]
+    mov r8, [interp_buffer]
+    mov r9, batch_csums
+    call process_quadrant
+
+    mov eax, r12d                   ; Cuadrante en dos dígitos ASCII: al = decenas, dl = unidades
+    xor edx, edx
+    mov ecx, 10
+    div ecx
+    add al, '0'
+    add dl, '0'
+    mov [msg_batch_quad + 11], al
+    mov [msg_batch_quad + 12], dl
+    mov [fname_out_batch + 11], al
+    mov [fname_out_batch + 12], dl
+
+    cmp r14, 0                      ; Salida empaquetada?
+    jl .batch_own_file
+
+    mov edi, r14d                   ; Añade el bloque out_w x out_h a imagen_out_lote.img
+    mov rsi, [interp_buffer]
+    mov rdx, [out_bytes]
+    call write_full
+    cmp rax, [out_bytes]
+    jne error_write_out
+    jmp .batch_print
+
+.batch_own_file:
+    mov rax, 2                      ; sys_open imagen_out_XX.img
+    mov rdi, fname_out_batch
+    mov rsi, 577
+    mov rdx, 420
+    syscall
+    cmp rax, 0
+    js error_open_out
+    mov rbx, rax
+
+    mov edi, ebx                    ; Escribe los out_w*out_h bytes del cuadrante (40,000 por defecto)
+    mov rsi, [interp_buffer]
+    mov rdx, [out_bytes]
+    call write_full
+    cmp rax, [out_bytes]
+    jne error_write_out
+
+    mov rax, 3                      ; Cierra imagen_out_XX.img
+    mov rdi, rbx
+    syscall
+
+.batch_print:
+    mov rax, 1                      ; "Cuadrante: XX"
+    mov rdi, 1
+    mov rsi, msg_batch_quad
+    mov rdx, msg_batch_quad_end - msg_batch_quad
+    syscall
+
+    mov rax, 1                      ; Checksum sub-bloque
+    mov rdi, 1
+    mov rsi, msg_checksum_sub
+    mov rdx, msg_checksum_sub_end - msg_checksum_sub
+    syscall
+
+    mov rdi, [batch_csums]
+    call print_hex
+
+    mov rax, 1
+    mov rdi, 1
+    mov rsi, new_line
+    mov rdx, 1
+    syscall
+
+    mov rax, 1                      ; Checksum imagen interpolada
+    mov rdi, 1
+    mov rsi, msg_checksum_interp
+    mov rdx, msg_checksum_interp_end - msg_checksum_interp
+    syscall
+
+    mov rdi, [batch_csums + 8]
+    call print_hex
+
+    mov rax, 1
+    mov rdi, 1
+    mov rsi, new_line
+    mov rdx, 1
+    syscall
+
+    inc r15d                        ; Siguiente cuadrante de la lista
+    jmp .batch_loop
+
+.batch_end:
+    cmp r14, 0                      ; Cierra imagen_out_lote.img si se usó
+    jl .batch_done
+    mov rax, 3
+    mov rdi, r14
+    syscall
+
+.batch_done:
+    mov rax, 1                      ; Mensaje final del lote
+    mov rdi, 1
+    mov rsi, msg_batch_done
+    mov rdx, msg_batch_done_end - msg_batch_done
+    syscall
+
+    mov rax, 60                     ; exit(0)
+    xor rdi, rdi
+    syscall
+
+
+
+
+
+; **************************************************************************************************************************************************
+; (9) Modo imagen completa: 400x400 => 800x800 (img_w x img_h => doble) en una sola pasada
+; **************************************************************************************************************************************************
+; Se llega aquí desde (2) si la segunda línea de config.txt fue "full".
+; interp2x_tile recorre la imagen entera, así que en los bordes internos de
+; los cuadrantes usa los vecinos reales (B, C, D del bloque de al lado) y solo
+; repite fila/columna en el borde de la imagen: no quedan costuras como al
+; pegar 16 salidas de 200x200.
+;
+; - r12: checksum de la imagen original (img_w x img_h)
+; - r13: checksum de la imagen interpolada (factor_n*img_w x factor_n*img_h, el doble por defecto)
+; Después de los checksums se imprimen las firmas (batch_csums + 16 y + 24).
+; =============================================================================
+
+full_run:
+    mov rdi, [buffer]               ; process_frame_wsum(buffer, img_w, img_h, full_buffer, batch_csums)
+    mov rsi, [img_w]
+    mov rdx, [img_h]
+    mov rcx, [full_buffer]
+    mov r8, batch_csums
+    call process_frame_wsum         ; Bandas en paralelo (kernel_set_threads); factor 2: interp2x_tile
+
+    mov rax, 2                      ; sys_open imagen_out_full.img
+    mov rdi, fname_out_full
+    mov rsi, 577                    ; O_WRONLY|O_CREAT|O_TRUNC
+    mov rdx, 420                    ; 0644
+    syscall
+    cmp rax, 0
+    js error_open_out
+    mov rbx, rax
+
+    mov edi, ebx                    ; Escribe los full_bytes (640,000 por defecto)
+    mov rsi, [full_buffer]
+    mov rdx, [full_bytes]
+    call write_full
+    cmp rax, [full_bytes]
+    jne error_write_out
+
+    mov rax, 3                      ; Cierra imagen_out_full.img
+    mov rdi, rbx
+    syscall
+
+    mov r12, [batch_csums]          ; Checksums (sumados banda por banda en process_frame_wsum)
+    mov r13, [batch_csums + 8]
+
+    mov rax, 1                      ; (a) Bytes leídos
+    mov rdi, 1
+    mov rsi, msg_bytes_read
+    mov rdx, msg_bytes_read_end - msg_bytes_read
+    syscall
+
+    mov rdi, [read_count]
+    call print_hex
+
+    mov rax, 1
+    mov rdi, 1
+    mov rsi, new_line
+    mov rdx, 1
+    syscall
+
+    mov rax, 1                      ; (b) Checksum imagen original
+    mov rdi, 1
+    mov rsi, msg_checksum_frame
+    mov rdx, msg_checksum_frame_end - msg_checksum_frame
+    syscall
+
+    mov rdi, r12
+    call print_hex
+
+    mov rax, 1
+    mov rdi, 1
+    mov rsi, new_line
+    mov rdx, 1
+    syscall
+
+    mov rax, 1                      ; (c) Checksum imagen interpolada
+    mov rdi, 1
+    mov rsi, msg_checksum_interp
+    mov rdx, msg_checksum_interp_end - msg_checksum_interp
+    syscall
+
+    mov rdi, r13
+    call print_hex
+
+    mov rax, 1
+    mov rdi, 1
+    mov rsi, new_line
+    mov rdx, 1
+    syscall
+
+    mov rdi, [batch_csums + 16]     ; (d) Firmas (mismo pase que los checksums)
+    mov rsi, msg_firma_frame
+    mov edx, msg_firma_frame_end - msg_firma_frame
+    call print_value
+    mov rdi, [batch_csums + 24]
+    mov rsi, msg_firma_interp
+    mov edx, msg_firma_interp_end - msg_firma_interp
+    call print_value
+
+    mov rax, 1                      ; Mensaje final
+    mov rdi, 1
+    mov rsi, msg_full_done
+    mov rdx, msg_full_done_end - msg_full_done
+    syscall
+
+    mov rax, 60                     ; exit(0)
+    xor rdi, rdi
+    syscall
+
+
+
+
+
+; **************************************************************************************************************************************************
+; (10) Modo servidor: ./procesamiento --server
+; **************************************************************************************************************************************************
+; El proceso queda residente y atiende pedidos por stdin, uno tras otro, sin
+; config.txt ni archivos .img: quien lo lanza (motor_worker.py) se ahorra el
+; fork/exec y la preparación de cada ejecución.
+;
+; Pedido (stdin), JOB_HEADER_SIZE = 16 bytes little-endian + la imagen:
+;     "KJOB" | ancho u32 | alto u32 | grid u8 | factor u8 | cuadrante u16 | ancho*alto bytes
+;     cuadrante 0 = imagen completa (como "full"), 1..grid*grid = ese cuadrante
+;     factor 0 = 2 (así los pedidos con "grid u16" de antes siguen valiendo)
+;     magia "KJBF" = lo mismo, pero la respuesta lleva además las firmas
+;
+; Respuesta (stdout), RESP_HEADER_SIZE = 32 bytes + la imagen interpolada:
+;     "KRES" | estado u32 (0) | ancho u32 | alto u32 |
+;     checksum entrada u64 (sub-bloque o imagen) | checksum salida u64 | ancho*alto bytes
+; A un "KJBF" se responde con RESP_WSUM_SIZE = 48 bytes: tras los checksums,
+;     firma entrada u64 | firma salida u64      (checksum_wsum, ver interpolacion.inc)
+; calculadas en la misma pasada que la interpolación (process_frame_wsum o
+; process_quadrant_wsum). Un "KJOB" usa process_frame / process_quadrant,
+; que no calculan la firma.
+;
+; stdin cerrado entre pedidos => exit(0). Un pedido mal formado (magia,
+; geometría o cuadrante inválidos) termina con código 16; una imagen
+; incompleta con 12 y un error al responder con 14.
+; Los buffers se reservan con mmap la primera vez y solo se vuelven a
+; reservar si llega una imagen más grande (ensure_buffer). Con cuadrante 0
+; solo se usan buffer y full_buffer (motor_worker los manda con grid 1, así
+; que el "sub-bloque" sería la imagen entera).
+; =============================================================================
+
+server_run:
+    xor edi, edi                    ; Encabezado del pedido desde stdin
+    mov rsi, job_header
+    mov edx, JOB_HEADER_SIZE
+    call read_full
+    test rax, rax
+    jz .eof                         ; stdin cerrado entre pedidos => fin normal
+    js error_read_in
+    cmp rax, JOB_HEADER_SIZE
+    jne error_protocol              ; Encabezado cortado
+    mov qword [resp_size], RESP_HEADER_SIZE
+    cmp dword [job_header], 'KJOB'
+    je .job
+    cmp dword [job_header], 'KJBF'
+    jne error_protocol
+    mov qword [resp_size], RESP_WSUM_SIZE
+.job:
+
+    mov eax, [job_header + 4]       ; Geometría del pedido => img_w, img_h, grid_n, factor_n, quadrant
+    mov [img_w], rax
+    mov eax, [job_header + 8]
+    mov [img_h], rax
+    movzx eax, byte [job_header + 12]
+    mov [grid_n], rax
+    movzx eax, byte [job_header + 13]
+    test eax, eax
+    jnz .factor
+    mov eax, 2                      ; 0 => factor por defecto
+.factor:
+    mov [factor_n], rax
+    movzx eax, word [job_header + 14]
+    mov [quadrant], eax
+    call setup_geometry             ; Tamaños derivados + kernel_set_geometry
+    test rax, rax
+    js error_protocol
+    mov eax, [quadrant]
+    cmp eax, [quad_max]
+    ja error_protocol
+
+    mov rdi, buffer                 ; Buffers con capacidad suficiente
+    mov rsi, cap_img
+    mov rdx, [img_bytes]
+    call ensure_buffer
+    cmp dword [quadrant], 0
+    je .full_buffer                 ; La imagen completa no usa quad_buffer ni interp_buffer
+    mov rdi, quad_buffer
+    mov rsi, cap_tile
+    mov rdx, [tile_bytes]
+    call ensure_buffer
+    mov rdi, interp_buffer
+    mov rsi, cap_out
+    mov rdx, [out_bytes]
+    call ensure_buffer
+    jmp .read_frame
+.full_buffer:
+    mov rdi, full_buffer
+    mov rsi, cap_full
+    mov rdx, [full_bytes]
+    call ensure_buffer
+
+.read_frame:
+    xor edi, edi                    ; La imagen: img_w*img_h bytes
+    mov rsi, [buffer]
+    mov rdx, [img_bytes]
+    call read_full
+    cmp rax, [img_bytes]
+    jne error_read_in               ; Error o imagen incompleta
+
+    cmp dword [quadrant], 0
+    je .full
+
+    mov rdi, [buffer]               ; process_quadrant(buffer, img_w, q, quad_buffer, interp_buffer, batch_csums)
+    mov rsi, [img_w]
+    mov edx, [quadrant]
+    mov rcx, [quad_buffer]
+    mov r8, [interp_buffer]
+    mov r9, batch_csums
+    cmp qword [resp_size], RESP_HEADER_SIZE
+    je .quadrant
+    call process_quadrant_wsum      ; "KJBF": checksums y firmas en la misma pasada
+    jmp .quadrant_done
+.quadrant:
+    call process_quadrant
+.quadrant_done:
+    call .copy_csums
+    mov eax, [out_w]
+    mov [resp_header + 8], eax
+    mov eax, [out_h]
+    mov [resp_header + 12], eax
+    mov r12, [interp_buffer]        ; r12/r13 = bloque a enviar
+    mov r13, [out_bytes]
+    jmp .reply
+
+.full:
+    mov rdi, [buffer]               ; process_frame(buffer, img_w, img_h, full_buffer, batch_csums)
+    mov rsi, [img_w]
+    mov rdx, [img_h]
+    mov rcx, [full_buffer]
+    mov r8, batch_csums
+    cmp qword [resp_size], RESP_HEADER_SIZE
+    je .frame
+    call process_frame_wsum         ; "KJBF": con firmas
+    jmp .frame_done
+.frame:
+    call process_frame              ; "KJOB": solo checksums, sin la pasada de la firma
+.frame_done:
+    call .copy_csums
+    mov eax, [img_w]
+    imul eax, [factor_n]
+    mov [resp_header + 8], eax
+    mov eax, [img_h]
+    imul eax, [factor_n]
+    mov [resp_header + 12], eax
+    mov r12, [full_buffer]
+    mov r13, [full_bytes]
+
+.reply:
+    mov dword [resp_header], 'KRES'
+    mov dword [resp_header + 4], 0  ; Estado: 0 = ok
+    mov edi, 1
+    mov rsi, resp_header
+    mov rdx, [resp_size]
+    call write_full
+    cmp rax, [resp_size]
+    jne error_write_out
+
+    mov edi, 1
+    mov rsi, r12
+    mov rdx, r13
+    call write_full
+    cmp rax, r13
+    jne error_write_out
+
+    jmp server_run                  ; Siguiente pedido
+
+.eof:
+    mov rax, 60                     ; exit(0)
+    xor rdi, rdi
+    syscall
+
+.copy_csums:                        ; batch_csums => resp_header: checksums y firmas
+    mov rax, [batch_csums]          ; (las firmas solo se envían si resp_size las incluye)
+    mov [resp_header + 16], rax
+    mov rax, [batch_csums + 8]
+    mov [resp_header + 24], rax
+    mov rax, [batch_csums + 16]
+    mov [resp_header + 32], rax
+    mov rax, [batch_csums + 24]
+    mov [resp_header + 40], rax
+    ret
+
+
+
+
+
+; **************************************************************************************************************************************************
+; (11) Modo argumentos: ./procesamiento ENTRADA SALIDA CUADRANTE [ANCHO ALTO [GRID [FACTOR]]]
+; **************************************************************************************************************************************************
+; Todo llega por la línea de comandos, sin config.txt, imagen_in.img ni
+; imagen_out.img fijos:
+;   - ENTRADA: archivo crudo de ANCHO*ALTO bytes, o "-" para leerlo de stdin
+;   - SALIDA:  archivo donde se escribe el resultado, o "-" para stdout
+;   - CUADRANTE: un número (1..grid*grid), "all", una lista "1,5,16" o "full"
+;   - ANCHO ALTO [GRID]: como la línea "size" de config.txt (400 400 4 por defecto)
+;   - FACTOR: como la línea "factor" de config.txt (2 por defecto)
+; Con varios cuadrantes la salida es un solo flujo con los bloques seguidos
+; en el orden de la lista (como "packed"). Los checksums se imprimen igual que
+; en los otros modos; si SALIDA es "-" van a stderr para no mezclarse con la
+; imagen. Así quien lo lanza (ver_interfaz.py) pasa la imagen y recibe el
+; resultado por pipes, sin tocar el disco.
+;
+; - rbx: argv
+; - r12: cuadrante actual
+; - r13: descriptor de entrada (0 = stdin)
+; - r14: descriptor de salida (1 = stdout)
+; - r15: índice en quad_list
+; =============================================================================
+
+args_run:
+    lea rbx, [rsp + 16]             ; rbx = argv (argv[1] entrada, argv[2] salida, argv[3] cuadrante)
+    mov r12, [rsp + 8]              ; argc: 4 (sin medidas), 6 (ANCHO ALTO), 7 (+ GRID) u 8 (+ FACTOR)
+
+    mov rdi, [rbx + 24]             ; "stream" => (12) modo por bandas
+    cmp dword [rdi], 'stre'
+    jne .not_stream
+    cmp word [rdi + 4], 'am'
+    jne .not_stream
+    cmp byte [rdi + 6], 0
+    je stream_run
+
+.not_stream:
+    cmp r12, 5
+    je .bad_args
+    cmp r12, 8
+    ja .bad_args
+    jb .grid_arg
+
+    mov rdi, [rbx + 56]             ; FACTOR (setup_geometry valida el rango)
+    call parse_arg_uint
+    test rax, rax
+    jle .bad_args
+    mov [factor_n], rax
+
+.grid_arg:
+    cmp r12, 7
+    jb .geometry_ready
+
+    mov rdi, [rbx + 48]             ; GRID
+    call parse_arg_uint
+    test rax, rax
+    jle .bad_args
+    mov [grid_n], rax
+
+.geometry_ready:
+    cmp r12, 6
+    jb .geometry
+
+    mov rdi, [rbx + 32]             ; ANCHO
+    call parse_arg_uint
+    test rax, rax
+    jle .bad_args
+    mov [img_w], rax
+
+    mov rdi, [rbx + 40]             ; ALTO
+    call parse_arg_uint
+    test rax, rax
+    jle .bad_args
+    mov [img_h], rax
+
+.geometry:
+    call setup_geometry             ; tile_w, out_w, ..., quad_max + kernel_set_geometry
+    test rax, rax
+    js .bad_args
+
+    mov rdi, [rbx + 24]             ; "full", "all" o lista => full_mode / quad_list
+    call parse_quadrant_list
+    test rax, rax
+    js .bad_args
+    jnz .open_in
+
+    mov rdi, [rbx + 24]             ; Un solo cuadrante => lista de uno
+    call parse_arg_uint
+    test rax, rax
+    jle .bad_args
+    cmp eax, [quad_max]
+    ja .bad_args
+    mov [quad_list], al
+    mov dword [quad_count], 1
+
+.open_in:
+    call alloc_buffers              ; full_buffer solo si full_mode
+
+    call time_start                 ; Etapas medidas si timing_on (leer => ... => escribir)
+
+    mov rdi, [rbx + 8]              ; r13 = entrada ("-" => stdin, fd 0)
+    call open_input
+    mov r13, rax
+
+    mov edi, r13d                   ; img_w*img_h bytes (un pipe los entrega en pedazos)
+    mov rsi, [buffer]
+    mov rdx, [img_bytes]
+    call read_full
+    cmp rax, [img_bytes]
+    jne error_read_in               ; Error o entrada más corta que la imagen
+    mov [read_count], rax
+
+    mov rdi, r13                    ; stdin no se cierra
+    call close_fd
+
+    mov edi, TIME_READ
+    call time_lap
+
+    mov rdi, [rbx + 16]             ; r14 = salida ("-" => stdout y mensajes a stderr)
+    call open_output
+    mov r14, rax
+
+    mov rdi, [read_count]           ; (a) Bytes leídos
+    mov rsi, msg_bytes_read
+    mov edx, msg_bytes_read_end - msg_bytes_read
+    call print_value
+
+    mov edi, TIME_WRITE             ; Abrir la salida y los mensajes cuentan como "escribir"
+    call time_lap
+
+    cmp byte [full_mode], 0
+    jne .full
+
+    xor r15d, r15d                  ; Primer cuadrante de la lista
+
+.quad_loop:
+    cmp r15d, [quad_count]
+    jae .close
+
+    movzx r12d, byte [quad_list + r15]
+
+    ; Los pasos de process_quadrant por separado, para medir cada etapa
+    mov rdi, [buffer]               ; extract_quadrant(buffer, img_w, q, quad_buffer)
+    mov rsi, [img_w]
+    mov edx, r12d
+    mov rcx, [quad_buffer]
+    call extract_quadrant
+    mov edi, TIME_COPY
+    call time_lap
+
+    mov rdi, [quad_buffer]          ; interpnx_tile(quad_buffer, tile_w, tile_w, tile_h, interp_buffer, out_w)
+    mov rsi, [tile_w]
+    mov rdx, rsi
+    mov rcx, [tile_h]
+    mov r8, [interp_buffer]
+    mov r9, [out_w]
+    call interpnx_tile
+    mov edi, TIME_INTERP
+    call time_lap
+
+    mov rdi, [quad_buffer]          ; Checksums (sub-bloque, imagen interpolada) => batch_csums
+    mov rsi, [tile_bytes]
+    call checksum_bytes
+    mov [batch_csums], rax
+    mov rdi, [interp_buffer]
+    mov rsi, [out_bytes]
+    call checksum_bytes
+    mov [batch_csums + 8], rax
+    mov edi, TIME_CSUM
+    call time_lap
+
+    mov edi, r14d                   ; El bloque out_w x out_h a la salida
+    mov rsi, [interp_buffer]
+    mov rdx, [out_bytes]
+    call write_full
+    cmp rax, [out_bytes]
+    jne error_write_out
+
+    mov eax, r12d                   ; "Cuadrante: XX"
+    xor edx, edx
+    mov ecx, 10
+    div ecx
+    add al, '0'
+    add dl, '0'
+    mov [msg_batch_quad + 11], al
+    mov [msg_batch_quad + 12], dl
+    mov eax, 1
+    mov rdi, [msg_fd]
+    mov rsi, msg_batch_quad
+    mov edx, msg_batch_quad_end - msg_batch_quad
+    syscall
+
+    mov rdi, [batch_csums]          ; Checksum sub-bloque
+    mov rsi, msg_checksum_sub
+    mov edx, msg_checksum_sub_end - msg_checksum_sub
+    call print_value
+
+    mov rdi, [batch_csums + 8]      ; Checksum imagen interpolada
+    mov rsi, msg_checksum_interp
+    mov edx, msg_checksum_interp_end - msg_checksum_interp
+    call print_value
+
+    mov edi, TIME_WRITE
+    call time_lap
+
+    inc r15d
+    jmp .quad_loop
+
+.full:
+    mov rdi, [buffer]               ; process_frame_wsum(buffer, img_w, img_h, full_buffer, batch_csums)
+    mov rsi, [img_w]
+    mov rdx, [img_h]
+    mov rcx, [full_buffer]
+    mov r8, batch_csums
+    call process_frame_wsum
+    mov edi, TIME_INTERP            ; Los checksums y firmas se suman por banda dentro
+    call time_lap                   ; de process_frame_wsum: cuentan como "interpolar"
+
+    mov edi, r14d                   ; Los full_bytes a la salida
+    mov rsi, [full_buffer]
+    mov rdx, [full_bytes]
+    call write_full
+    cmp rax, [full_bytes]
+    jne error_write_out
+
+    mov rdi, [batch_csums]          ; Checksum imagen original
+    mov rsi, msg_checksum_frame
+    mov edx, msg_checksum_frame_end - msg_checksum_frame
+    call print_value
+
+    mov rdi, [batch_csums + 8]      ; Checksum imagen interpolada
+    mov rsi, msg_checksum_interp
+    mov edx, msg_checksum_interp_end - msg_checksum_interp
+    call print_value
+
+    mov rdi, [batch_csums + 16]     ; Firmas de las dos imágenes
+    mov rsi, msg_firma_frame
+    mov edx, msg_firma_frame_end - msg_firma_frame
+    call print_value
+    mov rdi, [batch_csums + 24]
+    mov rsi, msg_firma_interp
+    mov edx, msg_firma_interp_end - msg_firma_interp
+    call print_value
+
+.close:
+    mov rdi, r14                    ; stdout no se cierra
+    call close_fd
+
+    mov edi, TIME_WRITE
+    call time_lap
+    call print_timings              ; Tiempos por etapa (solo si timing_on)
+
+    mov rax, 60                     ; exit(0)
+    xor rdi, rdi
+    syscall
+
+.bad_args:
+    mov eax, 1                      ; Uso correcto a stderr y exit(1), como un config.txt mal escrito
+    mov edi, 2
+    mov rsi, msg_usage
+    mov edx, msg_usage_end - msg_usage
+    syscall
+    mov rax, 60
+    mov rdi, 1
+    syscall
+
+
+
+
+; **************************************************************************************************************************************************
+; (12) Modo por bandas: ./procesamiento ENTRADA SALIDA stream ANCHO ALTO [FILAS]
+; **************************************************************************************************************************************************
+; Interpola la imagen completa (como "full") sin tenerla entera en memoria:
+; lee FILAS filas por vez (256 por defecto), las interpola y escribe las
+; 2*FILAS filas de salida antes de leer la banda siguiente. Sirve para
+; imágenes de decenas de miles de píxeles por lado, también por pipes.
+;
+; La fila 2r+1 de la salida necesita la fila r+1 de la entrada, así que la
+; última fila leída de cada banda no se emite todavía: queda como halo (se
+; copia al inicio del buffer) y se interpola junto con la banda siguiente.
+; Solo en la última banda se usa el clamp del borde, igual que en "full":
+; la salida es idéntica byte a byte, sin costuras entre bandas.
+;
+; Memoria: buffer = (FILAS+1)*ANCHO bytes y full_buffer = 4*(FILAS+1)*ANCHO,
+; sin importar el ALTO. Los checksums y las firmas se acumulan banda por banda
+; con wsum_add (stream_wsum): cada banda se firma desde la posición de su
+; primera fila emitida (WS_BASE, que avanza con cada banda), así que las
+; firmas son las de la imagen entera, las mismas que en "full".
+;
+; - rbx: filas a emitir en la banda actual
+; - rbp: bytes de salida de la banda
+; - r12: filas de la entrada que faltan leer
+; - r13: descriptor de entrada (0 = stdin)
+; - r14: descriptor de salida (1 = stdout)
+; - r15: filas en buffer (halo + banda)
+; =============================================================================
+
+stream_run:
+    mov qword [band_rows], STREAM_BAND_ROWS
+    cmp r12, 6                      ; argc: 6 (ANCHO ALTO) o 7 (ANCHO ALTO FILAS)
+    jb args_run.bad_args
+    cmp r12, 7
+    ja args_run.bad_args
+    jb .size
+
+    mov rdi, [rbx + 48]             ; FILAS
+    call parse_arg_uint
+    test rax, rax
+    jle args_run.bad_args
+    cmp rax, STREAM_MAX_ROWS
+    ja args_run.bad_args
+    mov [band_rows], rax
+
+.size:
+    mov rdi, [rbx + 32]             ; ANCHO
+    call parse_arg_uint
+    test rax, rax
+    jle args_run.bad_args
+    mov [img_w], rax
+
+    mov rdi, [rbx + 40]             ; ALTO
+    call parse_arg_uint
+    test rax, rax
+    jle args_run.bad_args
+    mov [img_h], rax
+
+    mov rdi, [band_rows]            ; buffer: FILAS+1 filas de entrada
+    inc rdi
+    imul rdi, [img_w]
+    call mmap_buffer
+    mov [buffer], rax
+
+    mov rdi, [band_rows]            ; full_buffer: 2*(FILAS+1) filas de 2*ANCHO
+    inc rdi
+    imul rdi, [img_w]
+    shl rdi, 2
+    call mmap_buffer
+    mov [full_buffer], rax
+
+    mov rdi, [rbx + 8]
+    call open_input
+    mov r13, rax
+    mov rdi, [rbx + 16]
+    call open_output
+    mov r14, rax
+
+    mov r12, [img_h]                ; Todas las filas por leer
+    xor r15d, r15d                  ; Buffer vacío (sin halo todavía)
+    mov qword [read_count], 0       ; stream_wsum ya está en cero (.bss): suma, firma y posición
+
+.band:
+    mov rax, [band_rows]            ; n = min(lugar libre, filas que faltan)
+    inc rax
+    sub rax, r15
+    cmp rax, r12
+    cmova rax, r12
+    sub r12, rax
+
+    mov rsi, r15                    ; read_full(entrada, buffer + filas*ANCHO, n*ANCHO)
+    imul rsi, [img_w]
+    add rsi, [buffer]
+    add r15, rax
+    imul rax, [img_w]
+    mov rbx, rax
+    mov edi, r13d
+    mov rdx, rax
+    call read_full
+    cmp rax, rbx
+    jne error_read_in               ; Error o imagen incompleta
+    add [read_count], rbx
+
+    mov rdi, [buffer]               ; interp2x_tile(buffer, ANCHO, ANCHO, filas, full_buffer, 2*ANCHO)
+    mov rsi, [img_w]
+    mov rdx, rsi
+    mov rcx, r15
+    mov r8, [full_buffer]
+    lea r9, [rsi + rsi]
+    call interp2x_tile
+
+    mov rbx, r15                    ; Filas a emitir: todas si es la última banda,
+    test r12, r12                   ; si no, todas menos el halo
+    jz .emit
+    dec rbx
+
+.emit:
+    mov rdx, rbx                    ; 2 filas de 2*ANCHO por cada fila emitida
+    imul rdx, [img_w]
+    shl rdx, 2
+    mov rbp, rdx                    ; rbp = bytes a escribir (write_full pisa rdx)
+    mov edi, r14d
+    mov rsi, [full_buffer]
+    call write_full
+    cmp rax, rbp
+    jne error_write_out
+
+    mov rdi, [buffer]               ; Checksum y firma de las filas emitidas
+    mov rsi, rbx
+    imul rsi, [img_w]
+    mov rdx, stream_wsum
+    mov rcx, [stream_wsum + WS_BASE]
+    add [stream_wsum + WS_BASE], rsi
+    call wsum_add
+    mov rdi, [full_buffer]          ; ... y de sus 2 filas de 2*ANCHO cada una
+    mov rsi, rbx
+    imul rsi, [img_w]
+    shl rsi, 2
+    mov rdx, stream_wsum + WSUM_SIZE
+    mov rcx, [stream_wsum + WSUM_SIZE + WS_BASE]
+    add [stream_wsum + WSUM_SIZE + WS_BASE], rsi
+    call wsum_add
+
+    test r12, r12                   ; Era la última banda?
+    jz .finish
+
+    mov rsi, r15                    ; Halo: la última fila leída pasa al inicio del buffer
+    dec rsi
+    imul rsi, [img_w]
+    add rsi, [buffer]
+    mov rdi, [buffer]
+    mov rcx, [img_w]
+    rep movsb
+    mov r15d, 1
+    jmp .band
+
+.finish:
+    mov rdi, r13                    ; stdin / stdout no se cierran
+    call close_fd
+    mov rdi, r14
+    call close_fd
+
+    mov rdi, [read_count]           ; (a) Bytes leídos
+    mov rsi, msg_bytes_read
+    mov edx, msg_bytes_read_end - msg_bytes_read
+    call print_value
+
+    mov rdi, [stream_wsum + WS_SUM] ; (b) Checksum imagen original
+    mov rsi, msg_checksum_frame
+    mov edx, msg_checksum_frame_end - msg_checksum_frame
+    call print_value
+
+    mov rdi, [stream_wsum + WSUM_SIZE + WS_SUM]     ; (c) Checksum imagen interpolada
+    mov rsi, msg_checksum_interp
+    mov edx, msg_checksum_interp_end - msg_checksum_interp
+    call print_value
+
+    mov rdi, [stream_wsum + WS_FIRMA]               ; (d) Firmas, como en "full"
+    mov rsi, msg_firma_frame
+    mov edx, msg_firma_frame_end - msg_firma_frame
+    call print_value
+    mov rdi, [stream_wsum + WSUM_SIZE + WS_FIRMA]
+    mov rsi, msg_firma_interp
+    mov edx, msg_firma_interp_end - msg_firma_interp
+    call print_value
+
+    mov rax, 60                     ; exit(0)
+    xor rdi, rdi
+    syscall
+
+
+
+
+; =============================================================================
+; open_input / open_output / close_fd:
+; -----------------------------------------------------------------------------
+;   open_input(rdi = ruta) -> rax = descriptor de lectura; "-" => 0 (stdin).
+;   open_output(rdi = ruta) -> rax = descriptor de escritura (O_TRUNC, 0644);
+;   "-" => 1 (stdout) y los mensajes pasan a stderr (msg_fd = 2).
+;   close_fd(rdi = descriptor) cierra, salvo stdin / stdout.
+;   Si no se puede abrir salen con código 11 / 13.
+;   open_input avisa al kernel que el archivo se lee de corrido (advise_sequential).
+; =============================================================================
+
+open_input:
+    xor eax, eax
+    cmp word [rdi], '-'             ; '-' seguido del 0 final
+    je .ret
+    mov eax, 2                      ; sys_open(ruta, O_RDONLY)
+    xor esi, esi
+    xor edx, edx
+    syscall
+    test rax, rax
+    js error_open_in
+    push rax
+    mov rdi, rax
+    call advise_sequential
+    pop rax
+.ret:
+    ret
+
+open_output:
+    mov eax, 1
+    cmp word [rdi], '-'
+    jne .open
+    mov qword [msg_fd], 2
+    ret
+.open:
+    mov eax, 2                      ; sys_open(ruta, O_WRONLY|O_CREAT|O_TRUNC, 0644)
+    mov esi, 577
+    mov edx, 420
+    syscall
+    test rax, rax
+    js error_open_out
+    ret
+
+close_fd:
+    cmp rdi, 1
+    jbe .ret
+    mov eax, 3
+    syscall
+.ret:
+    ret
+
+
+
+
+; =============================================================================
+; parse_arg_uint / print_value:
+; -----------------------------------------------------------------------------
+;   parse_arg_uint(rdi = cadena de argv): como parse_uint, pero el número debe
+;   ocupar todo el argumento; devuelve -1 si sobra algo ("12x").
+;   print_value(rdi = valor, rsi = mensaje, rdx = largo): escribe el mensaje,
+;   el valor en hex y un salto de línea en msg_fd.
+; =============================================================================
+
+parse_arg_uint:
+    call parse_uint
+    cmp byte [rdi], 0
+    je .ret
+    mov rax, -1
+.ret:
+    ret
+
+print_value:
+    push rdi
+    mov eax, 1
+    mov rdi, [msg_fd]
+    syscall
+    pop rdi
+    call print_hex
+    mov eax, 1
+    mov rdi, [msg_fd]
+    mov rsi, new_line
+    mov edx, 1
+    syscall
+    ret
+
+
+
+
 ; **************************************************************READ_CONFIG_FROM_FILE******************************************************************
 ; read_config_from_file:
 ;   Lee config.txt:
 ;     - Primera linea => path de la imagen => path_buffer
 ;     - Segunda linea => cuadrante (1..16) => [quadrant]
+;                        o "all" / "1,5,16" => quad_list (modo lote)
+;                        o "full" => full_mode (imagen completa)
+;     - Lineas siguientes (opcionales) => "packed" (modo lote)
+;                                          "size ANCHO ALTO [GRID]"
 ; **************************************************************************************************************************************************
 
 
@@ -1074,11 +2452,10 @@ read_config_from_file:
 
     mov rbx, rax                ; Almacenamos el descriptor de archivo en rbx, un número que el s.o usa para identificar el archivo abierto
 
-    mov rax, 0                  ; Llamada al sistema para leer archivos
-    mov rdi, rbx                ; Pasamos el descriptor de archivo
+    mov edi, ebx                ; Pasamos el descriptor de archivo
     mov rsi, config_buffer      ; Dirección donde se guardará lo leído
-    mov rdx, 256                ; Cantidad máxima de bytes a leer
-    syscall                     ; Llamamos al sistema operativo para leer
+    mov rdx, 255                ; Cantidad máxima de bytes a leer (el último queda en 0, fin de texto)
+    call read_full              ; Hasta 255 bytes o fin del archivo, aunque lleguen en pedazos
 
     cmp rax, 0                  ; Verificamos que la lectura no devolviera un valor negativo
     js  error_read_config       ; Si hubo error, salta a la rutina de manejo
@@ -1087,6 +2464,14 @@ read_config_from_file:
     mov rdi, rbx                ; Usamos el descriptor de archivo que abrimos
     syscall                     ; Cerramos el archivo
 
+    call parse_config_options   ; Líneas 3 en adelante: "packed", "size ANCHO ALTO [GRID]"
+    test rax, rax
+    js .error_bad_config        ; "size" mal escrito
+
+    call setup_geometry         ; tile_w, tile_h, out_w, ... y quad_max (antes de validar el cuadrante)
+    test rax, rax
+    js .error_bad_config        ; Dimensiones o GRID fuera de rango
+
     xor rcx, rcx                ; Reiniciamos este registro a cero (para usarlo mas tardito)
     xor rdx, rdx                ; Reiniciamos este otro registro a cero (para usrlo mas tardito)
 
@@ -1137,6 +2522,14 @@ read_config_from_file:
     mov byte [path_buffer + rdx], 0  ; Inserta un caracter nulo ('\0') al final de la ruta
     inc rcx                           ; Avanza en config_buffer (después del salto de línea)
     
+    push rcx                          ; Guarda la posición de la segunda línea
+    lea rdi, [config_buffer + rcx]    ; rdi = inicio de la segunda línea
+    call parse_quadrant_list          ; "all" o lista con comas => modo lote; "full" => imagen completa
+    pop rcx
+    cmp rax, 0
+    jl .error_bad_config              ; -1 => lista mal escrita o cuadrante fuera de 1..quad_max
+    jg .batch_ok                      ; n > 0 => modo lote (o imagen completa) listo
+
     xor rdx, rdx                      ; Reinicia rdx a cero para usos posteriores
 
 
@@ -1202,12 +2595,16 @@ read_config_from_file:
     mov eax, [quadrant]          ; Carga el valor de 'quadrant' en el registro eax
     cmp eax, 1                   ; Verifica si es menor que 1
     jl .error_range              ; Si es menor que 1, salta al manejo de error de rango
-    cmp eax, 16                  ; Verifica si es mayor que 16
+    cmp eax, [quad_max]          ; Verifica si es mayor que 16 (quad_max = grid_n*grid_n)
     jg .error_range              ; Si es mayor que 16, también salta al error de rango
 
     leave                        ; Limpia la pila y restaura el punto de referencia anterior
     ret                          ; Retorna de la función
 
+.batch_ok:
+    leave                        ; Modo lote: quad_list / quad_count (o full_mode) ya quedaron cargados
+    ret
+
 
 
 
@@ -1325,6 +2722,715 @@ parse_quadrant:
 
 
 
+; =============================================================================
+; parse_quadrant_list:
+; -----------------------------------------------------------------------------
+;   Revisa si la segunda línea de config.txt pide un lote de cuadrantes.
+;   - rdi: inicio de la segunda línea dentro de config_buffer
+;   - "all"            => quad_list = 1..quad_max (1..16 por defecto)
+;   - "1,5,16" (comas, espacios permitidos) => quad_list = 1, 5, 16
+;   - "full"           => full_mode = 1 (imagen completa, no usa quad_list)
+;   - Un solo número sin comas => no es lote (flujo original con imagen_out.img)
+;   ("packed" se lee en parse_config_options)
+;   Devuelve en rax: 0 si no es lote, n cuadrantes (1 con "full"), -1 si la
+;   lista está mal escrita o tiene un cuadrante fuera de 1..quad_max.
+; =============================================================================
+
+parse_quadrant_list:
+    push rbp
+    mov rbp, rsp
+
+    xor ecx, ecx                ; rcx = cuadrantes guardados en quad_list
+
+    cmp byte [rdi], 'f'         ; "full"?
+    jne .check_all
+    cmp byte [rdi + 1], 'u'
+    jne .bad
+    cmp byte [rdi + 2], 'l'
+    jne .bad
+    cmp byte [rdi + 3], 'l'
+    jne .bad
+    mov byte [full_mode], 1
+    mov eax, 1
+    leave
+    ret
+
+.check_all:
+    cmp byte [rdi], 'a'         ; "all"?
+    jne .scan_commas
+    cmp byte [rdi + 1], 'l'
+    jne .bad
+    cmp byte [rdi + 2], 'l'
+    jne .bad
+    add rdi, 3
+
+.all_fill:
+    lea eax, [rcx + 1]          ; Cuadrantes 1..quad_max en orden
+    mov [quad_list + rcx], al
+    inc ecx
+    cmp ecx, [quad_max]
+    jb .all_fill
+    jmp .end_line
+
+.scan_commas:
+    mov rsi, rdi                ; Busca una coma antes del fin de línea
+
+.scan_loop:
+    mov al, [rsi]
+    cmp al, 0
+    je .single
+    cmp al, 10
+    je .single
+    cmp al, ','
+    je .next_item
+    inc rsi
+    jmp .scan_loop
+
+.single:
+    xor eax, eax                ; Sin comas: un solo cuadrante, lo parsea .next_line_loop
+    leave
+    ret
+
+.next_item:
+    cmp byte [rdi], ' '         ; Salta espacios antes del número
+    jne .digits
+    inc rdi
+    jmp .next_item
+
+.digits:
+    xor r8d, r8d                ; r8 = valor del cuadrante
+    xor edx, edx                ; rdx = dígitos leídos (máximo 2)
+
+.digit_loop:
+    movzx eax, byte [rdi]
+    sub eax, '0'
+    cmp eax, 9
+    ja .item_end                ; No es dígito => fin del número
+    imul r8d, r8d, 10
+    add r8d, eax
+    inc rdi
+    inc edx
+    cmp edx, 2
+    ja .bad                     ; Más de dos dígitos
+    jmp .digit_loop
+
+.item_end:
+    test edx, edx               ; Número vacío (",," o coma al final)
+    jz .bad
+    cmp r8d, 1
+    jl .bad
+    cmp r8d, [quad_max]
+    jg .bad
+    cmp ecx, MAX_GRID*MAX_GRID  ; Como mucho lo que cabe en quad_list
+    jae .bad
+    mov [quad_list + rcx], r8b
+    inc ecx
+
+.skip_after:
+    cmp byte [rdi], ' '         ; Salta espacios después del número
+    jne .separator
+    inc rdi
+    jmp .skip_after
+
+.separator:
+    cmp byte [rdi], ','         ; Otra coma => otro cuadrante
+    jne .end_line
+    inc rdi
+    jmp .next_item
+
+.end_line:
+    mov al, [rdi]               ; Lo que queda de la línea solo puede ser espacios/'\r'
+    cmp al, ' '
+    je .skip_tail
+    cmp al, 13
+    je .skip_tail
+    cmp al, 0
+    je .ok_batch
+    cmp al, 10
+    je .ok_batch
+    jmp .bad
+
+.skip_tail:
+    inc rdi
+    jmp .end_line
+
+.ok_batch:
+    mov [quad_count], ecx
+    mov byte [batch_mode], 1
+    mov eax, ecx                ; rax = n
+    leave
+    ret
+
+.bad:
+    mov rax, -1
+    leave
+    ret
+
+
+
+
+; =============================================================================
+; parse_config_options:
+; -----------------------------------------------------------------------------
+;   Recorre las líneas de config.txt a partir de la tercera:
+;   - "packed"                 => packed_mode = 1 (modo lote en un solo archivo)
+;   - "size ANCHO ALTO [GRID]" => img_w, img_h (y grid_n)
+;   - "factor N"               => factor_n (setup_geometry valida 2..8)
+;   - "threads N"              => kernel_set_threads(N) (0 = uno por CPU)
+;   Otras líneas se ignoran. Devuelve rax = 0, o -1 si "size", "factor" o
+;   "threads" están mal escritos.
+; =============================================================================
+
+parse_config_options:
+    mov rdi, config_buffer      ; rdi recorre config_buffer
+    mov ecx, 2                  ; Saltamos las dos primeras líneas (ruta y cuadrante)
+
+.skip_line:
+    mov al, [rdi]
+    cmp al, 0
+    je .done
+    inc rdi
+    cmp al, 10
+    jne .skip_line
+    dec ecx
+    jnz .skip_line
+
+.line:
+    cmp byte [rdi], ' '         ; Espacios al inicio de la línea
+    jne .option
+    inc rdi
+    jmp .line
+
+.option:
+    mov al, [rdi]
+    cmp al, 0
+    je .done
+    cmp al, 'p'                 ; "packed"
+    je .packed
+    cmp al, 's'                 ; "size ..."
+    je .size
+    cmp al, 'f'                 ; "factor N"
+    je .factor
+    cmp al, 't'                 ; "threads N"
+    je .threads
+
+.next_line:
+    mov al, [rdi]               ; Salta el resto de la línea
+    cmp al, 0
+    je .done
+    inc rdi
+    cmp al, 10
+    jne .next_line
+    jmp .line
+
+.packed:
+    mov byte [packed_mode], 1
+    jmp .next_line
+
+.size:
+    cmp dword [rdi], 'size'
+    jne .bad
+    add rdi, 4
+
+    call parse_uint             ; ANCHO
+    test rax, rax
+    jle .bad
+    mov [img_w], rax
+
+    call parse_uint             ; ALTO
+    test rax, rax
+    jle .bad
+    mov [img_h], rax
+
+    call parse_uint             ; GRID (opcional)
+    test rax, rax
+    js .next_line               ; No hay => queda grid_n
+    jz .bad
+    mov [grid_n], rax
+    jmp .next_line
+
+.factor:
+    cmp dword [rdi], 'fact'
+    jne .bad
+    cmp word [rdi + 4], 'or'
+    jne .bad
+    add rdi, 6
+
+    call parse_uint             ; N
+    test rax, rax
+    jle .bad
+    mov [factor_n], rax
+    jmp .next_line
+
+.threads:
+    cmp dword [rdi], 'thre'
+    jne .bad
+    cmp dword [rdi + 3], 'eads'
+    jne .bad
+    add rdi, 7
+
+    call parse_uint             ; N
+    test rax, rax
+    js .bad
+    push rdi
+    mov edi, eax
+    call kernel_set_threads     ; Pisa rcx, rdx, rsi, r8..r11
+    pop rdi
+    jmp .next_line
+
+.done:
+    xor eax, eax
+    ret
+
+.bad:
+    mov rax, -1
+    ret
+
+
+
+
+; =============================================================================
+; parse_uint:
+; -----------------------------------------------------------------------------
+;   Lee un número decimal (hasta 6 dígitos) en rdi, saltando espacios antes.
+;   Devuelve el valor en rax (o -1 si no hay dígitos) y deja rdi después del
+;   número. Pisa rdx y r8.
+; =============================================================================
+
+parse_uint:
+    cmp byte [rdi], ' '
+    jne .start
+    inc rdi
+    jmp parse_uint
+
+.start:
+    xor eax, eax                ; rax = valor
+    xor edx, edx                ; rdx = dígitos leídos
+
+.digit:
+    movzx r8d, byte [rdi]
+    sub r8d, '0'
+    cmp r8d, 9
+    ja .end                     ; No es dígito => fin del número
+    imul rax, rax, 10
+    add rax, r8
+    inc rdi
+    inc edx
+    cmp edx, 6
+    ja .bad
+    jmp .digit
+
+.end:
+    test edx, edx
+    jz .bad
+    ret
+
+.bad:
+    mov rax, -1
+    ret
+
+
+
+
+; =============================================================================
+; setup_geometry:
+; -----------------------------------------------------------------------------
+;   A partir de img_w, img_h, grid_n y factor_n calcula los tamaños que usan los bucles:
+;     tile_w = img_w / grid_n        tile_h = img_h / grid_n
+;     out_w  = factor_n*tile_w       out_h  = factor_n*tile_h
+;     tile_last_c / tile_last_r (clamp), *_bytes y quad_max = grid_n*grid_n
+;   y se los pasa al kernel (kernel_set_factor y kernel_set_geometry) para
+;   extract_quadrant, interpnx_tile y process_quadrant. Con los valores por
+;   defecto da 100x100 => 200x200.
+;   Devuelve rax = 0, o -1 si factor_n no está en 2..KERNEL_MAX_FACTOR, grid_n
+;   no está en 1..MAX_GRID, algún lado pasa de MAX_DIM o el sub-bloque queda vacío.
+; =============================================================================
+
+setup_geometry:
+    mov rdi, [factor_n]
+    cmp rdi, KERNEL_MAX_FACTOR
+    ja .bad
+    call kernel_set_factor      ; Pesos por fase (rax = -1 si el factor no vale)
+    test rax, rax
+    jnz .bad
+
+    mov rcx, [grid_n]
+    cmp rcx, 1
+    jb .bad
+    cmp rcx, MAX_GRID
+    ja .bad
+    cmp qword [img_w], MAX_DIM
+    ja .bad
+    cmp qword [img_h], MAX_DIM
+    ja .bad
+
+    mov rax, [img_w]            ; tile_w = img_w / grid_n
+    xor edx, edx
+    div rcx
+    test rax, rax
+    jz .bad
+    mov [tile_w], rax
+    lea rdx, [rax - 1]
+    mov [tile_last_c], rdx
+    imul rax, [factor_n]
+    mov [out_w], rax
+
+    mov rax, [img_h]            ; tile_h = img_h / grid_n
+    xor edx, edx
+    div rcx
+    test rax, rax
+    jz .bad
+    mov [tile_h], rax
+    lea rdx, [rax - 1]
+    mov [tile_last_r], rdx
+    imul rax, [factor_n]
+    mov [out_h], rax
+
+    mov rax, [tile_w]           ; Tamaños en bytes
+    imul rax, [tile_h]
+    mov [tile_bytes], rax
+    mov rax, [out_w]
+    imul rax, [out_h]
+    mov [out_bytes], rax
+    mov rax, [img_w]
+    imul rax, [img_h]
+    mov [img_bytes], rax
+    mov rdx, [factor_n]
+    imul rdx, rdx
+    imul rax, rdx               ; factor_n^2 veces la imagen
+    mov [full_bytes], rax
+
+    mov eax, ecx                ; quad_max = grid_n*grid_n
+    imul eax, ecx
+    mov [quad_max], eax
+
+    mov edi, [img_w]            ; Misma geometría para el kernel
+    mov esi, [img_h]
+    mov edx, ecx
+    call kernel_set_geometry    ; rax = 0 / -1
+    ret
+
+.bad:
+    mov rax, -1
+    ret
+
+
+
+
+; =============================================================================
+; alloc_buffers / mmap_buffer:
+; -----------------------------------------------------------------------------
+;   Reserva los buffers con mmap (anónimo, lectura/escritura) según las
+;   dimensiones de config.txt, en lugar de tamaños fijos en .bss:
+;     buffer = img_bytes, quad_buffer = tile_bytes, interp_buffer = out_bytes,
+;     full_buffer = full_bytes (solo en modo imagen completa)
+;   mmap_buffer(rdi = tamaño) -> rax = dirección; si falla sale con código 15.
+; =============================================================================
+
+alloc_buffers:
+    mov rdi, [img_bytes]
+    call mmap_buffer
+    mov [buffer], rax
+
+    mov rdi, [tile_bytes]
+    call mmap_buffer
+    mov [quad_buffer], rax
+
+    mov rdi, [out_bytes]
+    call mmap_buffer
+    mov [interp_buffer], rax
+
+    cmp byte [full_mode], 0
+    je .done
+    mov rdi, [full_bytes]
+    call mmap_buffer
+    mov [full_buffer], rax
+.done:
+    ret
+
+mmap_buffer:
+    mov rsi, rdi                ; length
+    xor edi, edi                ; addr = NULL (lo elige el kernel)
+    mov edx, 3                  ; PROT_READ | PROT_WRITE
+    mov r10d, 0x22              ; MAP_PRIVATE | MAP_ANONYMOUS
+    mov r8, -1                  ; fd = -1 (anónimo)
+    xor r9d, r9d                ; offset = 0
+    mov eax, 9                  ; sys_mmap
+    syscall
+    cmp rax, 0
+    js error_alloc              ; Negativo => no hay memoria
+    ret
+
+
+
+
+; =============================================================================
+; read_full / write_full:
+; -----------------------------------------------------------------------------
+;   read_full(edi = fd, rsi = buffer, rdx = n) repite sys_read hasta tener n
+;   bytes o llegar a EOF (un pipe entrega los datos en pedazos).
+;   write_full(edi = fd, rsi = buffer, rdx = n) repite sys_write hasta
+;   escribir los n bytes.
+;   Cada syscall pide todo lo que falta (una sola lectura grande si el
+;   archivo lo permite; los buffers son de mmap, alineados a página).
+;   Devuelven rax = bytes transferidos (menos de n si hubo EOF), o el error
+;   negativo de la syscall. EINTR (-4) se reintenta.
+;   Usa r8-r10 (más rcx/r11 de la syscall).
+; =============================================================================
+
+read_full:
+    xor r8d, r8d                ; Bytes leídos hasta ahora
+    mov r9, rsi
+    mov r10, rdx
+.loop:
+    cmp r8, r10
+    jae .done
+    xor eax, eax                ; sys_read(fd, buffer + hechos, n - hechos)
+    lea rsi, [r9 + r8]
+    mov rdx, r10
+    sub rdx, r8
+    syscall
+    cmp rax, -4                 ; EINTR => reintentar
+    je .loop
+    test rax, rax
+    js .ret                     ; Error
+    jz .done                    ; EOF
+    add r8, rax
+    jmp .loop
+.done:
+    mov rax, r8
+.ret:
+    ret
+
+write_full:
+    xor r8d, r8d                ; Bytes escritos hasta ahora
+    mov r9, rsi
+    mov r10, rdx
+.loop:
+    cmp r8, r10
+    jae .done
+    mov eax, 1                  ; sys_write(fd, buffer + hechos, n - hechos)
+    lea rsi, [r9 + r8]
+    mov rdx, r10
+    sub rdx, r8
+    syscall
+    cmp rax, -4
+    je .loop
+    test rax, rax
+    js .ret
+    jz .done                    ; No avanzó: devolvemos lo escrito (< n)
+    add r8, rax
+    jmp .loop
+.done:
+    mov rax, r8
+.ret:
+    ret
+
+
+
+
+; =============================================================================
+; detect_timing / detect_threads / time_start / time_lap / print_timings:
+; -----------------------------------------------------------------------------
+;   detect_timing(rdi = envp): timing_on = 1 si alguna variable es exactamente
+;   "PROCESAMIENTO_TIEMPOS=1".
+;   detect_threads(rdi = envp): con "PROCESAMIENTO_HILOS=N" llama a
+;   kernel_set_threads(N).
+;   time_start: toma la marca inicial (time_last).
+;   time_lap(edi = etapa TIME_*): suma a time_acc[etapa] lo transcurrido desde
+;   la marca anterior y toma una marca nueva; así cada intervalo cuenta en una
+;   sola etapa. Conserva todos los registros (se llama en medio de los bucles).
+;   print_timings: "Tiempo <etapa> (ns, hex): 0x..." por etapa, en msg_fd.
+;   Sin timing_on las cuatro vuelven enseguida (sin syscalls). El reloj es
+;   clock_gettime(CLOCK_MONOTONIC): rdtsc cuenta ciclos de referencia cuya
+;   frecuencia habría que calibrar para pasarlos a ns.
+; =============================================================================
+
+detect_timing:
+.next_var:
+    mov rsi, [rdi]              ; Siguiente cadena "NOMBRE=valor" (NULL = fin de envp)
+    test rsi, rsi
+    jz .ret
+    add rdi, 8
+    mov rdx, env_timing
+.cmp:
+    mov al, [rsi]
+    cmp al, [rdx]
+    jne .next_var
+    inc rsi
+    inc rdx
+    test al, al                 ; Iguales hasta el 0 final => encontrada
+    jnz .cmp
+    mov byte [timing_on], 1
+.ret:
+    ret
+
+detect_threads:                 ; rdi = envp: PROCESAMIENTO_HILOS=N => kernel_set_threads(N)
+.next_var:
+    mov rsi, [rdi]
+    test rsi, rsi
+    jz .ret
+    add rdi, 8
+    mov rdx, env_threads
+.cmp:
+    mov al, [rsi]
+    cmp al, [rdx]
+    jne .next_var
+    inc rsi
+    inc rdx
+    cmp rdx, env_threads_end    ; Coincide todo el prefijo => sigue el número
+    jb .cmp
+    mov rdi, rsi
+    call parse_uint
+    test rax, rax
+    js .ret                     ; Sin número: queda el automático
+    mov edi, eax
+    call kernel_set_threads
+.ret:
+    ret
+
+time_now:                       ; rax = ns de CLOCK_MONOTONIC (usa rcx, rsi, rdi, r11)
+    mov eax, 228                ; sys_clock_gettime(CLOCK_MONOTONIC, &time_spec)
+    mov edi, CLOCK_MONOTONIC
+    mov rsi, time_spec
+    syscall
+    imul rax, [time_spec], 1000000000
+    add rax, [time_spec + 8]
+    ret
+
+time_start:
+    cmp byte [timing_on], 0
+    je .ret
+    push rax
+    push rcx
+    push rsi
+    push rdi
+    push r11
+    call time_now
+    mov [time_last], rax
+    pop r11
+    pop rdi
+    pop rsi
+    pop rcx
+    pop rax
+.ret:
+    ret
+
+time_lap:
+    cmp byte [timing_on], 0
+    je .ret
+    push rax
+    push rcx
+    push rdx
+    push rsi
+    push rdi
+    push r11
+    mov edx, edi                ; Etapa (time_now usa rdi)
+    call time_now
+    mov rcx, rax
+    sub rax, [time_last]        ; Transcurrido desde la marca anterior
+    mov [time_last], rcx
+    add [time_acc + rdx*8], rax
+    pop r11
+    pop rdi
+    pop rsi
+    pop rdx
+    pop rcx
+    pop rax
+.ret:
+    ret
+
+print_timings:                  ; Largos sin el 0 final de cada mensaje (- 1)
+    cmp byte [timing_on], 0
+    je .ret
+    mov rdi, [time_acc + TIME_READ*8]
+    mov rsi, msg_time_read
+    mov edx, msg_time_read_end - msg_time_read - 1
+    call print_value
+    mov rdi, [time_acc + TIME_COPY*8]
+    mov rsi, msg_time_copy
+    mov edx, msg_time_copy_end - msg_time_copy - 1
+    call print_value
+    mov rdi, [time_acc + TIME_INTERP*8]
+    mov rsi, msg_time_interp
+    mov edx, msg_time_interp_end - msg_time_interp - 1
+    call print_value
+    mov rdi, [time_acc + TIME_CSUM*8]
+    mov rsi, msg_time_csum
+    mov edx, msg_time_csum_end - msg_time_csum - 1
+    call print_value
+    mov rdi, [time_acc + TIME_WRITE*8]
+    mov rsi, msg_time_write
+    mov edx, msg_time_write_end - msg_time_write - 1
+    call print_value
+.ret:
+    ret
+
+
+
+
+; =============================================================================
+; advise_sequential:
+; -----------------------------------------------------------------------------
+;   advise_sequential(rdi = fd): posix_fadvise(fd, 0, 0, POSIX_FADV_SEQUENTIAL)
+;   sobre todo el archivo, así el kernel lee por adelantado en bloques más
+;   grandes mientras read_full va consumiendo. En un pipe falla (ESPIPE) y se
+;   ignora: es solo una sugerencia.
+; =============================================================================
+
+advise_sequential:
+    xor esi, esi                ; offset = 0
+    xor edx, edx                ; len = 0 => hasta el final
+    mov r10d, POSIX_FADV_SEQUENTIAL
+    mov eax, 221                ; sys_fadvise64
+    syscall
+    ret
+
+
+
+
+; =============================================================================
+; ensure_buffer:
+; -----------------------------------------------------------------------------
+;   ensure_buffer(rdi = &puntero, rsi = &capacidad, rdx = bytes necesarios)
+;   Modo servidor: si la capacidad actual no alcanza, libera el buffer
+;   (sys_munmap) y reserva uno nuevo con mmap_buffer. Si alcanza no hace nada,
+;   así los pedidos del mismo tamaño reutilizan la memoria.
+; =============================================================================
+
+ensure_buffer:
+    cmp rdx, [rsi]
+    jbe .ok
+    push rbx
+    push r12
+    push r13
+    mov rbx, rdi
+    mov r12, rsi
+    mov r13, rdx
+
+    mov rsi, [r12]              ; Había uno más chico?
+    test rsi, rsi
+    jz .map
+    mov rdi, [rbx]
+    mov eax, 11                 ; sys_munmap(puntero, capacidad)
+    syscall
+
+.map:
+    mov rdi, r13
+    call mmap_buffer
+    mov [rbx], rax
+    mov [r12], r13
+
+    pop r13
+    pop r12
+    pop rbx
+.ok:
+    ret
+
+
+
+
+
 
 
 
@@ -1405,7 +3511,7 @@ print_hex:
     loop .hex_conv                ; Decrementa rcx, repite hasta agotar los 16 dígitos
 
     mov rax, 1                    ; syscall write
-    mov rdi, 1                    ; descriptor de archivo 1 (stdout)
+    mov rdi, [msg_fd]             ; descriptor de los mensajes (1 = stdout salvo en modo argumentos con SALIDA "-")
     mov rdx, 16                   ; longitud a escribir = 16 bytes
     syscall                       ; imprime el buffer de 16 caracteres
 
@@ -1440,3 +3546,13 @@ error_write_out:
     mov rdi, 14
     syscall
 
+error_alloc:
+    mov rax, 60
+    mov rdi, 15
+    syscall
+
+error_protocol:
+    mov rax, 60
+    mov rdi, 16
+    syscall
+
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# ---------------------------
+# PRUEBAS DE CACHE.PY (python -m pytest -q, desde asm/)
+# ---------------------------
+"""
+FrameCache: expulsión LRU en memoria, tope de bytes en disco (por fecha de
+uso) y claves que cambian con el contenido y los parámetros.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+import cache
+
+
+def _arr(value):
+    return np.full((10, 10), value, dtype=np.uint8)
+
+
+def _npy_size(tmp_path):
+    """
+    Bytes de un .npy de _arr() (datos más encabezado).
+    """
+    path = tmp_path / "muestra.npy"
+    np.save(path, _arr(0), allow_pickle=False)
+    return os.path.getsize(path)
+
+
+def _age(fc, key, seconds_ago):
+    """
+    Fija la fecha de uso del .npy (las escrituras seguidas pueden compartir mtime).
+    """
+    path = fc._disk_path(key)
+    t = os.stat(path).st_mtime_ns - seconds_ago * 10**9
+    os.utime(path, ns=(t, t))
+
+
+def test_memory_lru():
+    fc = cache.FrameCache(max_entries=2)
+    fc.put("a", _arr(1))
+    fc.put("b", _arr(2))
+    assert fc.get("a")[0, 0] == 1           # "a" pasa a ser la más reciente
+    fc.put("c", _arr(3))                     # Sale "b"
+    assert fc.get("b") is None
+    assert fc.get("a")[0, 0] == 1 and fc.get("c")[0, 0] == 3
+    assert fc.stats() == {"hits": 3, "disk_hits": 0, "misses": 1, "entries": 2}
+
+
+def test_put_copies_read_only():
+    fc = cache.FrameCache()
+    src = _arr(5)
+    stored = fc.put("k", src)
+    src[:] = 0
+    assert fc.get("k")[0, 0] == 5
+    with pytest.raises(ValueError):
+        stored[0, 0] = 1
+
+
+def test_memory_disabled(tmp_path):
+    fc = cache.FrameCache(max_entries=0, disk_dir=str(tmp_path))
+    fc.put("k", _arr(7))
+    assert fc.stats()["entries"] == 0
+    assert fc.get("k")[0, 0] == 7
+    assert fc.stats()["disk_hits"] == 1
+
+
+def test_disk_cap(tmp_path):
+    one = _npy_size(tmp_path)
+    fc = cache.FrameCache(max_entries=0, disk_dir=str(tmp_path / "c"), disk_max_bytes=int(2.5 * one))
+    fc.put("a", _arr(1))
+    fc.put("b", _arr(2))
+    _age(fc, "a", 20)
+    _age(fc, "b", 10)
+    assert fc.get("a")[0, 0] == 1           # Leer "a" la marca como usada ahora
+    fc.put("c", _arr(3))                     # Pasa el tope: se borra "b", la de uso más viejo
+    names = sorted(os.listdir(tmp_path / "c"))
+    assert names == ["a.npy", "c.npy"]
+    assert fc.get("b") is None
+
+
+def test_disk_promotes_and_clear(tmp_path):
+    disk = str(tmp_path / "c")
+    cache.FrameCache(disk_dir=disk).put("k", _arr(9))
+    fc = cache.FrameCache(max_entries=4, disk_dir=disk)     # Memoria vacía, disco con "k"
+    assert fc.get("k")[0, 0] == 9
+    assert fc.get("k")[0, 0] == 9
+    assert (fc.disk_hits, fc.hits) == (1, 1)
+    fc.clear()
+    assert os.listdir(disk) == [] and fc.get("k") is None
+
+
+def test_keys(tmp_path):
+    path = tmp_path / "img.png"
+    path.write_bytes(b"uno")
+    first = cache.file_digest(str(path))
+    assert cache.make_key(first, "out", q=1, size=400) == cache.make_key(first, "out", size=400, q=1)
+    assert cache.make_key(first, "out", q=1) != cache.make_key(first, "out", q=2)
+    assert cache.make_key(first, "out", q=1) != cache.make_key(first, "conv", q=1)
+    path.write_bytes(b"dos!")
+    assert cache.file_digest(str(path)) != first
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# ---------------------------
+# PRUEBAS DE CONVERSION.PY (python -m pytest -q, desde asm/)
+# ---------------------------
+"""
+conversion.to_gray con Pillow (forma, tipo, luma y resize) y con ImageMagick
+(se salta si 'convert' no está instalado).
+"""
+
+import shutil
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import conversion
+
+
+@pytest.fixture
+def color_png(tmp_path):
+    path = tmp_path / "color.png"
+    rgb = np.zeros((30, 50, 3), dtype=np.uint8)
+    rgb[..., 0] = 255                        # Rojo puro: luma L = 299*255/1000
+    Image.fromarray(rgb).save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("size", [(50, 30), (400, 400), (17, 9)])
+def test_pillow_shape(color_png, size):
+    width, height = size
+    arr = conversion.to_gray(color_png, width, height)
+    assert arr.shape == (height, width) and arr.dtype == np.uint8
+    assert arr.flags.c_contiguous
+
+
+def test_pillow_luma(color_png):
+    arr = conversion.to_gray(color_png, 50, 30)          # Misma medida: sin resize
+    assert np.all(arr == 76)
+
+
+def test_save_raw(color_png, tmp_path):
+    arr = conversion.to_gray(color_png, 20, 10)
+    out = tmp_path / "imagen_in.img"
+    conversion.save_raw(arr[:, ::2], str(out))            # Vista no contigua
+    assert out.read_bytes() == np.ascontiguousarray(arr[:, ::2]).tobytes()
+
+
+def test_errors(color_png, tmp_path):
+    with pytest.raises(ValueError):
+        conversion.to_gray(color_png, 10, 10, "gimp")
+    bad = tmp_path / "no_es_imagen.png"
+    bad.write_text("texto")
+    with pytest.raises(OSError):
+        conversion.to_gray(str(bad), 10, 10)
+
+
+@pytest.mark.skipif(shutil.which("convert") is None, reason="falta convert (ImageMagick)")
+def test_imagemagick(color_png):
+    arr = conversion.to_gray(color_png, 40, 20, "imagemagick")
+    assert arr.shape == (20, 40) and arr.dtype == np.uint8
+    assert arr.min() == arr.max() > 0       # Color uniforme; la luma no coincide con la de Pillow
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# ---------------------------
+# PRUEBAS DE IMAGEN_RAW.PY (python -m pytest -q, desde asm/)
+# ---------------------------
+"""
+RawImage sobre archivos crudos temporales: frames apilados, bytes sobrantes,
+vistas sin copia (frame, quadrant) y escritura con mode="r+".
+"""
+
+import numpy as np
+import pytest
+
+import imagen_raw
+import motor_numpy
+
+
+def _write(path, frames, width, height, extra=b""):
+    data = np.random.default_rng(frames).integers(0, 256, (frames, height, width), dtype=np.uint8)
+    path.write_bytes(data.tobytes() + extra)
+    return data
+
+
+def test_frames_and_extra(tmp_path):
+    path = tmp_path / "lote.img"
+    data = _write(path, 3, 12, 8, extra=b"abc")
+    raw = imagen_raw.RawImage(str(path), 12, 8)
+    assert (len(raw), raw.extra) == (3, 3)
+    for index, frame in enumerate(raw.iter_frames()):
+        assert frame.shape == (8, 12)
+        assert np.array_equal(frame, data[index])
+    with pytest.raises(ValueError):
+        raw.frame(3)
+
+
+def test_quadrant_view(tmp_path):
+    path = tmp_path / "imagen_in.img"
+    data = _write(path, 2, 40, 40)
+    raw = imagen_raw.RawImage(str(path), 40, 40)
+    for quadrant in (1, 6, 16):
+        view = raw.quadrant(quadrant, index=1)
+        expected = motor_numpy.extract_quadrant(data[1], quadrant)
+        assert np.array_equal(view, expected)
+        assert np.shares_memory(view, raw.frame(1))        # Vista, no copia
+        assert not view.flags.c_contiguous
+
+
+def test_offset_and_write(tmp_path):
+    path = tmp_path / "con_encabezado.img"
+    path.write_bytes(b"HDR!" + bytes(6 * 4))
+    with imagen_raw.RawImage(str(path), 6, 4, mode="r+", offset=4) as raw:
+        raw.quadrant(4, grid=2)[:] = 7
+        view = raw.frame()
+    assert view.sum() == 7 * 6                   # La vista sigue viva después de close()
+    del view
+    content = path.read_bytes()
+    assert content[:4] == b"HDR!"
+    assert np.array_equal(np.frombuffer(content[4:], dtype=np.uint8).reshape(4, 6)[2:, 3:], np.full((2, 3), 7))
+
+
+def test_read_frame(tmp_path):
+    path = tmp_path / "corto.img"
+    path.write_bytes(bytes(10))
+    assert imagen_raw.read_frame(str(path), 4, 4) is None
+    assert imagen_raw.read_frame(str(tmp_path / "no_existe.img"), 4, 4) is None
+    assert imagen_raw.read_frame(str(path), 5, 2).shape == (2, 5)
+    with pytest.raises(ValueError):
+        imagen_raw.RawImage(str(path), 0, 4)
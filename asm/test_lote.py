@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# ---------------------------
+# PRUEBAS DE LOTE.PY (python -m pytest -q, desde asm/)
+# ---------------------------
+"""
+lote.py de punta a punta con motor_numpy (carpeta temporal de PNG) y el
+rechazo de un motor que no está disponible antes de crear la salida.
+"""
+
+import csv
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import conversion
+import lote
+import motor_numpy
+import motor_so
+import motor_worker
+
+
+@pytest.fixture
+def images(tmp_path):
+    source = tmp_path / "entrada"
+    (source / "sub").mkdir(parents=True)
+    rng = np.random.default_rng(0)
+    for name in ("a.png", "sub/b.png"):
+        Image.fromarray(rng.integers(0, 256, (50, 60), dtype=np.uint8)).save(source / name)
+    (source / "notas.txt").write_text("no es una imagen")
+    return source
+
+
+def test_find_images(images):
+    assert [rel for _, rel in lote.find_images(str(images))] == ["a.png", os.path.join("sub", "b.png")]
+    assert [rel for _, rel in lote.find_images(str(images / "*.png"))] == ["a.png"]
+
+
+@pytest.mark.parametrize("spec", ["full", "1,16", "all"])
+def test_main_numpy(images, tmp_path, spec):
+    output = tmp_path / "salida"
+    lote.main([str(images), spec, "-o", str(output), "-j", "2", "--size", "40", "40", "4"])
+    with open(output / "checksums.csv") as f:
+        rows = list(csv.DictReader(f))
+    for path, rel in lote.find_images(str(images)):
+        frame = conversion.to_gray(path, 40, 40, "pillow")
+        stem = os.path.splitext(str(output / rel))[0]
+        mine = [r for r in rows if r["imagen"] == rel]
+        if spec == "full":
+            final, *values = motor_numpy.process_full(frame, wsum=True)
+            blocks = {0: (final, values)}
+            assert np.fromfile(stem + "_full.img", dtype=np.uint8).tobytes() == final.tobytes()
+        else:
+            quadrants = motor_numpy.parse_quadrant_spec(spec)
+            out, values = motor_numpy.process_batch(frame, quadrants, wsum=True)
+            blocks = {q: (block, v) for q, block, v in zip(quadrants, out, values)}
+            for q, (block, _) in blocks.items():
+                assert np.fromfile(f"{stem}_{q:02d}.img", dtype=np.uint8).tobytes() == block.tobytes()
+        assert len(mine) == len(blocks)
+        for row in mine:
+            _, values = blocks[int(row["cuadrante"])]
+            assert [int(row[k], 16) for k in ("checksum_entrada", "checksum_salida",
+                                              "firma_entrada", "firma_salida")] == list(values)
+
+
+@pytest.mark.parametrize("motor, module", [("so", motor_so), ("asm", motor_worker)])
+def test_missing_engine(images, tmp_path, monkeypatch, motor, module):
+    """
+    Sin libprocesamiento.so / ./procesamiento: error de argumentos y sin carpeta de salida.
+    """
+    monkeypatch.setattr(module, "available", lambda *args: False)
+    output = tmp_path / "salida"
+    with pytest.raises(SystemExit) as exc:
+        lote.main([str(images), "full", "-o", str(output), "--motor", motor])
+    assert exc.value.code == 2
+    assert not output.exists()
+
+
+@pytest.mark.parametrize("args", [["1", "--size", "40", "40", "50"], ["17"], ["full", "--factor", "9"],
+                                  ["full", "--size", "40"], ["full", "--threads", "-1"]])
+def test_bad_args(images, args):
+    with pytest.raises(SystemExit):
+        lote.parse_args([str(images)] + args)
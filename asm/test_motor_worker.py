@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# ---------------------------
+# PRUEBAS DE MOTOR_WORKER (python -m pytest -q, desde asm/)
+# ---------------------------
+"""
+KernelWorker: validación de los pedidos, el protocolo KJOB/KJBF contra un
+servidor de prueba en Python (mismo protocolo que server_run, resuelto con
+motor_numpy), bloques partidos en pedazos de a lo sumo MAX_DIM y, si
+./procesamiento está disponible, pedidos reales contra motor_numpy.
+"""
+
+import io
+import os
+import stat
+import sys
+
+import numpy as np
+import pytest
+
+import bandas
+import motor_numpy
+import motor_worker
+
+
+def _frame(shape, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+class NumpyWorker(motor_worker.KernelWorker):
+    """
+    KernelWorker sin proceso: cada pedido de imagen completa lo resuelve
+    motor_numpy, con los mismos límites que el servidor.
+    """
+    def __init__(self):
+        super().__init__()
+        self.shapes = []
+
+    def request(self, frame, quadrant, grid=motor_worker.GRID, out=None,
+                factor=motor_worker.FACTOR, wsum=False):
+        frame = np.ascontiguousarray(frame)
+        assert quadrant == 0 and max(frame.shape) <= motor_worker.MAX_DIM
+        self.shapes.append(frame.shape)
+        return (motor_numpy.interpolate_nx(frame, factor, out),)
+
+
+# Servidor de prueba: atiende pedidos hasta EOF como server_run; con
+# CORROMPER=1 en el entorno cambia un byte de la imagen que responde.
+FAKE_SERVER = """#!{python}
+import os, struct, sys
+sys.path.insert(0, {asm!r})
+import motor_numpy
+stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+while True:
+    head = stdin.read(16)
+    if not head:
+        sys.exit(0)
+    magic, width, height, grid, factor, quadrant = struct.unpack("<4sIIBBH", head)
+    if magic not in (b"KJOB", b"KJBF") or not 1 <= grid <= 9:
+        sys.exit(16)
+    factor = factor or 2
+    frame = motor_numpy.np.frombuffer(stdin.read(width * height), dtype=motor_numpy.np.uint8)
+    frame = frame.reshape(height, width)
+    if quadrant:
+        src, final, csum_in, csum_out = motor_numpy.process_quadrant(frame, quadrant, grid=grid,
+                                                                     factor=factor)
+    else:
+        src = frame
+        final, csum_in, csum_out = motor_numpy.process_full(frame, factor=factor)
+    data = bytearray(final.tobytes())
+    if os.environ.get("CORROMPER"):
+        data[0] ^= 1
+    stdout.write(struct.pack("<4sIIIQQ", b"KRES", 0, final.shape[1], final.shape[0], csum_in, csum_out))
+    if magic == b"KJBF":
+        stdout.write(struct.pack("<QQ", motor_numpy.checksum_wsum(src), motor_numpy.checksum_wsum(final)))
+    stdout.write(data)
+"""
+
+
+@pytest.fixture
+def fake_server(tmp_path):
+    path = tmp_path / "servidor.py"
+    path.write_text(FAKE_SERVER.format(python=sys.executable, asm=os.path.dirname(os.path.abspath(__file__))))
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+@pytest.mark.parametrize("args", [
+    dict(quadrant=0, grid=4, factor=9),                 # Factor fuera de 2..8
+    dict(quadrant=3, grid=10),                          # Grid > MAX_GRID
+    dict(quadrant=17, grid=4),                          # Cuadrante inexistente
+    dict(quadrant=1, grid=4, shape=(3, 3)),             # Sub-bloque vacío
+    dict(quadrant=0, shape=(2, motor_worker.MAX_DIM + 1)),
+])
+def test_request_validation(args):
+    """
+    Los pedidos inválidos no llegan al servidor (ni siquiera se lanza).
+    """
+    worker = motor_worker.KernelWorker(path="/no/existe/procesamiento")
+    frame = np.zeros(args.pop("shape", (8, 8)), dtype=np.uint8)
+    with pytest.raises(ValueError):
+        worker.request(frame, **args)
+    assert worker.proc is None
+
+
+@pytest.mark.parametrize("factor", [2, 3])
+def test_protocol(fake_server, factor):
+    frame = _frame((40, 36), factor)
+    with motor_worker.KernelWorker(path=fake_server) as worker:
+        final, *values = worker.process_full(frame, factor=factor, wsum=True)
+        expected, *reference = motor_numpy.process_full(frame, factor=factor, wsum=True)
+        assert np.array_equal(final, expected) and values == reference
+
+        assert np.array_equal(worker.interpolate_nx(frame[:2, :3], factor),
+                              motor_numpy.interpolate_nx(frame[:2, :3], factor))
+
+        quadrants = [1, 6, 16]
+        blocks, csums = worker.process_batch(frame, quadrants, factor=factor, wsum=True)
+        expected, reference = motor_numpy.process_batch(frame, quadrants, factor=factor, wsum=True)
+        assert np.array_equal(blocks, expected) and csums == reference
+        assert worker.close() == 0
+
+
+def test_protocol_mismatch(fake_server, monkeypatch):
+    """
+    Con "KJBF" la imagen recibida se verifica contra el checksum y la firma del servidor.
+    """
+    monkeypatch.setenv("CORROMPER", "1")
+    frame = _frame((8, 8))
+    with motor_worker.KernelWorker(path=fake_server) as worker:
+        worker.process_full(frame)                      # "KJOB": sin verificación
+        with pytest.raises(motor_worker.WorkerError):
+            worker.process_full(frame, wsum=True)
+
+
+def test_server_exit(tmp_path):
+    """
+    Si el servidor termina, WorkerError con el motivo (código de salida).
+    """
+    path = tmp_path / "servidor.sh"
+    path.write_text("#!/bin/sh\nexit 16\n")
+    path.chmod(0o755)
+    worker = motor_worker.KernelWorker(path=str(path))
+    with pytest.raises(motor_worker.WorkerError, match="pedido mal formado"):
+        worker.process_full(_frame((8, 8)))
+
+
+@pytest.mark.parametrize("factor", [2, 3])
+@pytest.mark.parametrize("shape", [(3, 20), (20, 3), (15, 15), (7, 7), (8, 8), (1, 30)])
+def test_interpolate_nx_pieces(monkeypatch, shape, factor):
+    monkeypatch.setattr(motor_worker, "MAX_DIM", 7)
+    worker = NumpyWorker()
+    sub = _frame(shape, factor)
+    assert np.array_equal(worker.interpolate_nx(sub, factor), motor_numpy.interpolate_nx(sub, factor))
+    pieces = -(-shape[0] // 6) * -(-shape[1] // 6) if max(shape) > 7 else 1
+    assert len(worker.shapes) == pieces
+
+
+# ---------------------------
+# Con ./procesamiento --server
+# ---------------------------
+
+needs_exec = pytest.mark.skipif(not motor_worker.available(), reason="falta ./procesamiento")
+
+
+@pytest.fixture
+def worker():
+    with motor_worker.KernelWorker() as kernel:
+        yield kernel
+
+
+@needs_exec
+@pytest.mark.parametrize("factor", [2, 3])
+def test_worker_round_trip(worker, factor):
+    frame = _frame((60, 44), factor)
+    final, *values = worker.process_full(frame, factor=factor, wsum=True)
+    expected, *reference = motor_numpy.process_full(frame, factor=factor, wsum=True)
+    assert np.array_equal(final, expected) and values == reference
+    for quadrant in (1, 7, 16):
+        _, block, csum_sub, csum_interp = worker.process_quadrant(frame, quadrant, factor=factor)
+        _, expected, ref_sub, ref_interp = motor_numpy.process_quadrant(frame, quadrant, factor=factor)
+        assert np.array_equal(block, expected) and (csum_sub, csum_interp) == (ref_sub, ref_interp)
+
+
+@needs_exec
+@pytest.mark.parametrize("band_rows", [1, 2, 5])
+@pytest.mark.parametrize("shape", [(1, 7), (3, 5), (37, 53)])
+def test_bandas_worker(worker, shape, band_rows):
+    """
+    bandas.py con el worker: bandas de menos de GRID filas o columnas incluidas.
+    """
+    frame = _frame(shape, band_rows)
+    dst = io.BytesIO()
+    result = bandas.upscale_stream(io.BytesIO(frame.tobytes()), dst, shape[1], shape[0],
+                                   band_rows, worker)
+    final, *values = motor_numpy.process_full(frame, wsum=True)
+    assert dst.getvalue() == final.tobytes() and result == tuple(values)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# ---------------------------
+# PRUEBAS DE LOS MOTORES (python -m pytest -q, desde asm/)
+# ---------------------------
+"""
+Compara los motores entre sí y contra referencias escritas a mano:
+- motor_numpy.interpolate_2x / interpolate_nx contra un bucle píxel a píxel
+- bandas.upscale_stream contra motor_numpy.process_full
+- checksum_wsum por pedazos (start) contra la firma de la imagen entera
+- motor_so contra motor_numpy (se salta si no está libprocesamiento.so)
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+import bandas
+import motor_numpy
+import motor_so
+
+SHAPES = [(1, 1), (1, 5), (5, 1), (2, 2), (7, 9), (16, 17)]
+
+
+def _frame(shape, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+def _reference(sub, factor):
+    """
+    Interpolación píxel a píxel, con clamp en la última fila/columna:
+    - factor 2: la aritmética original (interp_inner_col en procesamiento.asm)
+    - factor N >= 3: ((N-i)(N-j)*A + i(N-j)*B + (N-i)j*C + ij*D) // (N*N)
+    """
+    h, w = sub.shape
+    n = factor
+    out = np.empty((n * h, n * w), dtype=np.uint8)
+    for r in range(h):
+        for c in range(w):
+            a = int(sub[r, c])
+            b = int(sub[min(r + 1, h - 1), c])
+            cc = int(sub[r, min(c + 1, w - 1)])
+            d = int(sub[min(r + 1, h - 1), min(c + 1, w - 1)])
+            for i in range(n):
+                for j in range(n):
+                    if n == 2:
+                        value = (a, (3 * a + cc) >> 2, (3 * a + b) >> 2, (a + b + cc + d) >> 2)[2 * i + j]
+                    else:
+                        value = ((n - i) * (n - j) * a + i * (n - j) * b
+                                 + (n - i) * j * cc + i * j * d) // (n * n)
+                    out[r * n + i, c * n + j] = value
+    return out
+
+
+# ---------------------------
+# motor_numpy contra la referencia
+# ---------------------------
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_interpolate_2x(shape):
+    sub = _frame(shape)
+    assert np.array_equal(motor_numpy.interpolate_2x(sub), _reference(sub, 2))
+
+
+@pytest.mark.parametrize("factor", range(2, motor_numpy.MAX_FACTOR + 1))
+@pytest.mark.parametrize("shape", SHAPES)
+def test_interpolate_nx(shape, factor):
+    sub = _frame(shape, factor)
+    assert np.array_equal(motor_numpy.interpolate_nx(sub, factor), _reference(sub, factor))
+
+
+@pytest.mark.parametrize("factor", range(2, motor_numpy.MAX_FACTOR + 1))
+def test_phase_weights(factor):
+    """
+    Los pesos de phase_weights dan la misma imagen que interpolate_nx (también con 2x).
+    """
+    sub = _frame((6, 7), factor).astype(np.int64)
+    a = sub
+    b = np.vstack([sub[1:], sub[-1:]])
+    c = np.hstack([sub[:, 1:], sub[:, -1:]])
+    d = np.hstack([b[:, 1:], b[:, -1:]])
+    weights = motor_numpy.phase_weights(factor).astype(np.int64)
+    out = np.empty((factor * 6, factor * 7), dtype=np.int64)
+    for i in range(factor):
+        for j in range(factor):
+            wa, wb, wc, wd = weights[i, j]
+            out[i::factor, j::factor] = (wa * a + wb * b + wc * c + wd * d) // (factor * factor)
+    assert np.array_equal(out, motor_numpy.interpolate_nx(sub.astype(np.uint8), factor))
+
+
+# ---------------------------
+# Modo por bandas contra la imagen completa
+# ---------------------------
+
+@pytest.mark.parametrize("band_rows", [1, 2, 5, 64, 1000])
+@pytest.mark.parametrize("shape", [(1, 7), (2, 3), (37, 53)])
+def test_bandas(shape, band_rows):
+    frame = _frame(shape, band_rows)
+    height, width = shape
+    dst = io.BytesIO()
+    result = bandas.upscale_stream(io.BytesIO(frame.tobytes()), dst, width, height, band_rows)
+    final, *values = motor_numpy.process_full(frame, wsum=True)
+    assert dst.getvalue() == final.tobytes()
+    assert result == tuple(values)
+
+
+# ---------------------------
+# Firma por pedazos
+# ---------------------------
+
+@pytest.mark.parametrize("sizes", [(0, 10), (1, 1), (100, 37), (motor_numpy.WSUM_BLOCK + 5, 70000)])
+def test_checksum_wsum_split(sizes):
+    a = _frame((sizes[0],), 1)
+    b = _frame((sizes[1],), 2)
+    whole = motor_numpy.checksum_wsum(np.concatenate([a, b]))
+    parts = motor_numpy.checksum_wsum(a) + motor_numpy.checksum_wsum(b, a.size)
+    assert whole == parts & motor_numpy.WSUM_MASK
+
+
+def test_checksum_wsum_reference():
+    data = _frame((1000,), 3)
+    expected = sum((i + 1) * int(v) for i, v in enumerate(data)) & motor_numpy.WSUM_MASK
+    assert motor_numpy.checksum_wsum(data) == expected
+
+
+# ---------------------------
+# motor_so contra motor_numpy
+# ---------------------------
+
+needs_so = pytest.mark.skipif(not motor_so.available(), reason="falta libprocesamiento.so")
+
+
+@pytest.fixture(params=[False, True], ids=["escalar", "sse2"])
+def simd(request):
+    motor_so.set_simd(request.param)
+    yield request.param
+    motor_so.set_simd(True)
+
+
+@needs_so
+@pytest.mark.parametrize("factor", [2, 3, 4, motor_numpy.MAX_FACTOR])
+@pytest.mark.parametrize("shape", SHAPES + [(60, 45)])
+def test_so_interpolate_nx(simd, shape, factor):
+    sub = _frame(shape, factor)
+    assert np.array_equal(motor_so.interpolate_nx(sub, factor), motor_numpy.interpolate_nx(sub, factor))
+    view = _frame((shape[0], shape[1] + 3), factor)[:, 2:-1]      # Filas con stride mayor que el ancho
+    assert np.array_equal(motor_so.interpolate_nx(view, factor), motor_numpy.interpolate_nx(view, factor))
+
+
+@needs_so
+@pytest.mark.parametrize("threads", [1, 4])
+@pytest.mark.parametrize("factor", [2, 3])
+@pytest.mark.parametrize("shape", [(1, 1), (8, 3), (61, 37), (100, 20)])
+def test_so_process_full(simd, shape, factor, threads):
+    frame = _frame(shape, threads)
+    motor_so.set_threads(threads)
+    try:
+        got = motor_so.process_full(frame, factor=factor, wsum=True)
+        plain = motor_so.process_full(frame, factor=factor)
+    finally:
+        motor_so.set_threads(0)
+    expected = motor_numpy.process_full(frame, factor=factor, wsum=True)
+    assert np.array_equal(got[0], expected[0]) and got[1:] == expected[1:]
+    assert np.array_equal(plain[0], expected[0]) and plain[1:] == expected[1:3]
+
+
+@needs_so
+@pytest.mark.parametrize("factor", [2, 3])
+@pytest.mark.parametrize("wsum", [False, True])
+def test_so_process_batch(simd, factor, wsum):
+    frame = _frame((400, 400))
+    quadrants = motor_numpy.parse_quadrant_spec("all")
+    got, got_csums = motor_so.process_batch(frame, quadrants, factor=factor, wsum=wsum)
+    expected, csums = motor_numpy.process_batch(frame, quadrants, factor=factor, wsum=wsum)
+    assert np.array_equal(got, expected) and got_csums == csums
+
+
+@needs_so
+def test_so_checksums():
+    data = _frame((motor_numpy.WSUM_BLOCK + 333,), 4)
+    assert motor_so.checksum(data) == motor_numpy.checksum(data)
+    assert motor_so.checksum_wsum(data) == motor_numpy.checksum_wsum(data)
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# ---------------------------
+# PRUEBAS DE VER_INTERFAZ.PY (python -m pytest -q, desde asm/)
+# ---------------------------
+"""
+FrameGrabber con una cámara falsa: la cámara se libera en el hilo de captura
+y nunca mientras hay un cap.read() en curso (se salta sin OpenCV o sin Tk).
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("tkinter")
+import ver_interfaz
+
+
+class FakeCapture:
+    """
+    read() se traba hasta que la prueba suelta 'unblock'; anota desde qué hilo
+    se llamó a release() y si había un read() en curso.
+    """
+    def __init__(self):
+        self.unblock = threading.Event()
+        self.reading = False
+        self.released = threading.Event()
+        self.release_thread = None
+        self.release_during_read = False
+
+    def read(self):
+        self.reading = True
+        self.unblock.wait()
+        self.reading = False
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def release(self):
+        self.release_during_read = self.reading
+        self.release_thread = threading.current_thread()
+        self.released.set()
+
+
+def test_grabber_releases_after_read(monkeypatch):
+    cap = FakeCapture()
+    grabber = ver_interfaz.FrameGrabber(cap)
+    grabber.start()
+    monkeypatch.setattr(grabber.thread, "join", lambda timeout=None: None)   # stop() vuelve enseguida
+    grabber.stop()
+    assert not cap.released.is_set()           # cap.read() sigue trabado: nadie libera
+    cap.unblock.set()
+    assert cap.released.wait(2.0)
+    assert cap.release_thread is grabber.thread
+    assert not cap.release_during_read
@@ -4,6 +4,11 @@
 # ---------------------------
 import os           # Para operaciones del sistema (por ejemplo, comprobar si existe un archivo).
 import subprocess   # Para invocar procesos externos (llamar a 'convert' de ImageMagick o ejecutar el ensamblador).
+import time         # Para medir fps y latencia por etapa en el Live View.
+import threading    # Para el token de cancelación del procesamiento (threading.Event).
+import queue        # Para pasar progreso y resultados del hilo de trabajo al hilo de Tk.
+from collections import deque  # Cola acotada de frames de la cámara (descarta el más viejo).
+from concurrent.futures import ThreadPoolExecutor  # Hilo de trabajo del procesamiento.
 import tkinter as tk            # para GUIs (interfaz gráfica).
 from tkinter import ttk, filedialog, messagebox
 """
@@ -42,6 +47,215 @@ import cv2
 - para manipular la cámara (Live View). Permite capturar fotos, leer frames de la webcam, etc.
 """
 
+import motor_numpy
+import motor_so
+import motor_worker
+import conversion
+import cache
+import instrumentacion
+"""
+- motor_numpy: misma interpolación 2x que procesamiento.asm, pero en memoria (sin procesos ni archivos).
+- motor_so: el kernel ensamblador como biblioteca compartida (libprocesamiento.so) llamado con ctypes.
+- motor_worker: ./procesamiento --server residente; los pedidos van por pipe (sin un proceso por imagen).
+- instrumentacion: tiempos por etapa de cada pedido (panel de estadísticas y JSON lines).
+"""
+
+# Cada cuánto (ms) el hilo de Tk revisa los resultados del hilo de trabajo (~60 fps)
+JOB_POLL_MS = 16
+
+# Frecuencia fija (fps) con la que el Live View pinta el frame más nuevo de la cámara
+LIVE_FPS = 30
+
+
+# ------------------------------------------------------------------------------
+# Excepciones del procesamiento (hilo de trabajo => hilo de Tk)
+# ------------------------------------------------------------------------------
+class PipelineError(Exception):
+    """
+    Error del procesamiento; el mensaje se muestra con messagebox en el hilo de Tk.
+    """
+
+
+class PipelineCancelled(Exception):
+    """
+    El pedido se canceló porque llegó uno más nuevo.
+    """
+
+
+# ------------------------------------------------------------------------------
+# Clase: PhotoSurface UN SOLO PhotoImage POR VISTA
+# ------------------------------------------------------------------------------
+class PhotoSurface:
+    """
+    Imagen de un Label con un solo ImageTk.PhotoImage, que se actualiza en el
+    lugar con paste(). Solo se crea otro si cambian el tamaño o el modo.
+    - box: (ancho, alto) fijo opcional; la imagen se centra sobre fondo negro
+      (en RGB), así imágenes de distinto tamaño usan siempre el mismo PhotoImage.
+    """
+    def __init__(self, label, box=None):
+        self.label = label
+        self.box = box
+        self.photo = None
+        self.key = None         # (tamaño, modo) del PhotoImage actual
+        self.canvas = None      # Fondo de tamaño 'box'
+
+    def show(self, im):
+        """
+        Muestra una imagen de Pillow.
+        """
+        if self.box is not None:
+            if self.canvas is None:
+                self.canvas = Image.new("RGB", self.box)
+            else:
+                self.canvas.paste((0, 0, 0), (0, 0) + self.box)
+            w, h = im.size
+            self.canvas.paste(im.convert("RGB"), ((self.box[0] - w) // 2, (self.box[1] - h) // 2))
+            im = self.canvas
+
+        key = (im.size, im.mode)
+        if self.photo is None or key != self.key:
+            self.photo = ImageTk.PhotoImage(im)
+            self.label.config(image=self.photo)
+            self.label.image = self.photo
+            self.key = key
+        else:
+            self.photo.paste(im)
+
+    def show_gray(self, arr):
+        """
+        Muestra un arreglo uint8 (alto, ancho) en gris, sin copias intermedias.
+        """
+        arr = np.ascontiguousarray(arr, dtype=np.uint8)
+        self.show(Image.frombuffer("L", (arr.shape[1], arr.shape[0]), arr, "raw", "L", 0, 1))
+
+    def show_bgr(self, frame):
+        """
+        Muestra un frame BGR de OpenCV: Pillow reordena los canales al leerlo
+        (rawmode "BGR"), sin el cv2.cvtColor BGR => RGB.
+        """
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        self.show(Image.frombuffer("RGB", (frame.shape[1], frame.shape[0]), frame, "raw", "BGR", 0, 1))
+
+
+# ------------------------------------------------------------------------------
+# Clase: FrameGrabber HILO DE CAPTURA DE LA CÁMARA (LIVE VIEW)
+# ------------------------------------------------------------------------------
+class FrameGrabber:
+    """
+    Productor de frames: un hilo llama a cap.read() (bloqueante) fuera del hilo
+    de Tk y deja cada frame en una cola acotada; si está llena se descarta el
+    más viejo. El Live View toma siempre el más nuevo (latest).
+    El hilo es dueño de 'cap' desde start(): lo libera él mismo al salir del
+    bucle (VideoCapture no es seguro entre hilos y stop() puede volver antes
+    de que termine un cap.read() trabado).
+    Contadores: captured (leídos), dropped (descartados sin mostrar), displayed.
+    """
+    def __init__(self, cap, maxlen=2):
+        self.cap = cap
+        self.frames = deque(maxlen=maxlen)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.captured = 0
+        self.dropped = 0
+        self.displayed = 0
+        self.last_frame = None      # Último frame leído (lo usa take_photo)
+        self.read_seconds = 0.0     # Duración del último cap.read()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        try:
+            while not self.stop_event.is_set():
+                t0 = time.perf_counter()
+                ret, frame = self.cap.read()
+                if not ret:
+                    # Cámara sin frame (desconectada o todavía arrancando)
+                    self.stop_event.wait(0.01)
+                    continue
+                with self.lock:
+                    if len(self.frames) == self.frames.maxlen:
+                        self.dropped += 1
+                    self.frames.append(frame)
+                    self.captured += 1
+                    self.last_frame = frame
+                    self.read_seconds = time.perf_counter() - t0
+        finally:
+            # Acá y no en close_live_window: ningún cap.read() puede estar en curso
+            self.cap.release()
+
+    def latest(self):
+        """
+        Saca el frame más nuevo de la cola (los anteriores cuentan como descartados).
+        Devuelve None si no llegó ninguno desde la última llamada.
+        """
+        with self.lock:
+            if not self.frames:
+                return None
+            frame = self.frames.pop()
+            self.dropped += len(self.frames)
+            self.frames.clear()
+            self.displayed += 1
+            return frame
+
+    def stop(self):
+        """
+        Detiene el hilo (espera hasta 1 s a que termine el cap.read() en curso).
+        Si la cámara sigue trabada, el hilo libera 'cap' cuando cap.read() vuelva.
+        """
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+
+    def counters(self):
+        with self.lock:
+            return f"capturados {self.captured} | descartados {self.dropped} | mostrados {self.displayed}"
+
+
+# ------------------------------------------------------------------------------
+# Clase: StageTimer FPS Y LATENCIA POR ETAPA (LIVE VIEW)
+# ------------------------------------------------------------------------------
+class StageTimer:
+    """
+    Lleva la latencia de cada etapa (ms) y los fps logrados, suavizados con un
+    promedio móvil exponencial para que el texto no salte en cada frame.
+    Las etapas se muestran en el orden en que se registran por primera vez.
+    """
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.stages = {}        # etapa -> ms
+        self.fps = 0.0
+        self.frames = 0
+        self._last_frame = None
+
+    def add(self, stage, seconds):
+        """
+        Registra 'seconds' como duración de 'stage' en el frame actual.
+        """
+        ms = seconds * 1000.0
+        prev = self.stages.get(stage)
+        self.stages[stage] = ms if prev is None else prev + self.smoothing * (ms - prev)
+
+    def frame_done(self):
+        """
+        Marca el fin de un frame y actualiza los fps.
+        """
+        now = time.perf_counter()
+        if self._last_frame is not None and now > self._last_frame:
+            fps = 1.0 / (now - self._last_frame)
+            self.fps = fps if self.fps == 0.0 else self.fps + self.smoothing * (fps - self.fps)
+        self._last_frame = now
+        self.frames += 1
+
+    def summary(self):
+        """
+        Texto para el panel: "fps | etapa ms | ...".
+        """
+        parts = [f"{self.fps:5.1f} fps"]
+        parts += [f"{stage} {ms:5.1f} ms" for stage, ms in self.stages.items()]
+        return " | ".join(parts)
+
 
 # ------------------------------------------------------------------------------
 # Clase: ToolTip VENTANAS EMERGENTES DESCRIPTIVAS AL PASAR EL MOUSE ENCIMA
@@ -164,6 +378,7 @@ class IntroWindow(tk.Toplevel):
         # Label donde mostraremos la imagen seleccionada (en grande)
         self.lbl_mini_imagen = ttk.Label(frame, background="black")
         self.lbl_mini_imagen.pack(pady=10)
+        self.mini_surface = PhotoSurface(self.lbl_mini_imagen, box=(600, 400))
 
         # Frame inferior para colocar los botones con íconos
         icons_frame = ttk.Frame(frame)
@@ -216,9 +431,7 @@ class IntroWindow(tk.Toplevel):
                 im = Image.open(file_path)
                 # Ajustamos a un tamaño grande, digamos que 600x400
                 im.thumbnail((600, 400))
-                imgtk = ImageTk.PhotoImage(im)
-                self.lbl_mini_imagen.config(image=imgtk)
-                self.lbl_mini_imagen.image = imgtk
+                self.mini_surface.show(im)
             except Exception as e:
                 print("Error cargando imagen:", e)
             # Al cargar imagen, habilitamos 'Comenzar'
@@ -252,12 +465,12 @@ class IntroWindow(tk.Toplevel):
 
 class QuadrantSelector(tk.Frame):
     """
-    - Cada celda tiene un número (1..16).
+    - Cada celda tiene un número (1..16, o 1..grid*grid).
     - Al pasar el ratón, se ilumina un poco.
     - Al hacer clic, parpadea unas veces y queda en amarillo, llamando un callback
       para avisar qué cuadrante se seleccionó.
     """
-    def __init__(self, parent, callback, *args, **kwargs):
+    def __init__(self, parent, callback, *args, grid=4, **kwargs):
         super().__init__(parent, *args, **kwargs)
         self.callback = callback
         self.configure(bg="black")
@@ -265,10 +478,10 @@ class QuadrantSelector(tk.Frame):
         self.labels = {}             # Diccionario: cuadrante -> Label
         self.selectedQuadrant = None # Cuadrante seleccionado
 
-        for row in range(4):
-            for col in range(4):
+        for row in range(grid):
+            for col in range(grid):
                 # Calculamos el número de cuadrante
-                q = row*4 + col + 1
+                q = row*grid + col + 1
                 lbl = tk.Label(
                     self,
                     text=str(q),
@@ -376,12 +589,60 @@ class App(tk.Tk):
 
         self.selected_image_path = None     # Ruta de la imagen cargada
         self.quadrant_var = tk.IntVar(value=1)  # Cuadrante seleccionado
+        self.factor_var = tk.IntVar(value=motor_numpy.FACTOR)  # Escala de la salida (2x, 3x, 4x)
+
+        # Motor de interpolación: "asm" (./procesamiento --server residente, por pipe),
+        # "asm_exec" (un ./procesamiento por pedido, imagen y resultado por pipes),
+        # "so" (libprocesamiento.so vía ctypes) o "numpy" (motor_numpy).
+        # Ninguno usa config.txt ni archivos .img. Si ./procesamiento no está
+        # compilado (o es uno viejo, sin --server) se usa "so" o "numpy"
+        # (resolve_backend).
+        self.kernel_backend = "asm"
+        self.kernel_worker = motor_worker.KernelWorker()   # Se lanza en el primer pedido
+
+        # Conversión a gris 8 bits: "pillow" (en memoria, por defecto) o
+        # "imagemagick" (el 'convert' original, opcional para comparar).
+        self.convert_backend = "pillow"
+
+        # Caché de frames convertidos y resultados (clave: hash del archivo + parámetros).
+        # Con disk_dir="cache_interpolacion" se agrega el nivel en disco (tope disk_max_bytes).
+        self.frame_cache = cache.FrameCache(max_entries=64, disk_dir=None)
+
+        # Tiempos por etapa de cada pedido (leer, convertir, kernel, cargar, animar):
+        # se muestran en stats_label y, si PROCESAMIENTO_METRICAS=archivo.jsonl está
+        # en el entorno, se agrega una línea JSON por pedido a ese archivo.
+        # Con kernel_timing, "asm_exec" pide además los tiempos internos de ./procesamiento.
+        self.metrics_log = instrumentacion.JsonlLog(os.environ.get("PROCESAMIENTO_METRICAS"))
+        self.kernel_timing = True
+        self.job_spans = None       # Spans del pedido que se está animando
+        self.anim_started = None    # perf_counter() al empezar su animación
+
+        # Procesamiento fuera del hilo de Tk: un solo hilo de trabajo (solo cuenta el
+        # último pedido), el token de cancelación del último pedido
+        # y la cola por donde vuelven progreso y resultados (poll_jobs con after()).
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.job_seq = 0
+        self.job_cancel = None
+        self.job_results = queue.Queue()
+        self.poll_job_id = None
+        self.anim_job = None    # Próximo paso pendiente de las animaciones (after)
+
+        # Dimensiones de la imagen convertida y cuadrícula (las que recibe el kernel).
+        # Con 400x400 y 4x4 los cuadrantes son de 100x100 y la salida de 200x200.
+        self.img_width = 400
+        self.img_height = 400
+        self.grid = 4
 
         # Variables para la cámara (Live)
         self.live_window = None
         self.live_label = None
         self.cap = None
+        self.grabber = None             # Hilo de captura (FrameGrabber)
         self.update_job_id = None
+        self.live_interp_label = None   # Vista interpolada (a la derecha de la cámara)
+        self.live_stats_label = None    # fps y latencia por etapa
+        self.live_timer = None
+        self.live_out = None            # Buffer de salida del kernel (se reutiliza entre frames)
 
         # Arreglos de imagenes (arr_conv, arr_quad, arr_final) para las animaciones
         self.arr_conv = None
@@ -427,6 +688,7 @@ class App(tk.Tk):
         ttk.Label(self.frame_top_left, text="Imagen Original").pack(pady=5)
         self.lbl_original = ttk.Label(self.frame_top_left)
         self.lbl_original.pack(padx=5, pady=5)
+        self.original_surface = PhotoSurface(self.lbl_original, box=(400, 400))
 
         # Etiqueta para mostrar dimensiones originales
         self.original_dims_label = ttk.Label(self.frame_top_left, text="", foreground="yellow")
@@ -434,7 +696,8 @@ class App(tk.Tk):
 
         # En la parte der: Selector de cuadrantes y botones
         ttk.Label(self.frame_top_right, text="Seleccione Cuadrante:").pack(pady=5)
-        self.quad_selector = QuadrantSelector(self.frame_top_right, callback=self.on_quadrant_selected)
+        self.quad_selector = QuadrantSelector(self.frame_top_right, callback=self.on_quadrant_selected,
+                                              grid=self.grid)
         self.quad_selector.pack(pady=5)
 
         # Frame para los íconos (Cargar, Live, Procesar)
@@ -483,6 +746,28 @@ class App(tk.Tk):
         btn_process.pack(side=tk.LEFT, padx=5)
         ToolTip(btn_process, "Procesar la imagen")
 
+        # Escala de la salida: 2x es la interpolación original (pesos 3:1, no la
+        # bilineal con N = 2); 3x y 4x usan la bilineal por fases del kernel
+        # (sub-bloque de tile => factor*tile). Ver phase_weights.
+        scale_frame = ttk.Frame(self.frame_top_right)
+        scale_frame.pack(pady=5)
+        ttk.Label(scale_frame, text="Escala:").pack(side=tk.LEFT, padx=5)
+        for factor in (2, 3, 4):
+            btn_scale = ttk.Radiobutton(scale_frame, text=f"{factor}x", value=factor,
+                                        variable=self.factor_var)
+            btn_scale.pack(side=tk.LEFT, padx=5)
+            ToolTip(btn_scale, "Interpolación original (pesos 3:1)" if factor == 2
+                    else f"Bilineal por fases ({factor}x)")
+
+        # Estado del procesamiento en curso (etapa del hilo de trabajo)
+        self.status_label = ttk.Label(self.frame_top_right, text="", foreground="yellow")
+        self.status_label.pack(pady=5)
+
+        # Panel de estadísticas: tiempos por etapa del último pedido
+        self.stats_label = ttk.Label(self.frame_top_right, text="", foreground="gray70",
+                                     justify="left")
+        self.stats_label.pack(pady=5)
+
         # Figure de Matplotlib
         self.fig = Figure(figsize=(8, 3), dpi=100)
         # Ajustamos márgenes para que no haya mucho espacio en blanco
@@ -509,8 +794,9 @@ class App(tk.Tk):
     #------------------------------------------------------------------------------------
     def open_live_view(self):
         """
-        Abre una ventana Toplevel donde se muestra la cámara en vivo, con un botón
-        para tomar foto.
+        Abre una ventana Toplevel donde se muestra la cámara en vivo y, al lado,
+        el cuadrante seleccionado (o la imagen completa) interpolado 2x en cada frame.
+        Abajo: botón para tomar foto, modo de interpolación y fps / latencia por etapa.
         """
         if self.live_window is not None and tk.Toplevel.winfo_exists(self.live_window):
             # Si ya está abierta, la traemos al frente
@@ -528,11 +814,17 @@ class App(tk.Tk):
             self.live_window.destroy()
             return
 
-        # Label donde mostraremos el frame capturado
-        self.live_label = tk.Label(self.live_window)
-        self.live_label.pack()
-
-        # Frame para el botón de tomar foto
+        # Labels donde mostraremos el frame capturado (izq) y el interpolado (der)
+        views_frame = tk.Frame(self.live_window, bg="black")
+        views_frame.pack()
+        self.live_label = tk.Label(views_frame, bg="black")
+        self.live_label.pack(side=tk.LEFT, padx=5)
+        self.live_interp_label = tk.Label(views_frame, bg="black")
+        self.live_interp_label.pack(side=tk.LEFT, padx=5)
+        self.live_surface = PhotoSurface(self.live_label)
+        self.live_interp_surface = PhotoSurface(self.live_interp_label)
+
+        # Frame para el botón de tomar foto y el modo
         btn_frame = tk.Frame(self.live_window)
         btn_frame.pack(pady=5)
 
@@ -551,36 +843,121 @@ class App(tk.Tk):
         )
         btn_take.pack(side=tk.LEFT, padx=5)
 
-        # Iniciamos actualización rápida (1 ms) para refrescar la cámara
+        # Modo del Live View: cuadrante seleccionado (quad_selector) o imagen completa
+        self.live_mode_var = tk.StringVar(value="cuadrante")
+        for text, value in (("Cuadrante", "cuadrante"), ("Imagen completa", "full"), ("Sin interpolar", "off")):
+            tk.Radiobutton(btn_frame, text=text, value=value,
+                           variable=self.live_mode_var).pack(side=tk.LEFT, padx=5)
+
+        # Cámara en gris (usa la luma del kernel, sin conversión BGR => RGB)
+        self.live_gray_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(btn_frame, text="Gris", variable=self.live_gray_var).pack(side=tk.LEFT, padx=5)
+
+        # Panel de estadísticas (fps y latencia por etapa)
+        self.live_stats_label = tk.Label(self.live_window, text="", font=("Courier", 10))
+        self.live_stats_label.pack(pady=5)
+        self.live_timer = StageTimer()
+
+        # Hilo de captura + refresco de la pantalla a LIVE_FPS
+        # Desde acá la cámara es del hilo de captura (la libera al terminar)
+        self.grabber = FrameGrabber(self.cap)
+        self.grabber.start()
+        self.cap = None
         self.update_live_view_fast()
 
     def update_live_view_fast(self):
         """
-        Lee frames de la cámara y los muestra en 'live_label'
-        casi en tiempo real (cada 1ms).
+        Bomba de pantalla a frecuencia fija (LIVE_FPS): toma el frame más nuevo del
+        hilo de captura (FrameGrabber) y lo muestra en 'live_label'; si no llegó
+        ninguno nuevo no pinta nada. Con interpolación activa, el frame pasa además
+        por interpolate_live_frame y se muestra en 'live_interp_label'.
+        Cada vista reutiliza su PhotoImage (PhotoSurface); la luma se calcula una
+        sola vez y solo si hace falta (vista en gris o interpolación).
         """
-        if not self.cap or not self.cap.isOpened():
+        if self.grabber is None:
             return
 
-        ret, frame = self.cap.read()
-        if ret:
-            # Convertimos BGR (OpenCV) a RGB (Pillow)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            im = Image.fromarray(frame_rgb)
-            imgtk = ImageTk.PhotoImage(im)
-            self.live_label.config(image=imgtk)
-            self.live_label.imgtk = imgtk
+        timer = self.live_timer
+        start = time.perf_counter()
+        frame = self.grabber.latest()
+        if frame is not None:
+            timer.add("captura", self.grabber.read_seconds)
+            interpolate = self.live_mode_var.get() != "off"
+            gray_view = self.live_gray_var.get()
+
+            # Luma 8 bits (la cámara puede entregar ya un solo canal)
+            gray = None
+            if frame.ndim == 2:
+                gray = frame
+            elif interpolate or gray_view:
+                t0 = time.perf_counter()
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                timer.add("luma", time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            if gray is not None and (gray_view or frame.ndim == 2):
+                self.live_surface.show_gray(gray)
+            else:
+                self.live_surface.show_bgr(frame)
+            timer.add("pantalla", time.perf_counter() - t0)
+
+            if interpolate:
+                final = self.interpolate_live_frame(gray, timer)
+                t0 = time.perf_counter()
+                self.live_interp_surface.show_gray(final)
+                timer.add("pantalla 2x", time.perf_counter() - t0)
+
+            timer.frame_done()
+            if timer.frames % 10 == 0:
+                self.live_stats_label.config(text=f"{timer.summary()}\n{self.grabber.counters()}")
 
         # Si la ventana live sigue abierta, programamos la siguiente actualización
+        # (descontando lo que tardó este paso, para mantener LIVE_FPS)
         if self.live_window is not None and tk.Toplevel.winfo_exists(self.live_window):
-            self.update_job_id = self.live_label.after(1, self.update_live_view_fast)
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            delay = max(1, int(1000.0 / LIVE_FPS - elapsed_ms))
+            self.update_job_id = self.live_label.after(delay, self.update_live_view_fast)
+
+    def live_motor(self):
+        """
+        Motor en memoria para el Live View: ./procesamiento (archivos + proceso)
+        no llega a la tasa de la cámara, así que "asm" usa libprocesamiento.so si
+        está compilada y si no motor_numpy.
+        """
+        if self.kernel_backend != "numpy" and motor_so.available():
+            return motor_so
+        return motor_numpy
+
+    def interpolate_live_frame(self, gray, timer):
+        """
+        Luma de la cámara => img_width x img_height => escala factor_var del
+        cuadrante seleccionado (o de la imagen completa), todo en memoria.
+        Devuelve el arreglo interpolado (uint8).
+        """
+        t0 = time.perf_counter()
+        gray = cv2.resize(gray, (self.img_width, self.img_height), interpolation=cv2.INTER_AREA)
+        timer.add("resize", time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        if self.live_mode_var.get() == "full":
+            src = gray
+        else:
+            src = self.extract_quadrant_tile(gray, self.quadrant_var.get())
+        factor = self.factor_var.get()
+        shape = (factor * src.shape[0], factor * src.shape[1])
+        if self.live_out is None or self.live_out.shape != shape:
+            self.live_out = np.empty(shape, dtype=np.uint8)
+        final = self.live_motor().interpolate_nx(src, factor, out=self.live_out)
+        timer.add("kernel", time.perf_counter() - t0)
+        return final
 
     def take_photo(self):
         """
-        Toma el frame actual y lo guarda como 'livephoto.png', luego la
-        asigna como 'selected_image_path' y se cierra la ventana en 1 segundo.
+        Toma el último frame del hilo de captura (sin otro cap.read()) y lo guarda
+        como 'livephoto.png', luego la asigna como 'selected_image_path' y se
+        cierra la ventana en 1 segundo.
         """
-        if not self.cap or not self.cap.isOpened():
+        if self.grabber is None:
             messagebox.showerror("Error", "No hay cámara activa.")
             return
 
@@ -589,20 +966,19 @@ class App(tk.Tk):
             self.live_label.after_cancel(self.update_job_id)
             self.update_job_id = None
 
-        # Leemos un frame
-        ret, frame = self.cap.read()
-        if ret:
+        # Último frame capturado
+        frame = self.grabber.last_frame
+        if frame is not None:
             outfile = "livephoto.png"
             cv2.imwrite(outfile, frame)  # Guardamos el frame como .png
             self.selected_image_path = outfile
             self.show_original()
 
             # Mostramos la foto capturada (congelada) en la live window
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            im = Image.fromarray(frame_rgb)
-            imgtk = ImageTk.PhotoImage(im)
-            self.live_label.config(image=imgtk)
-            self.live_label.imgtk = imgtk
+            if frame.ndim == 2:
+                self.live_surface.show_gray(frame)
+            else:
+                self.live_surface.show_bgr(frame)
 
             # Cerramos la ventana tras 1 segundo
             self.live_label.after(1000, self.close_live_window)
@@ -613,8 +989,12 @@ class App(tk.Tk):
         """
         Cierra la ventana de Live
         """
-        if self.cap:
-            self.cap.release()
+        if self.grabber is not None:
+            self.grabber.stop()         # El hilo libera la cámara al salir del bucle
+            self.grabber = None
+        elif self.cap:
+            self.cap.release()          # Abierta pero sin hilo de captura todavía
+        self.cap = None
         if self.live_window:
             if self.update_job_id is not None:
                 self.live_label.after_cancel(self.update_job_id)
@@ -652,9 +1032,7 @@ class App(tk.Tk):
             im = Image.open(self.selected_image_path)
             w_orig, h_orig = im.size
             im.thumbnail((400, 400))
-            tk_img = ImageTk.PhotoImage(im)
-            self.lbl_original.config(image=tk_img)
-            self.lbl_original.image = tk_img
+            self.original_surface.show(im)
 
             if self.original_dims_label:
                 self.original_dims_label.config(
@@ -671,109 +1049,373 @@ class App(tk.Tk):
     #------------------------------------------------------------------------------------
     def run_full_process(self):
         """
-        Ejecuta toda la secuencia de procesamiento:
-        1) Convertir imagen a grayscale 400x400 => imagen_in.img
-        2) Escribir config.txt con 'imagen_in.img' y el cuadrante
-        3) Ejecutar el ensamblador ./procesamiento
+        Ejecuta toda la secuencia de procesamiento en un hilo de trabajo (pipeline_worker):
+        1) Convertir imagen a grayscale img_width x img_height (400x400) => arr_conv
+        2-3) Interpolar el cuadrante con kernel_backend (escala factor_var) => arr_final
         4) Mostrar animaciones (fade in + highlight en Convertida,
-           fade in de Cuadrante, fade in de Final).
+           fade in de Cuadrante, fade in de Final), ya en el hilo de Tk (poll_jobs).
+        Los pasos 1 y 2-3 se saltan si el resultado ya está en frame_cache.
+        Solo cuenta el último pedido: uno nuevo cancela el que estaba en curso.
         """
         if not self.selected_image_path:
             messagebox.showerror("Error", "No has seleccionado imagen.")
             return
 
         q = self.quadrant_var.get()
-        if q < 1 or q > 16:
-            messagebox.showerror("Error", "Cuadrante fuera de 1..16.")
-            return
-
-        # 1) Convert => 'imagen_in.img'
-        if not self.convert_to_raw(self.selected_image_path):
+        if q < 1 or q > self.grid * self.grid:
+            messagebox.showerror("Error", f"Cuadrante fuera de 1..{self.grid * self.grid}.")
             return
 
-        # 2) config.txt
-        self.write_config(q)
+        # Cancelamos el trabajo anterior (si sigue en la cola o corriendo, se descarta)
+        if self.job_cancel is not None:
+            self.job_cancel.set()
+        self.job_seq += 1
+        self.job_cancel = threading.Event()
+
+        # El hilo de trabajo no toca Tk: recibe una copia de los parámetros
+        job = {
+            "path": self.selected_image_path,
+            "quadrant": q,
+            "width": self.img_width,
+            "height": self.img_height,
+            "grid": self.grid,
+            "factor": self.factor_var.get(),
+            "convert_backend": self.convert_backend,
+            "kernel_backend": self.kernel_backend,
+            "kernel_timing": self.kernel_timing,
+        }
+        self.executor.submit(self.pipeline_worker, self.job_seq, job, self.job_cancel)
+
+        self.status_label.config(text="Procesando...")
+        if self.poll_job_id is None:
+            self.poll_job_id = self.after(JOB_POLL_MS, self.poll_jobs)
+
+    def pipeline_worker(self, seq, job, cancel):
+        """
+        Corre en el hilo de trabajo. Deja en job_results (cola) el progreso y el
+        resultado del pedido 'seq'; poll_jobs los lleva al hilo de Tk.
+        El resultado y los errores van con los Spans del pedido (tiempos por etapa).
+        """
+        def progress(stage):
+            if cancel.is_set():
+                raise PipelineCancelled()
+            self.job_results.put((seq, "progreso", stage))
+
+        job["kernel_backend"] = self.resolve_backend(job["kernel_backend"])
+        spans = instrumentacion.Spans(cuadrante=job["quadrant"], ancho=job["width"],
+                                      alto=job["height"], grid=job["grid"],
+                                      factor=job["factor"],
+                                      conversion=job["convert_backend"],
+                                      motor=job["kernel_backend"])
+        try:
+            result = self.process_job(job, progress, cancel, spans)
+            self.job_results.put((seq, "ok", (job["quadrant"], result, spans)))
+        except PipelineCancelled:
+            self.job_results.put((seq, "cancelado", None))
+        except PipelineError as e:
+            self.job_results.put((seq, "error", (str(e), spans)))
+        except Exception as e:
+            self.job_results.put((seq, "error", (f"Error inesperado:\n{e}", spans)))
 
-        # 3) Ejecutar ensamblador
-        self.run_assembler()
+    def poll_jobs(self):
+        """
+        Hilo de Tk: vacía job_results cada JOB_POLL_MS. Ignora los mensajes de
+        pedidos viejos y, con el resultado del último, inicia las animaciones.
+        """
+        self.poll_job_id = None
+        finished = False
+        while True:
+            try:
+                seq, kind, payload = self.job_results.get_nowait()
+            except queue.Empty:
+                break
+            if seq != self.job_seq:
+                continue
+            if kind == "progreso":
+                self.status_label.config(text=f"{payload}...")
+            elif kind == "ok":
+                finished = True
+                self.status_label.config(text="")
+                quadrant, (self.arr_conv, self.arr_quad, self.arr_final), spans = payload
+                self.show_images_in_steps(quadrant, spans)
+            elif kind == "error":
+                finished = True
+                self.status_label.config(text="")
+                message, spans = payload
+                spans.meta["error"] = message
+                self.report_spans(spans)
+                messagebox.showerror("Error", message)
+            else:
+                finished = True
+                self.status_label.config(text="")
+
+        if not finished:
+            self.poll_job_id = self.after(JOB_POLL_MS, self.poll_jobs)
+
+    def process_job(self, job, progress, cancel, spans):
+        """
+        Hilo de trabajo: conversión => kernel, con frame_cache (solo la usa este hilo).
+        'progress(etapa)' informa la etapa y lanza PipelineCancelled si se canceló.
+        Los tiempos de leer / convertir / kernel quedan en 'spans' (las etapas
+        que salen de la caché no se miden y se marcan en spans.meta).
+        Devuelve (arr_conv, arr_quad, arr_final).
+        """
+        progress("Leyendo imagen")
+        try:
+            with spans.span("leer"):
+                digest = cache.file_digest(job["path"])
+        except OSError as e:
+            raise PipelineError(f"No se pudo leer la imagen:\n{e}")
+
+        # 1) Convertir => arr_conv
+        conv_key = cache.make_key(digest, "conv", width=job["width"], height=job["height"],
+                                  convert=job["convert_backend"])
+        arr_conv = self.frame_cache.get(conv_key)
+        spans.meta["cache_convertir"] = arr_conv is not None
+        if arr_conv is None:
+            progress("Convirtiendo")
+            with spans.span("convertir"):
+                arr_conv = self.frame_cache.put(conv_key, self.convert_image(job))
+        arr_quad = self.extract_quadrant_tile(arr_conv, job["quadrant"])
+
+        # 2-3) Kernel => arr_final (los tres motores dan los mismos bytes)
+        out_key = cache.make_key(conv_key, "out", grid=job["grid"], quadrant=job["quadrant"],
+                                 factor=job["factor"], kernel=motor_numpy.KERNEL_VERSION)
+        arr_final = self.frame_cache.get(out_key)
+        spans.meta["cache_kernel"] = arr_final is not None
+        if arr_final is None:
+            progress("Interpolando")
+            with spans.span("kernel"):
+                arr_final = self.run_kernel(job, arr_conv, arr_quad, cancel, spans)
+            if arr_final is not None:
+                arr_final = self.frame_cache.put(out_key, arr_final)
+
+        progress("Mostrando")
+        return arr_conv, arr_quad, arr_final
+
+    def resolve_backend(self, backend):
+        """
+        Motor que se usa de verdad para kernel_backend: "asm" y "asm_exec"
+        necesitan un ./procesamiento que atienda --server y el modo argumentos
+        (motor_worker.available lo compila si hace falta y lo prueba); si no,
+        libprocesamiento.so y, sin ella, motor_numpy. Corre en el hilo de trabajo.
+        """
+        if backend in ("asm", "asm_exec") and not motor_worker.available(self.kernel_worker.path):
+            return "so" if motor_so.available() else "numpy"
+        return backend
+
+    def run_kernel(self, job, arr_conv, arr_quad, cancel, spans):
+        """
+        Hilo de trabajo: calcula la imagen interpolada del cuadrante con kernel_backend.
+        Con los motores en memoria (numpy / so) no hace falta ./procesamiento;
+        con "asm" el pedido va al ./procesamiento --server que queda corriendo y con
+        "asm_exec" a un ./procesamiento nuevo (run_assembler), siempre por pipes.
+        Lanza PipelineError si algo falla.
+        """
+        if job["kernel_backend"] == "asm":
+            try:
+                return self.kernel_worker.request(arr_conv, job["quadrant"], job["grid"],
+                                                  factor=job["factor"])[0]
+            except (OSError, motor_worker.WorkerError) as e:
+                raise PipelineError(f"Error en el worker del kernel:\n{e}")
+
+        if job["kernel_backend"] in ("numpy", "so"):
+            if job["kernel_backend"] == "so" and not motor_so.available():
+                raise PipelineError(f"No se encontró {motor_so.LIB_PATH}")
+            motor = motor_so if job["kernel_backend"] == "so" else motor_numpy
+            if arr_quad is None:
+                return None
+            return motor.interpolate_nx(arr_quad, job["factor"])
 
-        # 4) Iniciar las animaciones
-        self.show_images_in_steps(q)
+        factor = job["factor"]
+        out_w, out_h = factor * (job["width"] // job["grid"]), factor * (job["height"] // job["grid"])
+        data = self.run_assembler(job, arr_conv, cancel, spans)
+        if len(data) != out_w * out_h:
+            raise PipelineError(f"./procesamiento devolvió {len(data)} bytes, "
+                                f"se esperaban {out_w * out_h}")
+        return np.frombuffer(data, dtype=np.uint8).reshape((out_h, out_w))
 
-    def convert_to_raw(self, file_path):
+    def convert_image(self, job):
         """
-        Llama a 'convert' (ImageMagick) para convertir la imagen a:
+        Convierte la imagen (módulo conversion, motor convert_backend) a:
         - Grayscale
         - 8 bits
-        - 400x400
-        - Lo escribe en un archivo raw: 'imagen_in.img'
-        """
-        cmd = [
-            "convert",
-            file_path,
-            "-colorspace", "Gray",
-            "-depth", "8",
-            "-resize", "400x400!",
-            "-type", "Grayscale",
-            "gray:imagen_in.img"
-        ]
+        - img_width x img_height (400x400)
+        - Devuelve un arreglo uint8 contiguo, listo para el kernel
+        """
         try:
-            subprocess.run(cmd, check=True)
-            return True
+            return conversion.to_gray(job["path"], job["width"], job["height"],
+                                      job["convert_backend"])
         except FileNotFoundError:
-            messagebox.showerror("Error", "No se encontró 'convert' (instala ImageMagick).")
-        except subprocess.CalledProcessError as e:
-            messagebox.showerror("Error", f"Fallo al convertir imagen:\n{e}")
-        return False
-
-    def write_config(self, quadrant):
-        """
-        Genera un archivo 'config.txt' donde:
-        - Primera línea: nombre del archivo raw ('imagen_in.img')
-        - Segunda línea: cuadrante (1..16)
-        """
+            raise PipelineError("No se encontró 'convert' (instala ImageMagick).")
+        except (subprocess.CalledProcessError, OSError, ValueError) as e:
+            raise PipelineError(f"Fallo al convertir imagen:\n{e}")
+
+    def run_assembler(self, job, arr_conv, cancel, spans):
+        """
+        Ejecuta './procesamiento - - CUADRANTE ANCHO ALTO GRID FACTOR': la imagen convertida
+        entra por stdin y la interpolada vuelve por stdout (los checksums salen por
+        stderr), sin config.txt, imagen_in.img ni imagen_out.img.
+        Con job["kernel_timing"] corre con PROCESAMIENTO_TIEMPOS=1 y los tiempos
+        internos (leer, copiar, interpolar, checksum, escribir) van a spans.kernel.
+        Devuelve los bytes de la salida. Si se cancela el pedido mientras corre,
+        se termina el proceso.
+        """
+        assembler_exec = self.kernel_worker.path
+        cmd = [assembler_exec, "-", "-", str(job["quadrant"]),
+               str(job["width"]), str(job["height"]), str(job["grid"]), str(job["factor"])]
         try:
-            with open("config.txt", "w") as f:
-                f.write("imagen_in.img\n")
-                f.write(f"{quadrant}\n")
+            env = instrumentacion.timing_env() if job["kernel_timing"] else None
+            proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, env=env)
         except Exception as e:
-            messagebox.showerror("Error", f"No se pudo escribir config.txt:\n{e}")
-
-    def run_assembler(self):
-        """
-        Ejecuta el ensamblador './procesamiento', que tomará 'imagen_in.img'
-        y generará 'imagen_out.img', usando config.txt para saber el cuadrante.
-        """
-        assembler_exec = "./procesamiento"
-        if not os.path.exists(assembler_exec):
-            messagebox.showerror("Error", f"No se encontró {assembler_exec}")
-            return
+            raise PipelineError(f"Error ejecutando {assembler_exec}:\n{e}")
+        # communicate() sin timeout: si se reintenta tras un TimeoutExpired deja de
+        # mandar la entrada que faltaba. La cancelación la vigila otro hilo, que
+        # termina el proceso (communicate() vuelve en cuanto se cierran los pipes).
+        done = threading.Event()
+
+        def watch_cancel():
+            while not done.wait(JOB_POLL_MS / 1000):
+                if cancel.is_set():
+                    proc.kill()
+                    return
+
+        threading.Thread(target=watch_cancel, daemon=True).start()
         try:
-            subprocess.run([assembler_exec], capture_output=True, text=True)
-        except Exception as e:
-            messagebox.showerror("Error", f"Error ejecutando {assembler_exec}:\n{e}")
+            out, err = proc.communicate(memoryview(arr_conv).cast("B"))
+        finally:
+            done.set()
+        if cancel.is_set():
+            raise PipelineCancelled()
+        if proc.returncode != 0:
+            reason = motor_worker.EXIT_CODES.get(proc.returncode, f"código {proc.returncode}")
+            raise PipelineError(f"{assembler_exec} terminó con error ({reason})")
+        spans.kernel = instrumentacion.parse_kernel_times(err)
+        return out
 
 #------------------------------------------------------------------------------------
 # ANIMACIONES DE PROCESAMIENTO
 #------------------------------------------------------------------------------------
 
-    def show_images_in_steps(self, quadrant):
+    def show_images_in_steps(self, quadrant, spans):
         """
-        1) Lee los archivos raw (imagen_in.img, imagen_out.img).
-        2) Limpia subplots.
+        1) Usa los arreglos ya calculados (arr_conv, arr_quad, arr_final).
+        2) Prepara los subplots una sola vez (setup_animation) => etapa "cargar".
         3) Llama a fade_in_conv -> animate_highlight_movement -> fade_in_quad -> fade_in_final
+           (si había una animación en curso, de un pedido anterior, se corta)
+           => etapa "animar", hasta que termina fade_in_final (finish_spans).
         """
-        self.arr_conv = self.read_raw_grayscale("imagen_in.img", 400, 400)
-        self.arr_quad = self.extract_quadrant_100x100("imagen_in.img", quadrant)
-        self.arr_final = self.read_raw_grayscale("imagen_out.img", 200, 200)
+        if self.anim_job is not None:
+            self.after_cancel(self.anim_job)
+            self.anim_job = None
+            self.finish_spans(cut=True)
+
+        self.job_spans = spans
+        with spans.span("cargar"):
+            self.setup_animation()
 
+        # Iniciamos la animación
+        self.anim_started = time.perf_counter()
+        self.fade_in_conv(quadrant)
+
+    def finish_spans(self, cut=False):
+        """
+        Cierra la etapa "animar" del pedido mostrado y lo reporta (report_spans).
+        cut=True si la animación se cortó por un pedido nuevo.
+        """
+        spans, self.job_spans = self.job_spans, None
+        if spans is None:
+            return
+        spans.add("animar", time.perf_counter() - self.anim_started)
+        if cut:
+            spans.meta["animacion_cortada"] = True
+        self.report_spans(spans)
+
+    def report_spans(self, spans):
+        """
+        Muestra los tiempos del pedido en el panel de estadísticas y agrega su
+        línea JSON a metrics_log (si está configurado).
+        """
+        self.stats_label.config(text=spans.summary())
+        try:
+            self.metrics_log.write(spans.record())
+        except OSError as e:
+            print(f"No se pudieron guardar las métricas: {e}")
+
+    def setup_animation(self):
+        """
+        Crea los artistas de la animación una sola vez por ejecución: las tres
+        AxesImage (alpha 0), la cuadrícula y el rectángulo amarillo, todos con
+        animated=True. Dibuja la figura completa una vez y guarda el fondo de cada
+        subplot; cada paso de la animación solo cambia alpha / posición y hace blit.
+        """
         self.ax_conv.clear()
         self.ax_quad.clear()
         self.ax_final.clear()
+
+        self.im_conv = self.add_animated_image(self.ax_conv, self.arr_conv, "Convertida")
+        self.im_quad = self.add_animated_image(self.ax_quad, self.arr_quad, "Cuadrante")
+        self.im_final = self.add_animated_image(self.ax_final, self.arr_final, "Final")
+
+        # Cuadrícula (4x4) y rectángulo del cuadrante, encima de la imagen Convertida
+        self.grid_artists = []
+        self.highlight_rect = None
+        if self.arr_conv is not None:
+            h, w = self.arr_conv.shape
+            self.grid_artists = self.draw_grid(self.ax_conv, w, h)
+            self.highlight_rect = self.highlight_quadrant_fill(self.ax_conv, 1)
+            self.highlight_rect.set_visible(False)
+            for artist in self.grid_artists + [self.highlight_rect]:
+                artist.set_animated(True)
+
+        # Único render completo: fondos sin los artistas animados
         self.canvas_mat.draw()
+        self.anim_backgrounds = {
+            ax: self.canvas_mat.copy_from_bbox(ax.bbox)
+            for ax in (self.ax_conv, self.ax_quad, self.ax_final)
+        }
 
-        # Iniciamos la animación
-        self.fade_in_conv(quadrant)
+    def add_animated_image(self, ax, arr, title):
+        """
+        imshow de 'arr' (invisible, alpha 0, animated=True) con los ejes ajustados a su forma.
+        Devuelve la AxesImage (o None si no hay arreglo).
+        """
+        ax.set_title(title)
+        if arr is None:
+            return None
+        h, w = arr.shape
+        im = ax.imshow(arr, cmap="gray",
+                       alpha=0.0,
+                       extent=[0,w,h,0],
+                       origin="upper",
+                       animated=True)
+        ax.set_xlim(0,w)
+        ax.set_ylim(h,0)
+        ax.set_aspect('equal', 'box')
+        return im
+
+    def blit_axes(self, ax, artists):
+        """
+        Repone el fondo guardado de 'ax', dibuja solo 'artists' encima y copia
+        ese recuadro a la pantalla (sin re-renderizar la figura).
+        """
+        self.canvas_mat.restore_region(self.anim_backgrounds[ax])
+        for artist in artists:
+            if artist is not None:
+                ax.draw_artist(artist)
+        self.canvas_mat.blit(ax.bbox)
+
+    def freeze_artists(self, ax, artists):
+        """
+        Deja fijos (animated=False) los artistas que ya terminaron su animación,
+        redibuja la figura y vuelve a guardar el fondo de 'ax' (ahora con ellos).
+        """
+        for artist in artists:
+            if artist is not None:
+                artist.set_animated(False)
+        self.canvas_mat.draw()
+        self.anim_backgrounds[ax] = self.canvas_mat.copy_from_bbox(ax.bbox)
 
     def fade_in_conv(self, quadrant, step=0, steps_fade=6, delay_fade=30):
         """
@@ -782,56 +1424,31 @@ class App(tk.Tk):
         Al terminar, llama a animate_highlight_movement para resaltar el cuadrante.
         """
         alpha = step / steps_fade
-        self.ax_conv.clear()
-
-        if self.arr_conv is not None:
-            # Mostramos la imagen con alpha
-            self.ax_conv.imshow(self.arr_conv, cmap="gray",
-                                alpha=alpha,
-                                extent=[0,400,400,0],
-                                origin="upper")
-
-            self.ax_conv.set_xlim(0,400)
-            self.ax_conv.set_ylim(400,0)
-            self.ax_conv.set_aspect('equal', 'box')
-            self.ax_conv.set_title("Convertida")
-
-            # Dibujamos la cuadrícula (4x4)
-            self.draw_grid_4x4(self.ax_conv, 400, 400)
-
-        self.canvas_mat.draw()
+        if self.im_conv is not None:
+            self.im_conv.set_alpha(alpha)
+        self.blit_axes(self.ax_conv, [self.im_conv] + self.grid_artists)
 
         if step < steps_fade:
-            self.after(delay_fade, lambda: self.fade_in_conv(quadrant, step+1, steps_fade, delay_fade))
+            self.anim_job = self.after(delay_fade, lambda: self.fade_in_conv(quadrant, step+1, steps_fade, delay_fade))
         else:
-            # Terminamos el fade in de la imagen Convertida,
+            # Terminamos el fade in de la imagen Convertida (queda en el fondo),
             # ahora iniciamos el movimiento del rectángulo amarillo
+            self.freeze_artists(self.ax_conv, [self.im_conv] + self.grid_artists)
             self.animate_highlight_movement(quadrant, current=1)
 
     def animate_highlight_movement(self, quadrant, current=1, delay_move=150):
         """
-        Mueve el rectángulo amarillo desde 1 hasta 'quadrant' en la imagen Convertida,
-        mostrando la cuadrícula en cada paso.
+        Mueve el rectángulo amarillo desde 1 hasta 'quadrant' en la imagen Convertida
+        (solo cambia su posición con set_xy).
         """
-        self.ax_conv.clear()
-
-        if self.arr_conv is not None:
-            self.ax_conv.imshow(self.arr_conv, cmap="gray",
-                                extent=[0,400,400,0],
-                                origin="upper")
-            self.ax_conv.set_xlim(0,400)
-            self.ax_conv.set_ylim(400,0)
-            self.ax_conv.set_aspect('equal', 'box')
-            self.ax_conv.set_title("Convertida")
-
-            self.draw_grid_4x4(self.ax_conv, 400, 400)
-
         # Pintamos el cuadrante 'current' de amarillo
-        self.highlight_quadrant_fill(self.ax_conv, current)
-        self.canvas_mat.draw()
+        if self.highlight_rect is not None:
+            self.highlight_rect.set_xy(self.quadrant_xy(current))
+            self.highlight_rect.set_visible(True)
+        self.blit_axes(self.ax_conv, [self.highlight_rect])
 
         if current < quadrant:
-            self.after(delay_move, lambda: self.animate_highlight_movement(quadrant, current+1, delay_move))
+            self.anim_job = self.after(delay_move, lambda: self.animate_highlight_movement(quadrant, current+1, delay_move))
         else:
             # Llegamos al cuadrante final
             self.fade_in_quad()
@@ -841,22 +1458,12 @@ class App(tk.Tk):
         Aparece gradualmente la sub-imagen (100x100) del cuadrante seleccionado.
         """
         alpha = step / steps_fade
-        self.ax_quad.clear()
-
-        if self.arr_quad is not None:
-            self.ax_quad.imshow(self.arr_quad, cmap="gray",
-                                alpha=alpha,
-                                extent=[0,100,100,0],
-                                origin="upper")
-            self.ax_quad.set_xlim(0,100)
-            self.ax_quad.set_ylim(100,0)
-            self.ax_quad.set_aspect('equal', 'box')
-            self.ax_quad.set_title("Cuadrante")
-
-        self.canvas_mat.draw()
+        if self.im_quad is not None:
+            self.im_quad.set_alpha(alpha)
+        self.blit_axes(self.ax_quad, [self.im_quad])
 
         if step < steps_fade:
-            self.after(delay_fade, lambda: self.fade_in_quad(step+1, steps_fade, delay_fade))
+            self.anim_job = self.after(delay_fade, lambda: self.fade_in_quad(step+1, steps_fade, delay_fade))
         else:
             # Terminamos la animación del cuadrante
             self.fade_in_final()
@@ -867,101 +1474,94 @@ class App(tk.Tk):
         (imagen_out.img, 200x200).
         """
         alpha = step / steps_fade
-        self.ax_final.clear()
-
-        if self.arr_final is not None:
-            self.ax_final.imshow(self.arr_final, cmap="gray",
-                                 alpha=alpha,
-                                 extent=[0,200,200,0],
-                                 origin="upper")
-            self.ax_final.set_xlim(0,200)
-            self.ax_final.set_ylim(200,0)
-            self.ax_final.set_aspect('equal', 'box')
-            self.ax_final.set_title("Final")
-
-        self.canvas_mat.draw()
+        if self.im_final is not None:
+            self.im_final.set_alpha(alpha)
+        self.blit_axes(self.ax_final, [self.im_final])
 
         if step < steps_fade:
-            self.after(delay_fade, lambda: self.fade_in_final(step+1, steps_fade, delay_fade))
+            self.anim_job = self.after(delay_fade, lambda: self.fade_in_final(step+1, steps_fade, delay_fade))
         else:
-            # Terminó la animación final
-            pass
+            # Terminó la animación final: todo queda fijo, así sobrevive a los
+            # redibujados de la ventana (por ejemplo al cambiar su tamaño)
+            self.anim_job = None
+            for artist in (self.highlight_rect, self.im_quad, self.im_final):
+                if artist is not None:
+                    artist.set_animated(False)
+            self.canvas_mat.draw_idle()
+            self.finish_spans()
 
-#------------------------------------------------------------------------------------
-# Lectura de archivos RAW
-#------------------------------------------------------------------------------------
-    def read_raw_grayscale(self, path, width, height):
+    def tile_size(self):
         """
-        Abre un archivo binario con 'width*height' bytes, interpretados como 8 bits (uint8).
-        Devuelve un arreglo numpy con forma (height, width).
+        Tamaño (ancho, alto) de cada sub-bloque: img_width/grid x img_height/grid
+        (100x100 con la imagen de 400x400 y la cuadrícula 4x4).
         """
-        if not os.path.exists(path):
-            return None
-        try:
-            with open(path, "rb") as f:
-                data = f.read()
-            if len(data) != width * height:
-                return None
-            arr = np.frombuffer(data, dtype=np.uint8).reshape((height, width))
-            return arr
-        except:
-            return None
+        return self.img_width // self.grid, self.img_height // self.grid
 
-    def extract_quadrant_100x100(self, path, quadrant):
+    def extract_quadrant_tile(self, arr, quadrant):
         """
-        Dado un RAW de 400x400, extrae un sub-bloque 100x100 correspondiente
-        al 'quadrant' (1..16). Devuelve la porción de la matriz.
+        Dada la imagen de img_width x img_height (400x400), extrae el sub-bloque
+        (100x100) correspondiente al 'quadrant' (1..16). Devuelve la porción de la matriz.
         """
-        arr = self.read_raw_grayscale(path, 400, 400)
         if arr is None:
             return None
+        tile_w, tile_h = self.tile_size()
         q = quadrant - 1
-        row = q // 4
-        col = q % 4
-        sub = arr[row*100:(row+1)*100, col*100:(col+1)*100]
+        row = q // self.grid
+        col = q % self.grid
+        sub = arr[row*tile_h:(row+1)*tile_h, col*tile_w:(col+1)*tile_w]
         return sub
 
-    def draw_grid_4x4(self, ax, width, height):
+    def draw_grid(self, ax, width, height):
         """
-        Dibuja líneas rojas formando una cuadrícula 4x4 en 'ax', con ejes
-        adaptados a (width, height).
+        Dibuja líneas rojas formando la cuadrícula (4x4, o grid x grid) en 'ax',
+        con ejes adaptados a (width, height). Devuelve los artistas creados.
         """
-        for i in range(5):
-            x = i * 100
-            ax.axvline(
+        artists = []
+        tile_w, tile_h = width // self.grid, height // self.grid
+        for i in range(self.grid + 1):
+            x = i * tile_w
+            artists.append(ax.axvline(
                 x, color='red', linewidth=2,
                 path_effects=[pe.withStroke(linewidth=4, foreground='black')]
-            )
-            y = i * 100
-            ax.axhline(
+            ))
+            y = i * tile_h
+            artists.append(ax.axhline(
                 y, color='red', linewidth=2,
                 path_effects=[pe.withStroke(linewidth=4, foreground='black')]
-            )
+            ))
         # Numeramos cada sub-bloque (1..16)
-        for row in range(4):
-            for col in range(4):
-                q = row*4 + col + 1
-                x_center = col*100 + 50
-                y_center = row*100 + 50
-                ax.text(
+        for row in range(self.grid):
+            for col in range(self.grid):
+                q = row*self.grid + col + 1
+                x_center = col*tile_w + tile_w // 2
+                y_center = row*tile_h + tile_h // 2
+                artists.append(ax.text(
                     x_center, y_center, str(q),
                     color='red', fontsize=12,
                     ha='center', va='center',
                     path_effects=[pe.withStroke(linewidth=3, foreground='black')]
-                )
+                ))
+        return artists
+
+    def quadrant_xy(self, quadrant):
+        """
+        Esquina superior izquierda (x, y) del cuadrante (1..16) en la imagen Convertida.
+        """
+        tile_w, tile_h = self.tile_size()
+        q = quadrant - 1
+        row = q // self.grid
+        col = q % self.grid
+        return col * tile_w, row * tile_h
 
     def highlight_quadrant_fill(self, ax, quadrant):
         """
         Dibuja un rectángulo amarillo semitransparente (alpha=0.3)
-        sobre el cuadrante seleccionado (1..16).
+        sobre el cuadrante seleccionado (1..16). Devuelve el Rectangle
+        (la animación lo mueve con set_xy).
         """
-        q = quadrant - 1
-        row = q // 4
-        col = q % 4
-        x1 = col * 100
-        y1 = row * 100
+        tile_w, tile_h = self.tile_size()
         rect = patches.Rectangle(
-            (x1, y1), 100, 100,
+            self.quadrant_xy(quadrant), tile_w, tile_h,
             fill=True,
             facecolor='yellow',
             alpha=0.3,
@@ -969,6 +1569,7 @@ class App(tk.Tk):
             linewidth=3
         )
         ax.add_patch(rect)
+        return rect
 
 
 def main():
@@ -978,6 +1579,12 @@ def main():
     app = App()
     app.mainloop()
 
+    # Al cerrar, cancelamos el procesamiento pendiente (mata ./procesamiento si corre)
+    if app.job_cancel is not None:
+        app.job_cancel.set()
+    app.executor.shutdown(wait=True)
+    app.kernel_worker.close()
+
 if __name__ == "__main__":
     main()
 